@@ -12,4 +12,4 @@ fi
 
 mkdir -p "$LOG_DIR"
 cd "$PROJECT_ROOT"
-"$PYTHON" run_collect_market_data.py --lookback-years 3 --full --kr-chunk-size 1 --us-chunk-size 50 --index-chunk-size 10 --prices-limit 0 > "$LOG_DIR/us_collect.log" 2>&1
+"$PYTHON" run_collect_market_data.py --lookback-years 3 --full --kr-chunk-size 100 --fdr-workers 8 --us-chunk-size 50 --index-chunk-size 10 --prices-limit 0 --incremental --date-major > "$LOG_DIR/us_collect.log" 2>&1
@@ -1,15 +1,27 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
-from .data import fetch_prices, get_date_range, make_universe
+from .data import fetch_prices, fetch_volumes, get_date_range, load_price_panel, make_universe, price_store_stamp, provider_options, prune_cache, read_price_panel_meta, write_price_panel
 from .engine import _detect_strategy_halt, _apply_budget_throttle
-from .macro import compute_macro_regime, compute_rates_overlay, is_vix_spike
-from .portfolio import allocate_weights, apply_risk_cuts, score_universe, build_sleeve_map, resolve_regime_rotation, apply_sleeve_rotation, resolve_factor_preference
+from .macro import TIMELINE_WARMUP_ROWS, compute_macro_regime, compute_rates_overlay, compute_regime_timeline, is_vix_spike, rates_overlay_at, regime_at, regime_timeline_key, update_regime_timeline
+from .feature_panel import FeatureCube
+from .result_store import ResultCache, read_result_frames, replace_directory, write_result_frames
+from .portfolio import allocate_weights, apply_risk_cuts, finalize_scores, prepare_score_inputs, build_sleeve_map, resolve_regime_rotation, apply_sleeve_rotation, resolve_factor_preference, weighted_scores
 
 
 def _selection_candidate_tickers(cfg: dict) -> list[str]:
@@ -50,6 +62,7 @@ class BacktestResult:
     analytics: dict[str, Any] | None = None
     walkforward_summary: pd.DataFrame | None = None
     scenario_summary: pd.DataFrame | None = None
+    monitor_log: pd.DataFrame | None = None
 
 
 @dataclass
@@ -70,6 +83,9 @@ class BacktestConfig:
     adv_window_days: int = 20
     max_participation_rate: float = 0.10
     capacity_safety_factor: float = 0.25
+    executor: str = "serial"
+    max_workers: int = 0
+    rebalance_dates: tuple[str, ...] = ()
 
 
 def _compute_summary(equity_curve: pd.Series, daily_returns: pd.Series, benchmark_curve: pd.Series | None = None) -> dict[str, Any]:
@@ -116,17 +132,83 @@ def _compute_summary(equity_curve: pd.Series, daily_returns: pd.Series, benchmar
     return out
 
 
+def _file_stamp(path: str) -> str | None:
+    try:
+        stat = Path(path).stat() if path else None
+    except OSError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}" if stat is not None else None
+
+
 def _load_universe_timeline(path: str) -> pd.DataFrame | None:
-    if not path:
+    """Per-ticker membership bounds from the timeline file at ``path``.
+
+    The reduced bounds are cached next to the file as ``<name>.bounds.parquet``
+    and reused while the timeline's size and mtime are unchanged, so a large
+    survivorship-free listing is parsed once.
+    """
+    stamp = _file_stamp(path)
+    if stamp is None:
         return None
     p = Path(path)
-    if not p.exists():
-        return None
+    sidecar = p.with_name(f"{p.name}.bounds.parquet")
+    if sidecar.exists():
+        try:
+            table = pq.read_table(sidecar)
+            if (table.schema.metadata or {}).get(b"source") == stamp.encode():
+                return table.to_pandas()
+        except (OSError, pa.ArrowException):
+            pass
     if p.suffix.lower() == ".csv":
-        return pd.read_csv(p)
-    if p.suffix.lower() in {".parquet", ".pq"}:
-        return pd.read_parquet(p)
-    return None
+        timeline = pd.read_csv(p)
+    elif p.suffix.lower() in {".parquet", ".pq"}:
+        timeline = pd.read_parquet(p)
+    else:
+        return None
+    bounds = _timeline_bounds(timeline)
+    if bounds is None:
+        return timeline
+    try:
+        table = pa.Table.from_pandas(bounds, preserve_index=False)
+        tmp = sidecar.with_name(f".{sidecar.name}.tmp-{os.getpid()}")
+        pq.write_table(table.replace_schema_metadata({**(table.schema.metadata or {}), b"source": stamp.encode()}), tmp)
+        tmp.replace(sidecar)
+    except OSError:
+        pass
+    return bounds
+
+
+def _timeline_bounds(timeline: pd.DataFrame | None) -> pd.DataFrame | None:
+    """One ``ticker``/``start_date``/``end_date`` row per ticker; NaT means unbounded.
+
+    A ticker listed on several rows is only a member where every row
+    covers the date, so its bounds are the latest start and earliest end.
+    """
+    if timeline is None or timeline.empty:
+        return None
+    if not {"ticker", "start_date", "end_date"}.issubset(set(timeline.columns)):
+        return None
+    frame = pd.DataFrame({
+        "ticker": timeline["ticker"].astype(str),
+        "start_date": pd.to_datetime(timeline["start_date"], errors="coerce"),
+        "end_date": pd.to_datetime(timeline["end_date"], errors="coerce"),
+    })
+    return frame.groupby("ticker", sort=False).agg(start_date=("start_date", "max"), end_date=("end_date", "min")).reset_index()
+
+
+def _timeline_mask(index: pd.Index, columns: pd.Index, bounds: pd.DataFrame) -> np.ndarray:
+    """Date x ticker membership, built with one comparison against the bounds arrays."""
+    by_ticker = bounds.set_index("ticker")
+    known = np.array([str(c) in by_ticker.index for c in columns], dtype=bool)
+    picked = by_ticker.reindex([str(c) for c in columns])
+    never, always = np.iinfo(np.int64).min, np.iinfo(np.int64).max
+    # NaT views as int64 min, which already means "no start"; a missing end
+    # (or a ticker without a row) must become the largest date instead.
+    start = np.where(known, picked["start_date"].to_numpy("datetime64[ns]").view("i8"), never)
+    end = picked["end_date"].to_numpy("datetime64[ns]").view("i8")
+    end = np.where(known & (end != never), end, always)
+    dates = pd.DatetimeIndex(index).to_numpy("datetime64[ns]").view("i8")[:, None]
+    return (dates >= start[None, :]) & (dates <= end[None, :])
 
 
 def _load_volume_data(path: str) -> pd.DataFrame | None:
@@ -143,86 +225,115 @@ def _load_volume_data(path: str) -> pd.DataFrame | None:
 
 
 def _apply_universe_timeline(prices: pd.DataFrame, timeline: pd.DataFrame | None) -> pd.DataFrame:
-    if timeline is None or timeline.empty:
-        return prices
-    required = {"ticker", "start_date", "end_date"}
-    if not required.issubset(set(timeline.columns)):
+    bounds = _timeline_bounds(timeline)
+    if bounds is None or prices.empty:
         return prices
-    px = prices.copy()
-    for _, row in timeline.iterrows():
-        ticker = str(row["ticker"])
-        if ticker not in px.columns:
-            continue
-        start_date = pd.Timestamp(row["start_date"])
-        end_raw = row["end_date"]
-        end_date = pd.Timestamp(end_raw) if pd.notna(end_raw) and str(end_raw).strip() else None
-        px.loc[px.index < start_date, ticker] = pd.NA
-        if end_date is not None:
-            px.loc[px.index > end_date, ticker] = pd.NA
-    return px
+    return prices.where(_timeline_mask(prices.index, prices.columns, bounds))
 
 
 def _prepare_prices_for_backtest(prices: pd.DataFrame, cfg: BacktestConfig, timeline: pd.DataFrame | None) -> tuple[pd.DataFrame, dict[str, Any]]:
     px = _apply_universe_timeline(prices.sort_index().copy(), timeline)
     diagnostics: dict[str, Any] = {"dropped_incomplete_assets": [], "delisted_assets": [], "timeline_applied": timeline is not None}
 
-    original_last_valid = {col: px[col].last_valid_index() for col in px.columns}
+    observed = px.notna().to_numpy()
+    # Row position of each column's last observation (-1 when it has none).
+    last_pos = np.where(observed.any(axis=0), len(px) - 1 - np.argmax(observed[::-1], axis=0), -1) if len(px) else np.full(len(px.columns), -1)
+    last_pos = pd.Series(last_pos, index=px.columns)
     if cfg.strict_point_in_time:
         px = px.ffill(limit=5)
     else:
         px = px.ffill()
 
-    keep_cols = list(px.columns)
     if cfg.drop_incomplete_assets:
-        keep_cols = []
-        for col in px.columns:
-            first_valid = px[col].first_valid_index()
-            if first_valid is None:
-                continue
-            hist_len = int(px.loc[first_valid:, col].dropna().shape[0])
-            if hist_len >= cfg.min_history_days:
-                keep_cols.append(col)
-            else:
-                diagnostics["dropped_incomplete_assets"].append(col)
-        px = px[keep_cols]
+        # The count of valid rows is the last value of notna().cumsum(), i.e.
+        # the history length from the first valid row onwards.
+        hist_len = px.notna().sum()
+        keep = hist_len >= cfg.min_history_days
+        diagnostics["dropped_incomplete_assets"] = [col for col in px.columns if 0 < hist_len[col] < cfg.min_history_days]
+        px = px.loc[:, (keep & (hist_len > 0)).to_numpy()]
 
-    if cfg.enforce_delist_exit:
-        final_index = px.index[-1] if not px.empty else None
-        for col in px.columns:
-            last_valid = original_last_valid.get(col)
-            if final_index is not None and last_valid is not None and last_valid < final_index:
-                diagnostics["delisted_assets"].append(col)
+    if cfg.enforce_delist_exit and not px.empty:
+        final_pos = len(px) - 1
+        diagnostics["delisted_assets"] = [col for col in px.columns if 0 <= last_pos[col] < final_pos]
 
     return px.dropna(how="all"), diagnostics
 
 
-def _select_weights(cfg: dict, px_window: pd.DataFrame) -> tuple[str, float, pd.Series, pd.DataFrame, pd.DataFrame, bool, str, str, dict]:
-    regime = compute_macro_regime(px_window, cfg["macro_filter"]["thresholds"], cfg["macro_filter"]["components"])
-    if is_vix_spike(px_window):
+def _build_feature_cube(cfg: dict, prices: pd.DataFrame) -> FeatureCube:
+    return FeatureCube(
+        prices,
+        benchmark_ticker=cfg.get("backtest", {}).get("benchmark_ticker", "SPY"),
+        residual_cfg=cfg.get("selection", {}).get("residual_strength_anchors", {}),
+    )
+
+
+def _build_regime_timeline(cfg: dict, prices: pd.DataFrame) -> pd.DataFrame:
+    macro_cfg = cfg.get("macro_filter", {})
+    return compute_regime_timeline(prices, macro_cfg["thresholds"], macro_cfg["components"], macro_cfg.get("rates_overlay", {}))
+
+
+def _prepare_selection(cfg: dict, px_window: pd.DataFrame, feature_cube: FeatureCube | None = None, regime_timeline: pd.DataFrame | None = None) -> dict[str, Any]:
+    # Everything here is independent of selection.score_weights, so configs
+    # that only differ in their weights can share it.
+    dt = px_window.index[-1]
+    if regime_timeline is not None:
+        regime = regime_at(regime_timeline, dt)
+        vix_spike = bool(regime_timeline.at[dt, "vix_spike"])
+    else:
+        regime = compute_macro_regime(px_window, cfg["macro_filter"]["thresholds"], cfg["macro_filter"]["components"])
+        vix_spike = is_vix_spike(px_window)
+    if vix_spike:
         regime.details["vix_spike_halt"] = True
 
-    macro_px = px_window.drop(columns=[c for c in ["^VIX"] if c in px_window.columns], errors="ignore")
-    active_macro_cols = [col for col in macro_px.columns if pd.notna(macro_px[col].iloc[-1])]
-    macro_px = macro_px[active_macro_cols]
-    candidate_tickers = [t for t in _selection_candidate_tickers(cfg) if t in macro_px.columns]
+    # Select columns from the last row only: copying the whole history
+    # window per date made daily rebalancing quadratic in its length.
+    last_row = px_window.iloc[-1].drop(labels=[c for c in ["^VIX"] if c in px_window.columns])
+    active_macro_cols = last_row.index[last_row.notna().to_numpy()]
+    active = set(active_macro_cols)
+    candidate_tickers = [t for t in _selection_candidate_tickers(cfg) if t in active]
     if not candidate_tickers:
-        candidate_tickers = list(macro_px.columns)
-    all_px = macro_px[candidate_tickers].copy()
+        candidate_tickers = list(active_macro_cols)
+    sleeve_map_all = _combined_sleeve_map(cfg, candidate_tickers)
+    if regime_timeline is not None and "TLT" in active:
+        rates_overlay = rates_overlay_at(regime_timeline, dt)
+    else:
+        rates_overlay = compute_rates_overlay(px_window[list(active_macro_cols)], cfg.get("macro_filter", {}).get("rates_overlay", {}))
+    factor_pref = resolve_factor_preference(cfg.get("selection", {}), regime.state, rates_overlay=rates_overlay)
+    residual_cfg = cfg.get("selection", {}).get("residual_strength_anchors", {}) or {}
+    correlation_cfg = cfg.get("selection", {}).get("correlation_diversification", {})
+    if feature_cube is not None:
+        features = feature_cube.features_at(dt, candidate_tickers, residual_cfg)
+        # With precomputed features only the correlation lookback is read.
+        score_px = px_window.iloc[-(int((correlation_cfg or {}).get("lookback", 63) or 63) + 1):][candidate_tickers]
+    else:
+        features = None
+        score_px = px_window[candidate_tickers]
+    score_inputs = prepare_score_inputs(
+        score_px,
+        sleeve_map=sleeve_map_all,
+        benchmark_ticker=cfg.get("backtest", {}).get("benchmark_ticker", "SPY"),
+        correlation_cfg=correlation_cfg,
+        residual_cfg=residual_cfg,
+        features=features,
+    )
+    return {"regime": regime, "window": px_window, "candidates": candidate_tickers, "factor_pref": factor_pref, "score_inputs": score_inputs}
+
+
+def _select_weights(cfg: dict, px_window: pd.DataFrame | None, feature_cube: FeatureCube | None = None, prepared: dict[str, Any] | None = None, weighted: pd.DataFrame | None = None) -> tuple[str, float, pd.Series, pd.DataFrame, pd.DataFrame, bool, str, str, dict]:
+    if prepared is None:
+        prepared = _prepare_selection(cfg, px_window, feature_cube)
+    regime = prepared["regime"]
+    factor_pref = prepared["factor_pref"]
     state = regime.state
-    sleeve_map_all = _combined_sleeve_map(cfg, all_px.columns)
-    rates_overlay = compute_rates_overlay(macro_px, cfg.get("macro_filter", {}).get("rates_overlay", {}))
-    factor_pref = resolve_factor_preference(cfg.get("selection", {}), state, rates_overlay=rates_overlay)
-    scores = score_universe(
-        all_px,
+    scores = finalize_scores(
+        prepared["score_inputs"],
         cfg["selection"]["score_weights"],
         regime_state=state,
         regime_factor_map=cfg.get("selection", {}).get("regime_factor_bias", {}),
-        sleeve_map=sleeve_map_all,
-        benchmark_ticker=cfg.get("backtest", {}).get("benchmark_ticker", "SPY"),
         relative_filter=cfg.get("selection", {}).get("benchmark_relative_filter", {}),
         factor_pref=factor_pref,
         correlation_cfg=cfg.get("selection", {}).get("correlation_diversification", {}),
-        residual_cfg=cfg.get("selection", {}).get("residual_strength_anchors", {}),
+        weighted=weighted,
     )
     if scores.empty:
         raise RuntimeError("Not enough history to score universe")
@@ -298,19 +409,33 @@ def _select_weights(cfg: dict, px_window: pd.DataFrame) -> tuple[str, float, pd.
             if total > 0:
                 weights = weights / total
 
-    final_w, cuts = apply_risk_cuts(all_px, weights, cfg["risk_cut"], cash_ticker=cash)
+    candidates = set(prepared["candidates"])
+    final_w, cuts = apply_risk_cuts(prepared["window"][[t for t in weights.index if t in candidates]], weights, cfg["risk_cut"], cash_ticker=cash)
     strategy_halt, halt_reason, halt_detail = _detect_strategy_halt(cfg, regime, selected, final_w, cuts, scores)
     selected.attrs["rotation_policy"] = rotation
     selected.attrs["selected_sleeves"] = {ticker: sleeve_map.get(ticker, "core") for ticker in selected.index}
     return state, float(regime.risk_score), final_w, selected, cuts, strategy_halt, halt_reason, halt_detail, factor_pref
 
 
-def _estimate_adv_metrics(selected: pd.DataFrame, volume_slice: pd.DataFrame | None, dt: pd.Timestamp, bt_cfg: BacktestConfig) -> tuple[float, float, float]:
-    if volume_slice is not None and not volume_slice.empty:
-        cols = [c for c in selected.index if c in volume_slice.columns]
-        current = volume_slice.loc[:dt, cols].tail(bt_cfg.adv_window_days) if cols else pd.DataFrame()
-        if not current.empty:
-            adv_20d = float(current.mean().mean())
+def _adv_table(volume_data: pd.DataFrame | None, window: int) -> pd.DataFrame | None:
+    """Rolling ``window``-row mean volume per ticker, computed once per run.
+
+    Row ``t`` equals the mean of the last ``window`` rows up to ``t``
+    (NaNs skipped), i.e. what ``volume.loc[:t].tail(window).mean()`` gives.
+    """
+    if volume_data is None or volume_data.empty:
+        return None
+    volume = volume_data.sort_index()
+    volume = volume[~volume.index.duplicated(keep="last")]
+    return volume.apply(pd.to_numeric, errors="coerce").rolling(int(window), min_periods=1).mean()
+
+
+def _estimate_adv_metrics(selected: pd.DataFrame, adv_table: pd.DataFrame | None, dt: pd.Timestamp, bt_cfg: BacktestConfig) -> tuple[float, float, float]:
+    if adv_table is not None and not adv_table.empty:
+        cols = adv_table.columns.get_indexer([c for c in selected.index if c in adv_table.columns])
+        pos = int(adv_table.index.searchsorted(dt, side="right")) - 1
+        if len(cols) and pos >= 0:
+            adv_20d = float(adv_table.iloc[pos, cols].mean())
             participation_rate = min(bt_cfg.max_participation_rate, 1.0)
             capacity = adv_20d * participation_rate * bt_cfg.capacity_safety_factor
             return adv_20d, participation_rate, capacity
@@ -324,11 +449,11 @@ def _estimate_adv_metrics(selected: pd.DataFrame, volume_slice: pd.DataFrame | N
     return 0.0, min(bt_cfg.max_participation_rate, 1.0), 0.0
 
 
-def _compute_execution_cost(equity: float, turnover: float, selected: pd.DataFrame, bt_cfg: BacktestConfig, volume_slice: pd.DataFrame | None, dt: pd.Timestamp) -> tuple[float, float, float, float, float, float, float, float]:
+def _compute_execution_cost(equity: float, turnover: float, selected: pd.DataFrame, bt_cfg: BacktestConfig, adv_table: pd.DataFrame | None, dt: pd.Timestamp) -> tuple[float, float, float, float, float, float, float, float]:
     base_cost = equity * (turnover / 2.0) * (bt_cfg.transaction_cost_bps / 10000.0)
     slippage_cost = equity * (turnover / 2.0) * (bt_cfg.slippage_bps / 10000.0)
     impact_cost = equity * ((turnover / 2.0) ** 2) * (bt_cfg.market_impact_bps_per_turnover / 10000.0)
-    adv_20d, participation_rate, capacity = _estimate_adv_metrics(selected, volume_slice, dt, bt_cfg)
+    adv_20d, participation_rate, capacity = _estimate_adv_metrics(selected, adv_table, dt, bt_cfg)
     liquidity_penalty = 0.0
     if adv_20d > 0:
         liquidity_penalty = equity * (turnover / 2.0) * (bt_cfg.liquidity_vol_multiplier_bps / 10000.0) / max(adv_20d, 1e-9)
@@ -404,7 +529,209 @@ def _compute_scenario_report(daily_returns: pd.Series, benchmark_returns: pd.Ser
     return pd.DataFrame(rows)
 
 
-def _run_single_backtest(cfg: dict, bt_cfg: BacktestConfig, prices: pd.DataFrame, prep_diagnostics: dict[str, Any], volume_data: pd.DataFrame | None) -> BacktestResult:
+def _period_ends(index: pd.DatetimeIndex, freq: str) -> tuple[np.ndarray, np.ndarray]:
+    codes = index.to_period(freq).asi8
+    change = np.flatnonzero(codes[1:] != codes[:-1])
+    return np.r_[0, change + 1], np.r_[change, len(codes) - 1]
+
+
+def _complete_period_ends(index: pd.DatetimeIndex, freq: str) -> tuple[np.ndarray, np.ndarray]:
+    """:func:`_period_ends` without a trailing period ``index`` has not finished.
+
+    The last period counts once ``index`` reaches its last business day, so
+    a panel cut mid-month does not turn its last day into a month end.
+    """
+    starts, ends = _period_ends(index, freq)
+    last = index[-1]
+    if last < pd.offsets.BDay().rollback(last.to_period(freq).end_time.normalize()):
+        starts, ends = starts[:-1], ends[:-1]
+    return starts, ends
+
+
+def rebalance_schedule(index: pd.DatetimeIndex, frequency: str = "M", dates: list | tuple | None = None) -> pd.DatetimeIndex:
+    """Rebalance days drawn from the trading days in ``index``.
+
+    ``frequency`` is one of the named calendars ``daily``, ``weekly`` (last
+    trading day of each Mon-Fri week), ``monthly`` (last trading day of each
+    month), ``month_end-N`` (N trading days before the last one of each
+    month) or ``custom`` (each of ``dates`` snapped back to the last trading
+    day on or before it). Any other value is a pandas offset kept for older
+    configs: its period end only counts when it is itself a trading day.
+    Weeks and months still open at the end of ``index``, and custom dates
+    after it, are left out, so truncating ``index`` keeps the schedule's
+    earlier dates.
+    """
+    index = pd.DatetimeIndex(index)
+    if index.empty:
+        return index
+    key = str(frequency).strip().lower()
+    if key == "daily":
+        return index
+    if key == "custom":
+        wanted = pd.DatetimeIndex(pd.to_datetime(list(dates or [])))
+        wanted = wanted[wanted <= index[-1]]
+        positions = index.searchsorted(wanted, side="right") - 1
+        return index[np.unique(positions[positions >= 0])]
+    if key == "weekly":
+        return index[_complete_period_ends(index, "W-FRI")[1]]
+    if key == "monthly" or key.startswith("month_end-"):
+        suffix = key.split("-", 1)[1] if key != "monthly" else "0"
+        if not suffix.isdigit():
+            raise ValueError(f"rebalance frequency {frequency!r}: month_end-N needs a whole number of trading days")
+        offset = int(suffix)
+        starts, ends = _complete_period_ends(index, "M")
+        positions = ends - offset
+        return index[positions[positions >= starts]]
+    freq = "ME" if str(frequency) == "M" else str(frequency)
+    period_ends = pd.Series(0, index=index).resample(freq).last().index
+    return index[index.isin(period_ends)]
+
+
+def _resume_point(resume: BacktestResult, rebal_dates: list) -> int:
+    """Number of leading rebalances a stored run shares with ``rebal_dates``.
+
+    Appending days can still move the stored run's last rebalances (a
+    month whose last trading day fell before its last business day), so
+    only the common prefix is kept.
+    """
+    count = 0
+    stored = resume.rebalance_log["date"].tolist() if not resume.rebalance_log.empty else []
+    for old, new in zip(stored, rebal_dates):
+        if old != new:
+            break
+        count += 1
+    return count
+
+
+class _PositionMonitor:
+    """Daily risk-cut and drift-band checks on the names held between rebalances.
+
+    The ``apply_risk_cuts`` rules are evaluated for every day of a ticker's
+    history at once, the first time it is held. A holding period is then
+    walked from one trigger to the next in vectorized segments: holdings
+    drift with prices, and a day whose cut flags or drift from target fire
+    trades at that close (partial rebalance) before the next segment.
+    """
+
+    def __init__(self, cfg: dict, prices: pd.DataFrame, asset_returns: np.ndarray, column_positions: dict[str, int]):
+        monitor_cfg = cfg.get("backtest", {}).get("monitoring", {}) or {}
+        risk_cfg = cfg.get("risk_cut", {}) or {}
+        action = risk_cfg.get("action", {}) or {}
+        self.drift_band = float(monitor_cfg.get("drift_band", 0.0) or 0.0)
+        self.risk_cuts = bool(monitor_cfg.get("risk_cuts", True)) and bool(risk_cfg.get("enabled", True))
+        self.rules = risk_cfg.get("rules", {}) or {}
+        self.cut_to_cash = bool(action.get("cut_to_cash", True))
+        self.cash_kr = str(action.get("cash_kr", "") or "")
+        self.cash_us = str(action.get("cash_us", "") or "")
+        self.values = prices.to_numpy(dtype=float, na_value=np.nan)
+        self.returns = asset_returns
+        self.column_positions = column_positions
+        self._flags: dict[str, np.ndarray] = {}
+
+    def cut_flags(self, ticker: str) -> np.ndarray:
+        """``apply_risk_cuts`` verdict for ``ticker`` at the close of every row."""
+        flags = self._flags.get(ticker)
+        if flags is None:
+            flags = np.zeros(len(self.values), dtype=bool)
+            col = self.column_positions.get(ticker)
+            if self.risk_cuts and col is not None:
+                valid = ~np.isnan(self.values[:, col])
+                p = pd.Series(self.values[valid, col])
+                cut = (p / p.rolling(126, min_periods=1).max() - 1.0 <= float(self.rules.get("trailing_dd_cut", -0.12))) | (p / p.rolling(63, min_periods=1).max() - 1.0 <= float(self.rules.get("hard_stop_cut", -0.18)))
+                if self.rules.get("below_200sma_cut", True):
+                    cut = cut | (p < p.rolling(200).mean())
+                flags[valid] = cut.to_numpy() & (np.arange(1, len(p) + 1) >= 210)
+            self._flags[ticker] = flags
+        return flags
+
+    def hold(self, equity: float, weights: pd.Series, pos: int, next_pos: int, cost: Any) -> tuple[float, pd.Series, np.ndarray, np.ndarray, list[tuple[int, str, list[str], float, float]]]:
+        """Carry ``weights`` from the close of ``pos`` to the close of ``next_pos``.
+
+        ``cost(equity, turnover, row)`` prices a partial rebalance. Returns
+        the closing equity, the drifted weights, the per-day equity (after
+        any trade cost) and portfolio returns, and the triggered trades as
+        ``(row, trigger, cut tickers, turnover, cost)``.
+        """
+        names = [str(t) for t, w in weights.items() if w > 0]
+        cash = self.cash_kr if any(t.endswith(".KS") for t in names) else self.cash_us
+        if self.risk_cuts and self.cut_to_cash and names and cash and cash not in names:
+            names.append(cash)
+        target = weights.reindex(names).fillna(0.0).to_numpy(dtype=float, copy=True)
+        held = target.copy()
+        cols = np.array([self.column_positions.get(t, -1) for t in names], dtype=np.int64)
+        known = cols >= 0
+        checked = np.array([t != cash for t in names], dtype=bool)
+        flags = [self.cut_flags(t) for t in names]
+        equity_path = np.empty(next_pos - pos)
+        return_path = np.zeros(next_pos - pos)
+        events: list[tuple[int, str, list[str], float, float]] = []
+        start = pos
+        while start < next_pos:
+            rows = slice(start + 1, next_pos + 1)
+            growth = np.ones((next_pos - start, len(names)))
+            growth[:, known] = np.cumprod(1.0 + self.returns[rows][:, cols[known]], axis=0)
+            idle = max(0.0, 1.0 - float(held.sum()))
+            value = held * growth
+            level = value.sum(axis=1) + idle
+            port_ret = np.diff(np.concatenate(([1.0], level))) / np.concatenate(([1.0], level[:-1]))
+            drifted = value / np.where(level > 0, level, 1.0)[:, None]
+            cut = np.zeros(value.shape, dtype=bool)
+            if self.risk_cuts and names:
+                cut = np.column_stack([f[rows] for f in flags]) & (held > 0) & checked
+            drift = np.abs(drifted - target).max(axis=1, initial=0.0) > self.drift_band if self.drift_band > 0 else np.zeros(len(level), dtype=bool)
+            fired = cut.any(axis=1) | drift
+            # The closing row is the next rebalance, which trades anyway.
+            fired[-1] = False
+            end = int(np.argmax(fired)) + 1 if fired.any() else len(level)
+            # Seeding cumprod with the equity keeps the day-by-day multiplication order.
+            path = np.cumprod(np.concatenate(([equity], 1.0 + port_ret[:end])))
+            equity_path[start - pos : start - pos + end] = path[1:]
+            return_path[start - pos : start - pos + end] = port_ret[:end]
+            equity = float(path[-1])
+            now = drifted[end - 1]
+            if not fired.any():
+                held = now
+                break
+            day = start + end
+            new = target.copy() if drift[end - 1] else now.copy()
+            cut_now = cut[end - 1]
+            if cut_now.any():
+                for weights_vec in (new, target):
+                    moved = float(weights_vec[cut_now].sum())
+                    weights_vec[cut_now] = 0.0
+                    if self.cut_to_cash and cash in names:
+                        weights_vec[names.index(cash)] += moved
+                total = float(new.sum())
+                new = new / total if total > 0 else new
+                total = float(target.sum())
+                target = target / total if total > 0 else target
+            turnover = float(np.abs(new - now).sum())
+            trade_cost = float(cost(equity, turnover, day))
+            equity -= trade_cost
+            equity_path[day - pos - 1] = equity
+            trigger = "+".join(name for name, hit in (("risk_cut", cut_now.any()), ("drift", bool(drift[end - 1]))) if hit)
+            events.append((day, trigger, [t for t, hit in zip(names, cut_now) if hit], turnover, trade_cost))
+            held = new
+            start = day
+        out = pd.Series(held, index=names, dtype=float)
+        return equity, out[out > 0], equity_path, return_path, events
+
+
+def _rebalance_positions(index: pd.DatetimeIndex, bt_cfg: BacktestConfig) -> list[int]:
+    """Positions in ``index`` of the scheduled rebalances with enough history to score."""
+    schedule = rebalance_schedule(index, bt_cfg.rebalance_frequency, bt_cfg.rebalance_dates)
+    score_history_requirement = max(int(bt_cfg.min_history_days), 260)
+    positions = [int(p) for p in index.get_indexer(schedule) if p >= score_history_requirement]
+    return positions or [len(index) - 1]
+
+
+def _run_single_backtest(cfg: dict, bt_cfg: BacktestConfig, prices: pd.DataFrame, prep_diagnostics: dict[str, Any], volume_data: pd.DataFrame | None, feature_cube: FeatureCube | None = None, decision_cache: dict | None = None, selection_inputs: dict | None = None, regime_timeline: pd.DataFrame | None = None, adv_table: pd.DataFrame | None = None, resume: BacktestResult | None = None) -> BacktestResult:
+    if feature_cube is None:
+        feature_cube = _build_feature_cube(cfg, prices)
+    if regime_timeline is None:
+        regime_timeline = _build_regime_timeline(cfg, prices)
+    if adv_table is None:
+        adv_table = _adv_table(volume_data, bt_cfg.adv_window_days)
     benchmark_curve = None
     benchmark_returns = None
     if bt_cfg.benchmark_ticker in prices.columns:
@@ -413,70 +740,117 @@ def _run_single_backtest(cfg: dict, bt_cfg: BacktestConfig, prices: pd.DataFrame
             benchmark_curve = bench / bench.iloc[0] * bt_cfg.starting_capital
             benchmark_returns = bench.pct_change(fill_method=None).fillna(0.0)
 
-    freq = "ME" if bt_cfg.rebalance_frequency == "M" else bt_cfg.rebalance_frequency
-    rebal_dates = prices.resample(freq).last().index
-    score_history_requirement = max(int(bt_cfg.min_history_days), 260)
-    rebal_dates = [d for d in rebal_dates if d in prices.index and prices.index.get_loc(d) >= score_history_requirement]
-    if not rebal_dates:
-        rebal_dates = [prices.index[-1]]
+    rebal_positions = _rebalance_positions(prices.index, bt_cfg)
+    rebal_dates = list(prices.index[rebal_positions])
+
+    # Day t's return accrues to the weights set at the last rebalance before
+    # t; a rebalance day's equity is recorded after its trading cost.
+    start_pos = rebal_positions[0]
+    end_pos = len(prices.index) - 1
+    asset_returns = prices.pct_change(fill_method=None).fillna(0.0).to_numpy(dtype=float)
+    column_positions = {c: j for j, c in enumerate(prices.columns)}
+    equity_values = np.empty(end_pos - start_pos + 1)
+    return_values = np.zeros(end_pos - start_pos + 1)
 
     equity = bt_cfg.starting_capital
     current_weights = pd.Series(dtype=float)
-    equity_points: list[tuple[pd.Timestamp, float]] = []
     rebalance_rows: list[dict[str, Any]] = []
-    daily_returns: list[tuple[pd.Timestamp, float]] = []
-
-    for i, dt in enumerate(rebal_dates):
-        idx = prices.index.get_loc(dt)
-        window = prices.iloc[: idx + 1]
-        state, risk_score, target_weights, selected, cuts, strategy_halt, halt_reason, halt_detail, factor_pref = _select_weights(cfg, window)
+    monitor = _PositionMonitor(cfg, prices, asset_returns, column_positions) if bool((cfg.get("backtest", {}).get("monitoring", {}) or {}).get("enabled", False)) else None
+    monitor_rows: list[dict[str, Any]] = []
+
+    # Resuming keeps the stored run up to the last rebalance both schedules
+    # share and replays from its holding period on.
+    resumed = _resume_point(resume, rebal_dates) if resume is not None else 0
+    if resumed:
+        keep = rebal_positions[resumed - 1] - start_pos + 1
+        equity_values[:keep] = resume.equity_curve.to_numpy(dtype=float)[:keep]
+        return_values[:keep] = resume.daily_returns.to_numpy(dtype=float)[:keep]
+        rebalance_rows = resume.rebalance_log.iloc[:resumed].to_dict(orient="records")
+        if resume.monitor_log is not None:
+            monitor_rows = resume.monitor_log.loc[resume.monitor_log["date"] <= rebal_dates[resumed - 1]].to_dict(orient="records")
+        equity = float(equity_values[keep - 1])
+        current_weights = pd.Series(rebalance_rows[-1]["weights"], dtype=float)
+
+    for i in range(max(resumed - 1, 0), len(rebal_dates)):
+        dt = rebal_dates[i]
+        decision = decision_cache.get(dt) if decision_cache is not None else None
+        if decision is None:
+            prepared = selection_inputs.get(dt) if selection_inputs is not None else None
+            if prepared is None:
+                prepared = _prepare_selection(cfg, prices.iloc[: rebal_positions[i] + 1], feature_cube, regime_timeline)
+                if selection_inputs is not None:
+                    selection_inputs[dt] = prepared
+            decision = _select_weights(cfg, None, feature_cube, prepared)
+            if decision_cache is not None:
+                decision_cache[dt] = decision
+        state, risk_score, target_weights, selected, cuts, strategy_halt, halt_reason, halt_detail, factor_pref = decision
 
         if strategy_halt:
             target_weights = pd.Series(dtype=float)
 
-        prev_weights = current_weights.copy()
-        all_names = sorted(set(prev_weights.index) | set(target_weights.index))
-        rebalance_threshold = float(cfg.get("rebalance", {}).get("min_trade_weight_diff", 0.0) or 0.0)
-        applied_weights = target_weights.copy()
-        turnover = 0.0
-        if all_names:
-            prev = prev_weights.reindex(all_names).fillna(0.0)
-            new = target_weights.reindex(all_names).fillna(0.0)
-            delta = new - prev
-            if rebalance_threshold > 0:
-                filtered = new.copy()
-                filtered.loc[delta.abs() < rebalance_threshold] = prev.loc[delta.abs() < rebalance_threshold]
-                if float(filtered.sum()) > 0:
-                    filtered = filtered / float(filtered.sum())
-                applied_weights = filtered[filtered > 0].copy()
-                new = applied_weights.reindex(all_names).fillna(0.0)
-            turnover = float((new - prev).abs().sum())
-
-        total_cost, base_cost, slippage_cost, impact_cost, liquidity_penalty, adv_20d, participation_rate, capacity = _compute_execution_cost(equity, turnover, selected, bt_cfg, volume_data, dt)
-        equity -= total_cost
-        current_weights = applied_weights.copy()
-
-        next_dt = rebal_dates[i + 1] if i + 1 < len(rebal_dates) else prices.index[-1]
-        segment = prices.loc[dt:next_dt]
-        if segment.empty:
+        # A resumed rebalance was traded and logged by the stored run; only
+        # its holding period is replayed.
+        if i >= resumed:
+            prev_weights = current_weights.copy()
+            all_names = sorted(set(prev_weights.index) | set(target_weights.index))
+            rebalance_threshold = float(cfg.get("rebalance", {}).get("min_trade_weight_diff", 0.0) or 0.0)
+            applied_weights = target_weights.copy()
+            turnover = 0.0
+            if all_names:
+                prev = prev_weights.reindex(all_names).fillna(0.0)
+                new = target_weights.reindex(all_names).fillna(0.0)
+                delta = new - prev
+                if rebalance_threshold > 0:
+                    filtered = new.copy()
+                    filtered.loc[delta.abs() < rebalance_threshold] = prev.loc[delta.abs() < rebalance_threshold]
+                    if float(filtered.sum()) > 0:
+                        filtered = filtered / float(filtered.sum())
+                    applied_weights = filtered[filtered > 0].copy()
+                    new = applied_weights.reindex(all_names).fillna(0.0)
+                turnover = float((new - prev).abs().sum())
+
+            total_cost, base_cost, slippage_cost, impact_cost, liquidity_penalty, adv_20d, participation_rate, capacity = _compute_execution_cost(equity, turnover, selected, bt_cfg, adv_table, dt)
+            equity -= total_cost
+            current_weights = applied_weights.copy()
+
+        pos = rebal_positions[i]
+        next_pos = rebal_positions[i + 1] if i + 1 < len(rebal_positions) else end_pos
+        carried_weights = None
+        equity_values[pos - start_pos] = equity
+        if next_pos > pos and monitor is not None:
+            def trade_cost(value: float, traded: float, row: int) -> float:
+                return _compute_execution_cost(value, traded, selected, bt_cfg, adv_table, prices.index[row])[0]
+
+            equity, carried_weights, equity_path, return_path, events = monitor.hold(equity, current_weights, pos, next_pos, trade_cost)
+            equity_values[pos + 1 - start_pos : next_pos + 1 - start_pos] = equity_path
+            return_values[pos + 1 - start_pos : next_pos + 1 - start_pos] = return_path
+            for row, trigger, cut_tickers, traded, event_cost in events:
+                monitor_rows.append({"date": prices.index[row], "trigger": trigger, "cut_tickers": cut_tickers, "turnover": traded, "cost": event_cost})
+        elif next_pos > pos:
+            cols = [c for c in current_weights.index if c in column_positions]
+            if cols:
+                w = current_weights.reindex(cols).fillna(0.0).to_numpy(dtype=float)
+                port_ret = (asset_returns[pos + 1 : next_pos + 1, [column_positions[c] for c in cols]] * w).sum(axis=1)
+            else:
+                port_ret = np.zeros(next_pos - pos)
+            # Seeding cumprod with the current equity keeps the same
+            # left-to-right multiplication order as compounding day by day.
+            path = np.cumprod(np.concatenate(([equity], 1.0 + port_ret)))
+            equity_values[pos + 1 - start_pos : next_pos + 1 - start_pos] = path[1:]
+            return_values[pos + 1 - start_pos : next_pos + 1 - start_pos] = port_ret
+            equity = float(path[-1])
+        if i < resumed:
+            if carried_weights is not None:
+                current_weights = carried_weights
             continue
-        returns = segment.pct_change(fill_method=None).fillna(0.0)
-        cols = [c for c in current_weights.index if c in returns.columns]
-        if cols:
-            w = current_weights.reindex(cols).fillna(0.0)
-            port_ret = returns[cols].mul(w, axis=1).sum(axis=1)
-        else:
-            port_ret = pd.Series(0.0, index=segment.index)
-
-        for ts, r in port_ret.items():
-            equity *= (1.0 + float(r))
-            equity_points.append((ts, equity))
-            daily_returns.append((ts, float(r)))
 
         factor_universe = set(cfg.get("universe", {}).get("us", {}).get("factor_tickers", []))
         factor_selected = [ticker for ticker in selected.index if ticker in factor_universe]
         rotation_policy = selected.attrs.get("rotation_policy", {}) if hasattr(selected, "attrs") else {}
         selected_sleeves = selected.attrs.get("selected_sleeves", {}) if hasattr(selected, "attrs") else {}
+        # Every column read below would deep-copy the rotation policy in attrs.
+        selected = selected.copy(deep=False)
+        selected.attrs = {}
         preferred_factors = [ticker for ticker in (factor_pref.get("overweight", []) if isinstance(factor_pref, dict) else []) if ticker in factor_universe]
         selected_preferred_factors = [ticker for ticker in factor_selected if ticker in preferred_factors]
         preferred_factor_min_count = int(factor_pref.get("min_count", 0)) if isinstance(factor_pref, dict) else 0
@@ -545,11 +919,13 @@ def _run_single_backtest(cfg: dict, bt_cfg: BacktestConfig, prices: pd.DataFrame
                 "cuts": cuts.to_dict(orient="records") if hasattr(cuts, "to_dict") else [],
             }
         )
+        if carried_weights is not None:
+            # With monitoring the next rebalance trades from the drifted book.
+            current_weights = carried_weights
 
-    equity_curve = pd.Series({ts: val for ts, val in equity_points}).sort_index()
-    if equity_curve.empty:
-        equity_curve = pd.Series([bt_cfg.starting_capital], index=pd.Index([prices.index[-1]], name="date"))
-    daily_returns_series = pd.Series({ts: val for ts, val in daily_returns}).sort_index()
+    curve_index = prices.index[start_pos : end_pos + 1]
+    equity_curve = pd.Series(equity_values, index=curve_index)
+    daily_returns_series = pd.Series(return_values, index=curve_index)
     rebalance_log = pd.DataFrame(rebalance_rows)
     summary = _compute_summary(equity_curve, daily_returns_series, benchmark_curve=benchmark_curve)
     summary["positions"] = int(rebalance_log["positions"].iloc[-1]) if not rebalance_log.empty else 0
@@ -560,6 +936,11 @@ def _run_single_backtest(cfg: dict, bt_cfg: BacktestConfig, prices: pd.DataFrame
     summary["total_impact_cost"] = float(rebalance_log["impact_cost"].sum()) if not rebalance_log.empty else 0.0
     summary["total_liquidity_penalty"] = float(rebalance_log["liquidity_penalty"].sum()) if not rebalance_log.empty else 0.0
     summary["halt_count"] = int(rebalance_log["strategy_halt"].sum()) if not rebalance_log.empty else 0
+    monitor_log = pd.DataFrame(monitor_rows, columns=["date", "trigger", "cut_tickers", "turnover", "cost"]) if monitor is not None else None
+    if monitor_log is not None:
+        summary["monitor_trades"] = int(len(monitor_log))
+        summary["monitor_risk_cuts"] = int(monitor_log["trigger"].str.contains("risk_cut").sum()) if not monitor_log.empty else 0
+        summary["monitor_cost"] = float(monitor_log["cost"].sum()) if not monitor_log.empty else 0.0
     summary["avg_adv_20d"] = float(rebalance_log["adv_20d"].mean()) if not rebalance_log.empty and "adv_20d" in rebalance_log.columns else 0.0
     summary["avg_participation_rate"] = float(rebalance_log["participation_rate"].mean()) if not rebalance_log.empty and "participation_rate" in rebalance_log.columns else 0.0
     summary["avg_capacity_estimate"] = float(rebalance_log["capacity_estimate"].mean()) if not rebalance_log.empty and "capacity_estimate" in rebalance_log.columns else 0.0
@@ -653,38 +1034,356 @@ def _run_single_backtest(cfg: dict, bt_cfg: BacktestConfig, prices: pd.DataFrame
         analytics=analytics,
         walkforward_summary=None,
         scenario_summary=_compute_scenario_report(daily_returns_series, benchmark_returns, cfg),
+        monitor_log=monitor_log,
     )
 
 
-def _run_walkforward(cfg: dict, bt_cfg: BacktestConfig, prices: pd.DataFrame, prep_diagnostics: dict[str, Any], volume_data: pd.DataFrame | None) -> pd.DataFrame:
-    wf_cfg = cfg.get("backtest", {}).get("walkforward", {})
-    if not wf_cfg.get("enabled", False):
-        return pd.DataFrame()
+def _cfg_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+def _selection_inputs_key(cfg: dict) -> str:
+    selection = {k: v for k, v in (cfg.get("selection", {}) or {}).items() if k != "score_weights"}
+    return _cfg_key({**cfg, "selection": selection})
+
 
+@dataclass
+class BacktestInputs:
+    prices: pd.DataFrame
+    prep_diagnostics: dict[str, Any]
+    volume_data: pd.DataFrame | None = None
+    feature_cubes: dict[str, FeatureCube] = field(default_factory=dict)
+    selection_inputs: dict[str, dict] = field(default_factory=dict)
+    decisions: dict[str, dict] = field(default_factory=dict)
+    regime_timelines: dict[str, pd.DataFrame] = field(default_factory=dict)
+    adv_tables: dict[int, pd.DataFrame | None] = field(default_factory=dict)
+    panel_path: str | None = None
+
+
+def _job_features(cfg: dict, inputs: BacktestInputs) -> tuple[FeatureCube, pd.DataFrame]:
+    cube_key = str(cfg.get("backtest", {}).get("benchmark_ticker", "SPY"))
+    cube = inputs.feature_cubes.get(cube_key)
+    if cube is None:
+        cube = inputs.feature_cubes.setdefault(cube_key, _build_feature_cube(cfg, inputs.prices))
+    timeline_key = _cfg_key(cfg.get("macro_filter", {}))
+    timeline = inputs.regime_timelines.get(timeline_key)
+    if timeline is None:
+        timeline = inputs.regime_timelines.setdefault(timeline_key, _build_regime_timeline(cfg, inputs.prices))
+    return cube, timeline
+
+
+def _decide_dates(cfgs: list[dict], inputs: BacktestInputs, dates: list[pd.Timestamp]) -> dict[str, dict[pd.Timestamp, tuple]]:
+    """Selection decisions of ``cfgs`` on ``dates`` per config key, as cached by the backtest loop.
+
+    A decision only reads prices up to its own date, never the holdings
+    before it, so any set of dates can be decided apart from the run.
+    ``cfgs`` differ at most in ``selection.score_weights``: each date's
+    inputs are prepared once and scored for all their weights in one pass.
+    """
+    cube, timeline = _job_features(cfgs[0], inputs)
+    selection_inputs = inputs.selection_inputs.setdefault(_selection_inputs_key(cfgs[0]), {})
+    weight_sets = {_cfg_key(cfg): cfg["selection"]["score_weights"] for cfg in cfgs}
+    out: dict[str, dict[pd.Timestamp, tuple]] = {key: {} for key in weight_sets}
+    for dt, pos in zip(dates, inputs.prices.index.get_indexer(dates)):
+        prepared = selection_inputs.get(dt)
+        if prepared is None:
+            prepared = selection_inputs.setdefault(dt, _prepare_selection(cfgs[0], inputs.prices.iloc[: pos + 1], cube, timeline))
+        weighted = weighted_scores(prepared["score_inputs"], weight_sets) if len(weight_sets) > 1 else {}
+        for cfg in cfgs:
+            key = _cfg_key(cfg)
+            out[key][dt] = _select_weights(cfg, None, cube, prepared, weighted.get(key))
+    return out
+
+
+def _run_backtest_job(cfg: dict, bt_cfg: BacktestConfig, end: pd.Timestamp | None, inputs: BacktestInputs, resume: BacktestResult | None = None) -> BacktestResult:
+    cube, timeline = _job_features(cfg, inputs)
+    decision_cache = inputs.decisions.setdefault(_cfg_key(cfg), {})
+    selection_inputs = inputs.selection_inputs.setdefault(_selection_inputs_key(cfg), {})
+    window_days = int(bt_cfg.adv_window_days)
+    if window_days not in inputs.adv_tables:
+        inputs.adv_tables.setdefault(window_days, _adv_table(inputs.volume_data, window_days))
+    window = inputs.prices if end is None else inputs.prices.loc[:end]
+    return _run_single_backtest(cfg, bt_cfg, window, inputs.prep_diagnostics, inputs.volume_data, cube, decision_cache, selection_inputs, timeline, inputs.adv_tables[window_days], resume)
+
+
+_WORKER_STATE: dict[str, Any] = {}
+
+
+def _init_backtest_worker(panel_path: str, prep_diagnostics: dict[str, Any], volume_data: pd.DataFrame | None) -> None:
+    _WORKER_STATE.clear()
+    _WORKER_STATE["inputs"] = BacktestInputs(load_price_panel(panel_path), prep_diagnostics, volume_data, panel_path=panel_path)
+
+
+def _backtest_worker(cfg: dict, bt_cfg: BacktestConfig, end: pd.Timestamp | None, resume: BacktestResult | None = None, release: bool = False) -> BacktestResult:
+    inputs = _WORKER_STATE["inputs"]
+    try:
+        return _run_backtest_job(cfg, bt_cfg, end, inputs, resume)
+    finally:
+        if release:
+            inputs.decisions.pop(_cfg_key(cfg), None)
+
+
+def _decision_worker(cfgs: list[dict], dates: list[pd.Timestamp]) -> dict[str, dict[pd.Timestamp, tuple]]:
+    inputs = _WORKER_STATE["inputs"]
+    # Blocks of dates are spread over the workers, so the per-date selection
+    # inputs would only be read back on another config's block.
+    inputs.selection_inputs.clear()
+    return _decide_dates(cfgs, inputs, dates)
+
+
+class BacktestExecutor:
+    """Runs independent single backtests serially, on threads or on processes.
+
+    Process workers map the price panel (the inputs' own panel, or a
+    temporary one) instead of receiving a pickled copy per task. With fewer
+    jobs than workers (a single daily run), the jobs' per-date selection
+    decisions are spread over the pool instead and the jobs then replay
+    their holding paths from the cached decisions in this process. Jobs
+    whose configs differ only in ``selection.score_weights`` (a run and its
+    legacy-weights comparison, weight-only sweep candidates) are decided
+    together the same way and replayed here as well.
+    """
+
+    def __init__(self, bt_cfg: BacktestConfig, inputs: BacktestInputs):
+        self.bt_cfg = bt_cfg
+        self.inputs = inputs
+        self.kind = str(bt_cfg.executor or "serial").strip().lower()
+        self.max_workers = int(bt_cfg.max_workers or 0) or (os.cpu_count() or 1)
+        self._pool = None
+        self._tmpdir: str | None = None
+
+    def _ensure_pool(self):
+        if self._pool is not None:
+            return self._pool
+        if self.kind == "thread":
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        elif self.kind == "process":
+            panel_path = self.inputs.panel_path
+            if panel_path is None:
+                self._tmpdir = tempfile.mkdtemp(prefix="druck-backtest-")
+                panel_path = str(write_price_panel(self.inputs.prices, Path(self._tmpdir) / "prices"))
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_backtest_worker,
+                initargs=(panel_path, self.inputs.prep_diagnostics, self.inputs.volume_data),
+            )
+        return self._pool
+
+    def _job(self, job: tuple) -> tuple[dict, BacktestConfig, pd.Timestamp | None, BacktestResult | None]:
+        cfg, end = job[0], job[1]
+        return cfg, (job[2] if len(job) > 2 and job[2] is not None else self.bt_cfg), end, (job[3] if len(job) > 3 else None)
+
+    def iter_results(self, jobs: list[tuple], release_decisions: bool = False) -> Iterator[tuple[int, BacktestResult | None, BaseException | None]]:
+        """Yield ``(job index, result, error)`` as jobs finish.
+
+        A job is ``(cfg, end)``, ``(cfg, end, bt_cfg)`` or ``(cfg, end,
+        bt_cfg, resume)``; ``end`` truncates the price panel for walk-forward
+        windows and ``resume`` is a stored run to extend. With
+        ``release_decisions`` a config's cached decisions are dropped once
+        its last job here has finished, so a batch of one-off configs (a
+        sweep) does not keep every candidate's decisions.
+        """
+        remaining: dict[str, int] = {}
+        if release_decisions:
+            for job in jobs:
+                key = _cfg_key(self._job(job)[0])
+                remaining[key] = remaining.get(key, 0) + 1
+
+        def finished(i: int) -> None:
+            if release_decisions:
+                key = _cfg_key(self._job(jobs[i])[0])
+                remaining[key] -= 1
+                if not remaining[key]:
+                    self.inputs.decisions.pop(key, None)
+
+        groups: dict[str, list[int]] = {}
+        for i, job in enumerate(jobs):
+            groups.setdefault(_selection_inputs_key(self._job(job)[0]), []).append(i)
+        weight_groups = {i: members for members in groups.values() if len({_cfg_key(self._job(jobs[j])[0]) for j in members}) > 1 for i in members}
+
+        remote: list[int] = []
+        if self.kind in {"thread", "process"}:
+            if len(jobs) < self.max_workers:
+                self.prefetch_decisions(jobs)
+            remote = [i for i, job in enumerate(jobs) if i not in weight_groups and self._missing_decisions(*self._job(job))]
+        futures = {}
+        if remote:
+            pool = self._ensure_pool()
+            for i in remote:
+                cfg, bt_cfg, end, resume = self._job(jobs[i])
+                if self.kind == "thread":
+                    futures[pool.submit(_run_backtest_job, cfg, bt_cfg, end, self.inputs, resume)] = i
+                else:
+                    futures[pool.submit(_backtest_worker, cfg, bt_cfg, end, resume, release_decisions)] = i
+        # Jobs whose decisions are all cached only replay their holding
+        # paths; that is cheap, so they run here while the pool works.
+        skip = set(remote)
+        for i, job in enumerate(jobs):
+            if i in skip:
+                continue
+            cfg, bt_cfg, end, resume = self._job(job)
+            if i in weight_groups and i == weight_groups[i][0]:
+                self.prefetch_decisions([jobs[j] for j in weight_groups[i]], local=True)
+            try:
+                result, error = _run_backtest_job(cfg, bt_cfg, end, self.inputs, resume), None
+            except Exception as exc:
+                result, error = None, exc
+            finished(i)
+            yield i, result, error
+        for future in as_completed(futures):
+            error = future.exception()
+            finished(futures[future])
+            yield futures[future], None if error is not None else future.result(), error
+
+    def _missing_decisions(self, cfg: dict, bt_cfg: BacktestConfig, end: pd.Timestamp | None, resume: BacktestResult | None = None) -> list[pd.Timestamp]:
+        index = self.inputs.prices.index if end is None else self.inputs.prices.index[self.inputs.prices.index <= end]
+        if index.empty:
+            return []
+        dates = list(index[_rebalance_positions(index, bt_cfg)])
+        if resume is not None:
+            dates = dates[max(_resume_point(resume, dates) - 1, 0) :]
+        cached = self.inputs.decisions.get(_cfg_key(cfg), {})
+        return [dt for dt in dates if dt not in cached]
+
+    def prefetch_decisions(self, jobs: list[tuple], min_block: int = 16, local: bool = False) -> int:
+        """Decide the jobs' uncached rebalance dates across the pool; returns how many.
+
+        Configs that share their selection inputs are decided together (see
+        ``_decide_dates``). Each group's dates are cut into one contiguous
+        block per worker (at least ``min_block`` dates, so small runs stay
+        in one task). Without a pool, or with fewer dates than two blocks,
+        nothing is decided unless ``local`` asks to decide in this process.
+        """
+        wanted: dict[str, tuple[dict[str, dict], set]] = {}
+        for job in jobs:
+            cfg = self._job(job)[0]
+            missing = self._missing_decisions(*self._job(job))
+            if missing:
+                group = wanted.setdefault(_selection_inputs_key(cfg), ({}, set()))
+                group[0][_cfg_key(cfg)] = cfg
+                group[1].update(missing)
+        total = sum(len(dates) for _cfgs, dates in wanted.values())
+        if self.kind not in {"thread", "process"} or total < 2 * min_block:
+            if not local:
+                return 0
+            for cfgs, dates in wanted.values():
+                try:
+                    self._store_decisions(_decide_dates(list(cfgs.values()), self.inputs, sorted(dates)))
+                except Exception:
+                    # Left to the jobs themselves, which report it.
+                    pass
+            return total
+        pool = self._ensure_pool()
+        futures = []
+        for cfgs, dates in wanted.values():
+            dates = sorted(dates)
+            size = max(min_block, -(-len(dates) // self.max_workers))
+            for lo in range(0, len(dates), size):
+                block = dates[lo : lo + size]
+                if self.kind == "thread":
+                    futures.append(pool.submit(_decide_dates, list(cfgs.values()), self.inputs, block))
+                else:
+                    futures.append(pool.submit(_decision_worker, list(cfgs.values()), block))
+        for future in as_completed(futures):
+            # A failing block is left to the job itself, which reports it.
+            if future.exception() is None:
+                self._store_decisions(future.result())
+        return total
+
+    def _store_decisions(self, decided: dict[str, dict[pd.Timestamp, tuple]]) -> None:
+        for key, decisions in decided.items():
+            self.inputs.decisions.setdefault(key, {}).update(decisions)
+
+    def run(self, jobs: list[tuple]) -> list[BacktestResult]:
+        results: list[BacktestResult | None] = [None] * len(jobs)
+        for i, result, error in self.iter_results(jobs):
+            if error is not None:
+                raise error
+            results[i] = result
+        return results
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors=True)
+            self._tmpdir = None
+
+    def __enter__(self) -> BacktestExecutor:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _walkforward_windows(index: pd.Index, wf_cfg: dict) -> list[tuple[pd.Timestamp, pd.Timestamp]]:
     train_days = int(wf_cfg.get("train_days", 252))
     test_days = int(wf_cfg.get("test_days", 63))
     step_days = int(wf_cfg.get("step_days", test_days))
-    rows: list[dict[str, Any]] = []
-    idx = prices.index
-
+    windows: list[tuple[pd.Timestamp, pd.Timestamp]] = []
     start_i = train_days
-    while start_i + test_days < len(idx):
-        test_start = idx[start_i]
-        test_end = idx[min(start_i + test_days, len(idx) - 1)]
-        segment = prices.loc[:test_end]
-        result = _run_single_backtest(cfg, bt_cfg, segment, prep_diagnostics, volume_data)
+    while start_i + test_days < len(index):
+        windows.append((index[start_i], index[min(start_i + test_days, len(index) - 1)]))
+        start_i += step_days
+    return windows
+
+
+def _slice_window_summary(result: BacktestResult, test_end: pd.Timestamp) -> dict[str, Any] | None:
+    # Only valid when a replay on prices.loc[:test_end] rebalances on the
+    # same dates (see _run_walkforward): its point-in-time decisions are then
+    # the same, so its path is the main path truncated at test_end.
+    log = result.rebalance_log
+    if log.empty or result.equity_curve.empty or log["date"].iloc[0] > test_end:
+        return None
+    summary = _compute_summary(result.equity_curve.loc[:test_end], result.daily_returns.loc[:test_end])
+    summary["halt_count"] = int(log.loc[log["date"] <= test_end, "strategy_halt"].sum())
+    return summary
+
+
+def _run_walkforward(cfg: dict, bt_cfg: BacktestConfig, inputs: BacktestInputs, result: BacktestResult | None = None, executor: BacktestExecutor | None = None) -> pd.DataFrame:
+    wf_cfg = cfg.get("backtest", {}).get("walkforward", {})
+    if not wf_cfg.get("enabled", False):
+        return pd.DataFrame()
+
+    mode = str(wf_cfg.get("mode", "single_pass") or "single_pass").strip().lower()
+    index = inputs.prices.index
+    windows = _walkforward_windows(index, wf_cfg)
+    summaries: list[dict[str, Any] | None] = [None] * len(windows)
+    if mode == "single_pass" and result is not None:
+        # A window is sliced from the main run only when the schedule on the
+        # truncated panel is the main schedule's prefix; otherwise (a period
+        # end that moves with the panel's last day) it is replayed.
+        schedule = rebalance_schedule(index, bt_cfg.rebalance_frequency, bt_cfg.rebalance_dates)
+        for i, (_test_start, test_end) in enumerate(windows):
+            head = rebalance_schedule(index[index <= test_end], bt_cfg.rebalance_frequency, bt_cfg.rebalance_dates)
+            if head.equals(schedule[schedule <= test_end]):
+                summaries[i] = _slice_window_summary(result, test_end)
+    replay = [i for i, summary in enumerate(summaries) if summary is None]
+    if replay:
+        own_executor = executor is None
+        executor = executor or BacktestExecutor(bt_cfg, inputs)
+        try:
+            replayed = executor.run([(cfg, windows[i][1]) for i in replay])
+        finally:
+            if own_executor:
+                executor.close()
+        for i, window_result in zip(replay, replayed):
+            summaries[i] = window_result.summary
+
+    rows: list[dict[str, Any]] = []
+    for (test_start, test_end), summary in zip(windows, summaries):
         rows.append(
             {
                 "test_start": test_start,
                 "test_end": test_end,
-                "total_return": result.summary.get("total_return", 0.0),
-                "cagr": result.summary.get("cagr", 0.0),
-                "sharpe": result.summary.get("sharpe", 0.0),
-                "max_drawdown": result.summary.get("max_drawdown", 0.0),
-                "halt_count": result.summary.get("halt_count", 0),
+                "total_return": summary.get("total_return", 0.0),
+                "cagr": summary.get("cagr", 0.0),
+                "sharpe": summary.get("sharpe", 0.0),
+                "max_drawdown": summary.get("max_drawdown", 0.0),
+                "halt_count": summary.get("halt_count", 0),
             }
         )
-        start_i += step_days
     return pd.DataFrame(rows)
 
 
@@ -707,8 +1406,12 @@ def _with_score_weights(cfg: dict, score_weights: dict[str, Any]) -> dict[str, A
     return cloned
 
 
-def run_backtest(cfg: dict, starting_capital: float | None = None) -> BacktestResult:
-    bt_cfg = BacktestConfig(
+def _legacy_cfg(cfg: dict) -> dict[str, Any]:
+    return _with_score_weights(cfg, _legacy_score_weights(cfg))
+
+
+def _backtest_config(cfg: dict, starting_capital: float | None = None) -> BacktestConfig:
+    return BacktestConfig(
         rebalance_frequency=str(cfg.get("backtest", {}).get("rebalance_frequency", "M")),
         transaction_cost_bps=float(cfg.get("backtest", {}).get("transaction_cost_bps", cfg.get("rebalance", {}).get("commission_bps", 1.5))),
         slippage_bps=float(cfg.get("backtest", {}).get("slippage_bps", 3.0)),
@@ -725,24 +1428,273 @@ def run_backtest(cfg: dict, starting_capital: float | None = None) -> BacktestRe
         adv_window_days=int(cfg.get("backtest", {}).get("adv_window_days", 20)),
         max_participation_rate=float(cfg.get("backtest", {}).get("max_participation_rate", 0.10)),
         capacity_safety_factor=float(cfg.get("backtest", {}).get("capacity_safety_factor", 0.25)),
+        executor=str(cfg.get("backtest", {}).get("executor", "serial") or "serial"),
+        max_workers=int(cfg.get("backtest", {}).get("max_workers", 0) or 0),
+        rebalance_dates=tuple(str(d) for d in cfg.get("backtest", {}).get("rebalance_dates", []) or []),
     )
 
+
+def _panel_key(tickers: list[str], start: str, end: str, prefer: str, bt_cfg: BacktestConfig, store_stamp: str = "") -> str:
+    # Everything that shapes the prepared panel; the end date rolls the key
+    # daily, and the file and store stamps whenever their contents change.
+    prep = {
+        "tickers": tickers,
+        "start": start,
+        "end": end,
+        "prefer": prefer,
+        "min_history_days": bt_cfg.min_history_days,
+        "strict_point_in_time": bt_cfg.strict_point_in_time,
+        "drop_incomplete_assets": bt_cfg.drop_incomplete_assets,
+        "enforce_delist_exit": bt_cfg.enforce_delist_exit,
+        "universe_timeline_path": bt_cfg.universe_timeline_path,
+        "universe_timeline": _file_stamp(bt_cfg.universe_timeline_path),
+        "store": store_stamp,
+    }
+    return hashlib.sha1(_cfg_key(prep).encode("utf-8")).hexdigest()[:16]
+
+
+def prepare_backtest_inputs(cfg: dict, bt_cfg: BacktestConfig | None = None) -> BacktestInputs:
+    bt_cfg = bt_cfg or _backtest_config(cfg)
     start, end = get_date_range(cfg["data"]["lookback_years"])
     u = make_universe(cfg)
     tickers = list(dict.fromkeys(u.kr + u.us))
     prefer = cfg["data"].get("price_provider", "auto")
     cache_dir = cfg["data"].get("cache_dir", ".cache")
     use_cache = bool(cfg["data"].get("cache_csv", True))
-    raw_prices = fetch_prices(tickers, start, end, prefer=prefer, cache_dir=cache_dir, use_cache=use_cache)
-    timeline = _load_universe_timeline(bt_cfg.universe_timeline_path)
     volume_data = _load_volume_data(bt_cfg.volume_data_path)
+
+    def stored_volume() -> pd.DataFrame | None:
+        # Without an explicit volume file, use the volumes fetched with the prices.
+        if volume_data is not None:
+            return volume_data
+        stored = fetch_volumes(tickers, start, end, prefer=prefer, cache_dir=cache_dir, **provider_options(cfg))
+        return stored if not stored.empty else None
+
+    panel_dir = str(cfg["data"].get("panel_dir", "") or "")
+    panel_path = None
+    if panel_dir:
+        store_stamp = price_store_stamp(tickers, prefer=prefer, cache_dir=cache_dir, **provider_options(cfg)) if use_cache else ""
+        panel_path = Path(panel_dir) / _panel_key(tickers, start, end, prefer, bt_cfg, store_stamp)
+        if (panel_path / "meta.json").exists():
+            meta = read_price_panel_meta(panel_path)["meta"]
+            # Mark the panel as used for the cache manager's LRU order.
+            os.utime(panel_path / "meta.json")
+            return BacktestInputs(load_price_panel(panel_path), meta["prep_diagnostics"], stored_volume(), panel_path=str(panel_path))
+
+    raw_prices = fetch_prices(tickers, start, end, prefer=prefer, cache_dir=cache_dir, use_cache=use_cache, **provider_options(cfg))
+    volume_data = stored_volume()
+    prune_cache(cfg)
+    timeline = _load_universe_timeline(bt_cfg.universe_timeline_path)
     prices, prep_diagnostics = _prepare_prices_for_backtest(raw_prices, bt_cfg, timeline)
 
     if prices.empty or len(prices) < bt_cfg.min_history_days + 5:
         raise RuntimeError("Not enough price history for backtest")
+    if panel_path is not None:
+        write_price_panel(prices, panel_path, meta={"prep_diagnostics": prep_diagnostics})
+        return BacktestInputs(load_price_panel(panel_path), prep_diagnostics, volume_data, panel_path=str(panel_path))
+    return BacktestInputs(prices, prep_diagnostics, volume_data)
+
+
+BACKTEST_CONFIG_SECTIONS = ("backtest", "data", "macro_filter", "rebalance", "risk_cut", "selection", "strategy_halt", "universe")
+# Where and how results are computed or cached, not what they are.
+_FINGERPRINT_IGNORED = {
+    "backtest": {"executor", "max_workers", "state_dir", "result_cache_dir", "result_cache_max_mb"},
+    "data": {"cache_csv", "cache_dir", "cache_max_mb", "cache_ttl_days", "memory_cache_max_mb", "memory_cache_ttl_seconds", "panel_dir"},
+}
+_RESULT_FRAMES = ("equity_curve", "daily_returns", "benchmark_curve", "rebalance_log", "walkforward_summary", "scenario_summary", "monitor_log")
+
+
+def backtest_fingerprint(cfg: dict, starting_capital: float | None = None) -> str:
+    """Hash of the config sections a backtest reads, plus the starting capital."""
+    relevant = {}
+    for section in BACKTEST_CONFIG_SECTIONS:
+        value = cfg.get(section)
+        ignored = _FINGERPRINT_IGNORED.get(section)
+        relevant[section] = {k: v for k, v in value.items() if k not in ignored} if ignored and isinstance(value, dict) else value
+    return hashlib.sha1(_cfg_key({"config": relevant, "starting_capital": starting_capital}).encode("utf-8")).hexdigest()[:16]
+
+
+@lru_cache(maxsize=1)
+def _code_version() -> str:
+    """Hash of the package's module sources, so a code change never serves an old result."""
+    digest = hashlib.sha1()
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        digest.update(path.name.encode("utf-8"))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _inputs_fingerprint(inputs: BacktestInputs) -> str:
+    """Hash of the prepared panel's dates, tickers and values, its diagnostics and volumes."""
+    digest = hashlib.sha1()
+    for frame in (inputs.prices, inputs.volume_data):
+        if frame is None:
+            digest.update(b"none")
+            continue
+        digest.update(pd.DatetimeIndex(frame.index).asi8.tobytes())
+        digest.update(_cfg_key([str(c) for c in frame.columns]).encode("utf-8"))
+        digest.update(np.ascontiguousarray(frame.to_numpy(dtype=float, na_value=np.nan)).tobytes())
+    digest.update(_cfg_key(inputs.prep_diagnostics).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def _result_cache(cfg: dict) -> ResultCache | None:
+    backtest = cfg.get("backtest", {}) or {}
+    root = str(backtest.get("result_cache_dir", "") or "")
+    return ResultCache(root, int(float(backtest.get("result_cache_max_mb", 0) or 0) * 1024 * 1024)) if root else None
+
+
+def _result_parts(result: BacktestResult) -> tuple[dict[str, Any], dict[str, Any]]:
+    return {name: getattr(result, name) for name in _RESULT_FRAMES}, {"summary": result.summary, "analytics": result.analytics}
+
 
-    result = _run_single_backtest(cfg, bt_cfg, prices, prep_diagnostics, volume_data)
-    walkforward = _run_walkforward(cfg, bt_cfg, prices, prep_diagnostics, volume_data)
+def _write_result(result: BacktestResult, path: str | Path) -> Path:
+    return write_result_frames(path, *_result_parts(result))
+
+
+def _read_result(path: str | Path) -> BacktestResult:
+    frames, payload = read_result_frames(path)
+    return BacktestResult(summary=payload["summary"], analytics=payload["analytics"], **frames)
+
+
+def _extend_history(stored: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame | None:
+    """``stored`` followed by the rows of ``fresh`` after its last date.
+
+    Returns None when the two disagree on any shared day (a revised price, a
+    new ticker, a missing or inserted date). A column's leading gap in
+    ``fresh`` is not compared: it can be history the stored panel
+    forward-filled from before the fresh window.
+    """
+    if fresh.empty or stored.empty or fresh.index[0] > stored.index[-1] or not set(fresh.columns) <= set(stored.columns):
+        return None
+    fresh = fresh.reindex(columns=stored.columns)
+    shared = fresh.index[fresh.index <= stored.index[-1]]
+    if not shared.equals(stored.index[stored.index >= fresh.index[0]]):
+        return None
+    old = stored.loc[shared].to_numpy(dtype=float, na_value=np.nan)
+    new = fresh.loc[shared].to_numpy(dtype=float, na_value=np.nan)
+    leading = np.cumsum(~np.isnan(new), axis=0) == 0
+    if not (np.isclose(old, new, rtol=1e-9, atol=0.0, equal_nan=True) | leading).all():
+        return None
+    added = fresh.loc[fresh.index > stored.index[-1]]
+    return pd.concat([stored, added]) if len(added) else stored
+
+
+def _backtest_state_path(cfg: dict, starting_capital: float | None = None) -> Path:
+    state_dir = str(cfg.get("backtest", {}).get("state_dir", "") or ".cache/backtest_state")
+    return Path(state_dir) / backtest_fingerprint(cfg, starting_capital)
+
+
+def _load_backtest_state(path: Path, cfg: dict, fresh: BacktestInputs) -> tuple[BacktestInputs, BacktestResult, BacktestResult] | None:
+    """The stored panel extended with ``fresh``'s new days, and the stored main and legacy runs.
+
+    Returns None, which means a full rebuild, when there is no readable
+    state, it was written by other package source, the stored history no
+    longer matches the fresh data, or it reaches more than
+    ``TIMELINE_WARMUP_ROWS`` days back before the fresh window.
+    """
+    try:
+        state = json.loads((path / "state.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if state.get("code_version") != _code_version():
+        return None
+    try:
+        prices = load_price_panel(path / "prices", mmap=False)
+        volumes = load_price_panel(path / "volumes", mmap=False) if (path / "volumes").exists() else None
+        result = _read_result(path / "main")
+        legacy_result = _read_result(path / "legacy")
+    except (OSError, ValueError, KeyError, pa.ArrowException):
+        return None
+    # Rebasing on the fresh window once the stored start falls a warm-up
+    # behind keeps the panel at the lookback plus at most that warm-up.
+    if int(prices.index.searchsorted(fresh.prices.index[0])) > TIMELINE_WARMUP_ROWS:
+        return None
+    prices = _extend_history(prices, fresh.prices)
+    if prices is None or (volumes is None) != (fresh.volume_data is None):
+        return None
+    if volumes is not None:
+        volumes = _extend_history(volumes, fresh.volume_data)
+        if volumes is None:
+            return None
+    inputs = BacktestInputs(prices, fresh.prep_diagnostics, volumes)
+    macro_cfg = cfg.get("macro_filter", {})
+    inputs.regime_timelines[_cfg_key(macro_cfg)] = update_regime_timeline(prices, path / "regime_timeline.parquet", macro_cfg["thresholds"], macro_cfg["components"], macro_cfg.get("rates_overlay", {}))
+    return inputs, result, legacy_result
+
+
+def _save_backtest_state(path: Path, cfg: dict, inputs: BacktestInputs, result: BacktestResult, legacy_result: BacktestResult) -> None:
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    write_price_panel(inputs.prices, tmp / "prices", meta={"prep_diagnostics": inputs.prep_diagnostics})
+    if inputs.volume_data is not None:
+        write_price_panel(inputs.volume_data, tmp / "volumes")
+    _write_result(result, tmp / "main")
+    _write_result(legacy_result, tmp / "legacy")
+    # Process workers build their own timeline, so the parent may not hold one.
+    macro_cfg = cfg.get("macro_filter", {})
+    timeline = inputs.regime_timelines.get(_cfg_key(macro_cfg))
+    if timeline is None:
+        timeline = _build_regime_timeline(cfg, inputs.prices)
+    timeline.assign(config_key=regime_timeline_key(macro_cfg["thresholds"], macro_cfg["components"], macro_cfg.get("rates_overlay", {}))).to_parquet(tmp / "regime_timeline.parquet")
+    log = result.rebalance_log
+    state = {
+        "fingerprint": path.name,
+        "code_version": _code_version(),
+        "last_date": str(result.equity_curve.index[-1].date()) if not result.equity_curve.empty else None,
+        "last_rebalance": str(log["date"].iloc[-1].date()) if not log.empty else None,
+        "equity": float(result.equity_curve.iloc[-1]) if not result.equity_curve.empty else None,
+        "weights": log["weights"].iloc[-1] if not log.empty else {},
+    }
+    (tmp / "state.json").write_text(json.dumps(state, indent=2), encoding="utf-8")
+    replace_directory(tmp, path)
+
+
+def run_backtest(cfg: dict, starting_capital: float | None = None, inputs: BacktestInputs | None = None, incremental: bool = False) -> BacktestResult:
+    """Run the backtest and its legacy-weights comparison.
+
+    With ``incremental`` the state stored under ``backtest.state_dir`` for
+    this config fingerprint is extended with the days the fresh data adds,
+    and only those days and the rebalances they trigger are replayed, on the
+    stored regime timeline extended by the same days. The stored run keeps
+    its start date until the lookback window has rolled a warm-up past it.
+    Without usable state (first run, other config or source, revised
+    history, rolled window) it runs in full and stores the state.
+
+    With ``backtest.result_cache_dir`` set, a result is also stored under a
+    hash of the config fingerprint, the prepared inputs and the package
+    source, and returned from there when all three match again.
+    """
+    bt_cfg = _backtest_config(cfg, starting_capital)
+    if inputs is None:
+        inputs = prepare_backtest_inputs(cfg, bt_cfg)
+
+    state_path = _backtest_state_path(cfg, starting_capital) if incremental else None
+    resume = legacy_resume = None
+    if state_path is not None:
+        state = _load_backtest_state(state_path, cfg, inputs)
+        if state is not None:
+            inputs, resume, legacy_resume = state
+            if not resume.equity_curve.empty and resume.equity_curve.index[-1] == inputs.prices.index[-1]:
+                return resume
+
+    # Content-addressed: the same config sections, prepared data and code
+    # always produce the same result, whichever caller asks.
+    cache = _result_cache(cfg)
+    cache_key = None
+    if cache is not None:
+        cache_key = hashlib.sha1(f"{backtest_fingerprint(cfg, starting_capital)}:{_inputs_fingerprint(inputs)}:{_code_version()}".encode("utf-8")).hexdigest()[:24]
+        hit = cache.get(cache_key)
+        if hit is not None:
+            try:
+                return _read_result(hit)
+            except (OSError, ValueError, KeyError, pa.ArrowException):
+                pass
+
+    legacy_cfg = _legacy_cfg(cfg)
+    with BacktestExecutor(bt_cfg, inputs) as executor:
+        result, legacy_result = executor.run([(cfg, None, None, resume), (legacy_cfg, None, None, legacy_resume)])
+        walkforward = _run_walkforward(cfg, bt_cfg, inputs, result, executor)
     result.walkforward_summary = walkforward
     if result.analytics is None:
         result.analytics = {}
@@ -751,9 +1703,6 @@ def run_backtest(cfg: dict, starting_capital: float | None = None) -> BacktestRe
         result.analytics["walkforward_avg_return"] = float(walkforward["total_return"].mean())
         result.analytics["walkforward_avg_sharpe"] = float(walkforward["sharpe"].mean())
 
-    legacy_cfg = _with_score_weights(cfg, _legacy_score_weights(cfg))
-    legacy_result = _run_single_backtest(legacy_cfg, bt_cfg, prices, prep_diagnostics, volume_data)
-
     enhanced_scenarios = result.scenario_summary.set_index("scenario") if result.scenario_summary is not None and not result.scenario_summary.empty else pd.DataFrame()
     legacy_scenarios = legacy_result.scenario_summary.set_index("scenario") if legacy_result.scenario_summary is not None and not legacy_result.scenario_summary.empty else pd.DataFrame()
     shared_scenarios = sorted(set(enhanced_scenarios.index) & set(legacy_scenarios.index)) if not enhanced_scenarios.empty and not legacy_scenarios.empty else []
@@ -806,4 +1755,14 @@ def run_backtest(cfg: dict, starting_capital: float | None = None) -> BacktestRe
         "worst_scenario_total_return_delta": worst_delta,
         "robustness_summary": robustness_summary,
     }
+    if state_path is not None:
+        try:
+            _save_backtest_state(state_path, cfg, inputs, result, legacy_result)
+        except OSError:
+            pass
+    if cache is not None:
+        try:
+            cache.put(cache_key, *_result_parts(result))
+        except OSError:
+            pass
     return result
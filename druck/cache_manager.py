@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+import shutil
+
+from .price_cache import PriceCache
+
+MB = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class CacheItem:
+    kind: str  # "price", "panel" or "legacy"
+    key: str
+    path: Path
+    bytes: int
+    last_access: datetime
+    hits: int = 0
+
+
+def _parse_time(value: Any, fallback: float) -> datetime:
+    if value:
+        try:
+            stamp = datetime.fromisoformat(str(value))
+            return stamp if stamp.tzinfo else stamp.replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return datetime.fromtimestamp(fallback, tz=timezone.utc)
+
+
+def _tree_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+@dataclass
+class CacheManager:
+    """Size budget and eviction for the price cache and prepared panels.
+
+    Price entries come from the :class:`PriceCache` index, so no file name
+    is probed on disk; panels count as used when their ``meta.json`` was
+    last touched. ``prune`` drops entries idle for longer than ``ttl_days``
+    and then the least recently used ones until the total fits
+    ``max_bytes``. A zero budget or TTL disables that rule.
+    """
+
+    cache_dir: str | Path
+    max_bytes: int = 0
+    ttl_days: float = 0
+    panel_dir: str | Path | None = None
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "CacheManager":
+        data_cfg = cfg.get("data", {}) or {}
+        return cls(
+            cache_dir=data_cfg.get("cache_dir", ".cache"),
+            max_bytes=int(float(data_cfg.get("cache_max_mb", 0) or 0) * MB),
+            ttl_days=float(data_cfg.get("cache_ttl_days", 0) or 0),
+            panel_dir=data_cfg.get("panel_dir") or None,
+        )
+
+    def items(self) -> list[CacheItem]:
+        cache = PriceCache(self.cache_dir)
+        cache.flush_hits()
+        items: list[CacheItem] = []
+        for ticker, entry in cache.manifest.items():
+            path = cache.root / entry["file"]
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            items.append(CacheItem("price", ticker, path, int(entry.get("bytes") or stat.st_size), _parse_time(entry.get("last_access"), stat.st_mtime), int(entry.get("hits", 0))))
+        if self.panel_dir:
+            root = Path(self.panel_dir)
+            for meta in sorted(root.glob("*/meta.json")) if root.is_dir() else []:
+                panel = meta.parent
+                if panel.name.startswith("."):
+                    continue
+                items.append(CacheItem("panel", panel.name, panel, _tree_bytes(panel), _parse_time(None, meta.stat().st_mtime)))
+        for legacy in sorted(Path(self.cache_dir).glob("px_*.csv")):
+            stat = legacy.stat()
+            items.append(CacheItem("legacy", legacy.name, legacy, stat.st_size, _parse_time(None, stat.st_mtime)))
+        return items
+
+    def stats(self) -> dict[str, Any]:
+        items = self.items()
+        kinds: dict[str, dict[str, int]] = {}
+        for item in items:
+            bucket = kinds.setdefault(item.kind, {"entries": 0, "bytes": 0, "hits": 0})
+            bucket["entries"] += 1
+            bucket["bytes"] += item.bytes
+            bucket["hits"] += item.hits
+        return {
+            "cache_dir": str(self.cache_dir),
+            "panel_dir": str(self.panel_dir) if self.panel_dir else None,
+            "entries": len(items),
+            "bytes": sum(item.bytes for item in items),
+            "max_bytes": self.max_bytes,
+            "ttl_days": self.ttl_days,
+            "kinds": kinds,
+            "oldest": min((item.last_access for item in items), default=None),
+            "top": [(item.key, item.hits) for item in sorted(items, key=lambda i: -i.hits)[:10] if item.hits],
+        }
+
+    def prune(self, now: datetime | None = None, dry_run: bool = False) -> list[CacheItem]:
+        """Evict expired entries, then LRU entries over budget; returns what was (or would be) removed."""
+        now = now or datetime.now(timezone.utc)
+        items = sorted(self.items(), key=lambda item: item.last_access)
+        victims: list[CacheItem] = []
+        if self.ttl_days > 0:
+            horizon = self.ttl_days * 86400
+            victims = [item for item in items if (now - item.last_access).total_seconds() > horizon]
+        if self.max_bytes > 0:
+            chosen = {id(item) for item in victims}
+            total = sum(item.bytes for item in items) - sum(item.bytes for item in victims)
+            for item in items:
+                if total <= self.max_bytes:
+                    break
+                if id(item) not in chosen:
+                    victims.append(item)
+                    total -= item.bytes
+        if not dry_run and victims:
+            self._remove(victims)
+        return victims
+
+    def _remove(self, victims: list[CacheItem]) -> None:
+        prices = [item.key for item in victims if item.kind == "price"]
+        if prices:
+            PriceCache(self.cache_dir).evict(prices)
+        for item in victims:
+            if item.kind == "panel":
+                shutil.rmtree(item.path, ignore_errors=True)
+            elif item.kind == "legacy":
+                item.path.unlink(missing_ok=True)
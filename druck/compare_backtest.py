@@ -5,7 +5,7 @@ from pathlib import Path
 from typing import Any
 import json
 
-from .backtest import BacktestResult, run_backtest
+from .backtest import BacktestExecutor, BacktestResult, _backtest_config, _legacy_cfg, prepare_backtest_inputs, run_backtest
 
 
 def build_baseline_cfg(cfg: dict[str, Any], us_only: bool = True) -> dict[str, Any]:
@@ -80,6 +80,8 @@ def write_comparison_outputs(outdir: str | Path, payload: dict[str, Any], new_re
             encoding="utf-8",
         )
         result.rebalance_log.to_csv(out / f"{name}_rebalance_log.csv", index=False)
+        if result.monitor_log is not None:
+            result.monitor_log.to_csv(out / f"{name}_monitor_log.csv", index=False)
         result.equity_curve.to_csv(out / f"{name}_equity_curve.csv", header=["equity"])
 
     return out / "scoring_comparison.json"
@@ -97,8 +99,16 @@ def run_scoring_comparison(cfg: dict[str, Any], outdir: str | Path, us_only: boo
         current_cfg["universe"]["kr"]["include_leveraged"] = False
         current_cfg["universe"]["kr"]["include_inverse"] = False
 
-    new_result = run_backtest(current_cfg)
-    base_result = run_backtest(baseline_cfg)
+    # Both configs share universe, data and backtest settings, so prices are
+    # fetched once and cached features are reused by the baseline run.
+    inputs = prepare_backtest_inputs(current_cfg)
+    # Each run also replays its legacy weights. Where the baseline only
+    # changes score weights, all four runs are decided on one z-matrix per
+    # date and the two backtests below replay from those decisions.
+    with BacktestExecutor(_backtest_config(current_cfg), inputs) as executor:
+        executor.prefetch_decisions([(c, None) for c in (current_cfg, _legacy_cfg(current_cfg), baseline_cfg, _legacy_cfg(baseline_cfg))], local=True)
+    new_result = run_backtest(current_cfg, inputs=inputs)
+    base_result = run_backtest(baseline_cfg, inputs=inputs)
     payload = summarize_comparison(new_result, base_result)
     output_path = write_comparison_outputs(outdir, payload, new_result, base_result)
     return {"payload": payload, "output_path": str(output_path)}
@@ -3,6 +3,7 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any
 
+import pandas as pd
 import yaml
 
 
@@ -77,6 +78,32 @@ def _validate_weights_sum(weights: dict[str, Any], ctx: str):
         raise ConfigError(f"Weight sum must be > 0 in {ctx}")
 
 
+def _validate_rebalance_calendar(backtest: dict[str, Any]) -> None:
+    frequency = str(_require(backtest, "rebalance_frequency", "config.backtest")).strip()
+    key = frequency.lower()
+    dates = backtest.get("rebalance_dates", []) or []
+    if not isinstance(dates, list):
+        raise ConfigError("config.backtest.rebalance_dates must be a list")
+    if key in {"daily", "weekly", "monthly"} or frequency == "M":
+        return
+    if key.startswith("month_end-"):
+        if not key.split("-", 1)[1].isdigit():
+            raise ConfigError("config.backtest.rebalance_frequency month_end-N needs a whole number of trading days")
+        return
+    if key == "custom":
+        if not dates:
+            raise ConfigError("config.backtest.rebalance_dates must list dates when rebalance_frequency is custom")
+        try:
+            pd.to_datetime([str(d) for d in dates])
+        except (TypeError, ValueError) as exc:
+            raise ConfigError(f"config.backtest.rebalance_dates has an invalid date: {exc}") from exc
+        return
+    try:
+        pd.tseries.frequencies.to_offset(frequency)
+    except ValueError as exc:
+        raise ConfigError(f"config.backtest.rebalance_frequency must be daily, weekly, monthly, month_end-N, custom or a pandas offset: {frequency}") from exc
+
+
 def validate_config(cfg: dict[str, Any]) -> AppConfig:
     if not isinstance(cfg, dict):
         raise ConfigError("Config root must be a mapping")
@@ -102,8 +129,21 @@ def validate_config(cfg: dict[str, Any]) -> AppConfig:
     _require_bool(data, "cache_csv", "config.data")
     _require(data, "cache_dir", "config.data")
     provider = _require(data, "price_provider", "config.data")
-    if provider not in {"auto", "yf", "fdr"}:
-        raise ConfigError("config.data.price_provider must be one of: auto, yf, fdr")
+    if provider not in {"auto", "yf", "fdr", "local"}:
+        raise ConfigError("config.data.price_provider must be one of: auto, yf, fdr, local")
+    for key in ("local_root", "panel_dir"):
+        if key in data and not isinstance(data.get(key), str):
+            raise ConfigError(f"config.data.{key} must be a string")
+    for key in ("cache_max_mb", "cache_ttl_days", "memory_cache_ttl_seconds", "memory_cache_max_mb"):
+        if key in data and _require_number(data, key, "config.data") < 0:
+            raise ConfigError(f"config.data.{key} must be >= 0")
+    fdr_cfg = data.get("fdr", {})
+    if fdr_cfg:
+        if not isinstance(fdr_cfg, dict):
+            raise ConfigError("config.data.fdr must be a mapping")
+        for key, minimum in [("max_workers", 1), ("rate_per_sec", 0), ("max_retries", 0), ("backoff_seconds", 0)]:
+            if key in fdr_cfg and _require_number(fdr_cfg, key, "config.data.fdr") < minimum:
+                raise ConfigError(f"config.data.fdr.{key} must be >= {minimum}")
 
     kr = _require_dict(universe, "kr", "config.universe")
     us = _require_dict(universe, "us", "config.universe")
@@ -112,6 +152,8 @@ def validate_config(cfg: dict[str, Any]) -> AppConfig:
     for key in ["whitelist_tickers", "blacklist_tickers"]:
         if not isinstance(_require(kr, key, "config.universe.kr"), list):
             raise ConfigError(f"config.universe.kr.{key} must be a list")
+    if "listing_cache_hours" in kr and _require_number(kr, "listing_cache_hours", "config.universe.kr") < 0:
+        raise ConfigError("config.universe.kr.listing_cache_hours must be >= 0")
     if not isinstance(_require(us, "tickers", "config.universe.us"), list):
         raise ConfigError("config.universe.us.tickers must be a list")
 
@@ -273,6 +315,8 @@ def validate_config(cfg: dict[str, Any]) -> AppConfig:
     for key in ["spy_trend_weight", "usd_mom_weight", "credit_weight", "vix_weight", "rates_weight"]:
         _require_number(components, key, "config.macro_filter.components")
     _validate_weights_sum(components, "config.macro_filter.components")
+    if not isinstance(macro_filter.get("timeline_path", ""), str):
+        raise ConfigError("config.macro_filter.timeline_path must be a string")
     rates_overlay_cfg = macro_filter.get("rates_overlay", {})
     if rates_overlay_cfg:
         if not isinstance(rates_overlay_cfg, dict):
@@ -304,7 +348,7 @@ def validate_config(cfg: dict[str, Any]) -> AppConfig:
     if commission_bps < 0:
         raise ConfigError("config.rebalance.commission_bps must be >= 0")
 
-    _require(backtest, "rebalance_frequency", "config.backtest")
+    _validate_rebalance_calendar(backtest)
     for key in [
         "transaction_cost_bps",
         "slippage_bps",
@@ -322,6 +366,11 @@ def validate_config(cfg: dict[str, Any]) -> AppConfig:
     _require(backtest, "benchmark_ticker", "config.backtest")
     _require(backtest, "universe_timeline_path", "config.backtest")
     _require(backtest, "volume_data_path", "config.backtest")
+    for key in ("state_dir", "result_cache_dir"):
+        if key in backtest and not isinstance(backtest.get(key), str):
+            raise ConfigError(f"config.backtest.{key} must be a string")
+    if "result_cache_max_mb" in backtest and _require_number(backtest, "result_cache_max_mb", "config.backtest") < 0:
+        raise ConfigError("config.backtest.result_cache_max_mb must be >= 0")
     scenarios = _require_dict(backtest, "scenarios", "config.backtest")
     _require_bool(scenarios, "enabled", "config.backtest.scenarios")
     _require_number(scenarios, "stress_return_shock", "config.backtest.scenarios")
@@ -353,6 +402,20 @@ def validate_config(cfg: dict[str, Any]) -> AppConfig:
         value = _require_number(walkforward, key, "config.backtest.walkforward")
         if value < 1:
             raise ConfigError(f"config.backtest.walkforward.{key} must be >= 1")
+    if str(walkforward.get("mode", "single_pass")) not in {"single_pass", "replay"}:
+        raise ConfigError("config.backtest.walkforward.mode must be one of: single_pass, replay")
+    monitoring = backtest.get("monitoring", {}) or {}
+    if not isinstance(monitoring, dict):
+        raise ConfigError("Config section must be a mapping: config.backtest.monitoring")
+    for key in ["enabled", "risk_cuts"]:
+        if key in monitoring:
+            _require_bool(monitoring, key, "config.backtest.monitoring")
+    if "drift_band" in monitoring and not 0 <= _require_number(monitoring, "drift_band", "config.backtest.monitoring") <= 1:
+        raise ConfigError("config.backtest.monitoring.drift_band must be between 0 and 1")
+    if str(backtest.get("executor", "serial")) not in {"serial", "thread", "process"}:
+        raise ConfigError("config.backtest.executor must be one of: serial, thread, process")
+    if "max_workers" in backtest and _require_number(backtest, "max_workers", "config.backtest") < 0:
+        raise ConfigError("config.backtest.max_workers must be >= 0")
     if _require_number(backtest, "adv_window_days", "config.backtest") < 1:
         raise ConfigError("config.backtest.adv_window_days must be >= 1")
     max_participation_rate = _require_number(backtest, "max_participation_rate", "config.backtest")
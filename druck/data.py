@@ -1,14 +1,28 @@
 from __future__ import annotations
+import ast
 import contextlib
 import hashlib
 import io
+import json
 import os
 import re
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import date, timedelta
-from typing import Any, List, Optional, Tuple
+from pathlib import Path
+from typing import Any, List, Optional, Protocol, Tuple
 import pandas as pd
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .market_data import MarketDataLayout
+from .price_cache import PRICE_MEMORY, PriceCache
+from .price_panel import load_price_panel, read_price_panel_meta, write_price_panel
+from .storage import StorageLayout
+from .utils_rate import TokenBucket
 
 # 공유 시장 데이터 로더
 _SHARED_DATA_IMPORT_ERROR = None
@@ -48,9 +62,19 @@ def _cache_key(tickers: List[str], start: str, end: str) -> str:
     return f"px_{digest}_{start}_{end}.csv"
 
 
-def generate_kr_etf_universe(whitelist: Optional[List[str]]=None, blacklist: Optional[List[str]]=None) -> List[str]:
-    whitelist = whitelist or []
-    blacklist = set(blacklist or [])
+KR_ETF_LISTING_CACHE = "kr_etf_tickers.json"
+_LISTING_REFRESH = threading.Lock()
+
+
+def _listing_codes(df: pd.DataFrame) -> List[str]:
+    code_col = next((c for c in ['Symbol', 'Code', '종목코드', 'code'] if c in df.columns), None)
+    if code_col is None:
+        return []
+    raw = df[code_col].dropna().astype(str).str.strip().tolist()
+    return [t.zfill(6)+'.KS' if not t.endswith('.KS') else t for t in raw if t]
+
+
+def _fetch_kr_etf_tickers() -> List[str]:
     tickers: List[str] = []
     try:
         import FinanceDataReader as fdr
@@ -58,13 +82,7 @@ def generate_kr_etf_universe(whitelist: Optional[List[str]]=None, blacklist: Opt
             df = fdr.StockListing('ETF/KR')
         except Exception:
             df = fdr.StockListing('KRX')
-        code_col = None
-        for c in ['Symbol','Code','종목코드','code']:
-            if c in df.columns:
-                code_col = c; break
-        if code_col:
-            raw = df[code_col].astype(str).tolist()
-            tickers = [t.zfill(6)+'.KS' if not t.endswith('.KS') else t for t in raw]
+        tickers = _listing_codes(df)
     except Exception:
         pass
     if not tickers:
@@ -74,6 +92,75 @@ def generate_kr_etf_universe(whitelist: Optional[List[str]]=None, blacklist: Opt
             tickers = [t+'.KS' for t in raw]
         except Exception:
             pass
+    return tickers
+
+
+def _read_listing_cache(path: Path) -> tuple[List[str], float] | None:
+    try:
+        payload = json.loads(path.read_text(encoding='utf-8'))
+        codes = payload['codes']
+        return ([f"{c}.KS" for c in codes.split(',')] if codes else []), float(payload['fetched_at'])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_listing_cache(path: Path, tickers: List[str], fetched_at: float, source: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    codes = ','.join(t[:-3] if t.endswith('.KS') else t for t in tickers)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+    tmp.write_text(json.dumps({'fetched_at': fetched_at, 'source': source, 'codes': codes}), encoding='utf-8')
+    tmp.replace(path)
+
+
+def _refresh_listing_cache(path: Path) -> None:
+    try:
+        tickers = _fetch_kr_etf_tickers()
+        if tickers:
+            _write_listing_cache(path, tickers, time.time(), 'live')
+    finally:
+        _LISTING_REFRESH.release()
+
+
+def cached_kr_etf_tickers(cache_dir: str, max_age_hours: float, local_root: Optional[str] = None) -> List[str]:
+    """KR ETF tickers from ``<cache_dir>/listings/kr_etf_tickers.json``.
+
+    A missing cache is seeded from the collector's ``listings/kr_etf.parquet``
+    under ``local_root`` when present, otherwise from the live listing. Once
+    the cache is older than ``max_age_hours`` the stale list is still returned
+    and one background thread refreshes it, so a slow or offline listing API
+    never blocks universe generation.
+    """
+    path = Path(cache_dir) / 'listings' / KR_ETF_LISTING_CACHE
+    cached = _read_listing_cache(path)
+    if cached is None:
+        collected = MarketDataLayout(StorageLayout(Path(local_root or '.')).parquet_root).listings_root / 'kr_etf.parquet'
+        if collected.exists():
+            try:
+                tickers = _listing_codes(pd.read_parquet(collected))
+            except Exception:
+                tickers = []
+            if tickers:
+                cached = tickers, collected.stat().st_mtime
+                _write_listing_cache(path, tickers, cached[1], 'collector')
+    if cached is None:
+        tickers = _fetch_kr_etf_tickers()
+        if tickers:
+            _write_listing_cache(path, tickers, time.time(), 'live')
+        return tickers
+    tickers, fetched_at = cached
+    if time.time() - fetched_at > max_age_hours * 3600 and _LISTING_REFRESH.acquire(blocking=False):
+        threading.Thread(target=_refresh_listing_cache, args=(path,), name='kr-etf-listing-refresh', daemon=True).start()
+    return tickers
+
+
+def generate_kr_etf_universe(whitelist: Optional[List[str]]=None, blacklist: Optional[List[str]]=None, cache_dir: Optional[str] = None, max_age_hours: float = 0, local_root: Optional[str] = None) -> List[str]:
+    """KR ETF universe; with ``cache_dir`` and ``max_age_hours`` the listing comes from :func:`cached_kr_etf_tickers`."""
+    whitelist = whitelist or []
+    blacklist = set(blacklist or [])
+    if cache_dir and max_age_hours > 0:
+        tickers = cached_kr_etf_tickers(cache_dir, max_age_hours, local_root)
+    else:
+        tickers = _fetch_kr_etf_tickers()
     tickers = [t for t in tickers if t not in blacklist]
     out = list(dict.fromkeys(tickers + whitelist))
     return out
@@ -82,9 +169,13 @@ def make_universe(cfg: dict) -> Universe:
     ucfg = cfg['universe']
     kr_cfg = ucfg['kr']
     if kr_cfg.get('auto_generate', True):
+        data_cfg = cfg.get('data', {}) or {}
         kr = generate_kr_etf_universe(
             whitelist=kr_cfg.get('whitelist_tickers', []),
             blacklist=kr_cfg.get('blacklist_tickers', []),
+            cache_dir=data_cfg.get('cache_dir', '.cache'),
+            max_age_hours=float(kr_cfg.get('listing_cache_hours', 0) or 0),
+            local_root=data_cfg.get('local_root') or None,
         )
     else:
         kr = list(dict.fromkeys(kr_cfg.get('tickers', []) + kr_cfg.get('whitelist_tickers', [])))
@@ -104,34 +195,154 @@ def make_universe(cfg: dict) -> Universe:
     )
 
 def fetch_prices_yf(tickers: List[str], start: str, end: str) -> tuple[pd.DataFrame, str]:
+    """Closes for ``tickers``; the matching volumes ride along in ``attrs["volume"]``."""
     import yfinance as yf
     stderr_buffer = io.StringIO()
     with contextlib.redirect_stderr(stderr_buffer):
-        df = yf.download(tickers, start=start, end=end, auto_adjust=True, progress=False)['Close']
+        raw = yf.download(tickers, start=start, end=end, auto_adjust=True, progress=False)
+    df = raw['Close']
     if isinstance(df, pd.Series):
         df = df.to_frame()
-    return df.dropna(how='all'), stderr_buffer.getvalue().strip()
+    df = df.dropna(how='all')
+    if 'Volume' in raw:
+        volume = raw['Volume']
+        volume = volume.to_frame() if isinstance(volume, pd.Series) else volume
+        df.attrs["volume"] = volume.reindex(index=df.index, columns=df.columns)
+    return df, stderr_buffer.getvalue().strip()
+
+def _fdr_bars(fdr, ticker: str, start: str, end: str) -> tuple[pd.Series, pd.Series | None] | None:
+    provider_ticker = str(ticker)
+    if provider_ticker.endswith('.KS'):
+        provider_ticker = provider_ticker[:-3]
+    s = fdr.DataReader(provider_ticker, start, end)
+    if s is None or len(s) == 0:
+        return None
+    col = 'Close' if 'Close' in s.columns else ('close' if 'close' in s.columns else None)
+    if not col:
+        return None
+    vol_col = 'Volume' if 'Volume' in s.columns else ('volume' if 'volume' in s.columns else None)
+    return s[col], (s[vol_col] if vol_col else None)
+
+
+def fetch_prices_fdr(tickers: List[str], start: str, end: str, max_workers: int = 4, rate_per_sec: float = 5.0, max_retries: int = 3, backoff_seconds: float = 1.0) -> pd.DataFrame:
+    """Download closes per ticker on a bounded thread pool.
 
-def fetch_prices_fdr(tickers: List[str], start: str, end: str) -> pd.DataFrame:
+    All workers share one token bucket. A rate-limited ticker slows the
+    bucket down and retries with exponential backoff; any other failure is
+    recorded for that ticker in ``attrs["provider_issues"]`` and the rest of
+    the batch continues. Volumes, when the provider has them, are kept in
+    ``attrs["volume"]``.
+    """
     import FinanceDataReader as fdr
-    out={}
-    for t in tickers:
+    limiter = TokenBucket(rate_per_sec)
+
+    def fetch_one(ticker: str) -> tuple[tuple[pd.Series, pd.Series | None] | None, ProviderIssue | None]:
+        for attempt in range(int(max_retries) + 1):
+            limiter.wait()
+            try:
+                series = _fdr_bars(fdr, ticker, start, end)
+            except Exception as exc:
+                detail = str(exc)
+                category = _classify_provider_issue(detail)
+                if category == "rate_limit" and attempt < int(max_retries):
+                    limiter.slow_down()
+                    time.sleep(float(backoff_seconds) * (2 ** attempt))
+                    continue
+                return None, ProviderIssue(provider="fdr", category=category, detail=f"{ticker}: {detail}", tickers=[str(ticker)])
+            limiter.recover()
+            return series, None
+        return None, None
+
+    tickers = list(tickers)
+    if int(max_workers) > 1 and len(tickers) > 1:
+        with ThreadPoolExecutor(max_workers=min(int(max_workers), len(tickers))) as pool:
+            results = list(pool.map(fetch_one, tickers))
+    else:
+        results = [fetch_one(t) for t in tickers]
+    out = {str(t): bars[0] for t, (bars, _issue) in zip(tickers, results) if bars is not None}
+    volumes = {str(t): bars[1] for t, (bars, _issue) in zip(tickers, results) if bars is not None and bars[1] is not None}
+    issues = [issue for _series, issue in results if issue is not None]
+    df = pd.DataFrame(out).dropna(how='all') if out else pd.DataFrame()
+    df.attrs["provider_issues"] = issues
+    if volumes and not df.empty:
+        df.attrs["volume"] = pd.DataFrame(volumes).reindex(df.index)
+    return df
+
+class SnapshotProvider(Protocol):
+    """Market-wide daily bars: one call returns every ticker for ``day``.
+
+    ``snapshot`` returns a frame indexed by the exchange code (``005930``)
+    with ``close`` and ``volume`` columns, empty on non-trading days.
+    """
+
+    def snapshot(self, day: str, market: str) -> pd.DataFrame: ...
+
+
+class PykrxSnapshotProvider:
+    """KRX daily OHLCV by date through pykrx; ``market`` is ``stocks`` or ``etfs``."""
+
+    _COLUMNS = {'종가': 'close', '거래량': 'volume'}
+
+    def snapshot(self, day: str, market: str) -> pd.DataFrame:
+        from pykrx import stock
+        compact = pd.Timestamp(day).strftime('%Y%m%d')
+        if market == 'stocks':
+            raw = stock.get_market_ohlcv_by_ticker(compact, market='ALL')
+        elif market == 'etfs':
+            raw = stock.get_etf_ohlcv_by_ticker(compact)
+        else:
+            raise ValueError(f"Unknown KRX snapshot market: {market}")
+        if raw is None or raw.empty:
+            return pd.DataFrame(columns=['close', 'volume'])
+        out = raw.rename(columns=self._COLUMNS).reindex(columns=['close', 'volume'])
+        out.index = out.index.astype(str)
+        # pykrx fills suspended or pre-listing names with zero prices.
+        return out[out['close'] > 0]
+
+
+def fetch_snapshots_by_date(tickers: Optional[List[str]], start: str, end: str, market: str, provider: Optional[SnapshotProvider] = None) -> dict[str, pd.DataFrame]:
+    """Collect wide ``close``/``volume`` frames with one provider call per weekday.
+
+    Columns keep the requested ``.KS`` tickers; with ``tickers=None`` every
+    listed code is returned as ``<code>.KS``. Failed days are skipped,
+    listed in each frame's ``attrs["failed_dates"]`` and summarized in
+    ``attrs["provider_warning_summary"]``; attrs stay JSON-safe because
+    parquet writers serialize them.
+    """
+    provider = provider or PykrxSnapshotProvider()
+    codes = {str(t).split('.')[0]: str(t) for t in tickers} if tickers is not None else None
+    rows: dict[str, dict[pd.Timestamp, pd.Series]] = {'close': {}, 'volume': {}}
+    issues: list[ProviderIssue] = []
+    failed: list[str] = []
+    for day in pd.bdate_range(start, end):
         try:
-            provider_ticker = str(t)
-            output_ticker = str(t)
-            if provider_ticker.endswith('.KS'):
-                provider_ticker = provider_ticker[:-3]
-            s=fdr.DataReader(provider_ticker, start, end)
-            if s is None or len(s)==0:
-                continue
-            col = 'Close' if 'Close' in s.columns else ('close' if 'close' in s.columns else None)
-            if col:
-                out[output_ticker]=s[col]
-        except Exception:
+            snap = provider.snapshot(day.strftime('%Y-%m-%d'), market)
+        except Exception as exc:
+            detail = str(exc)
+            issues.append(ProviderIssue(provider="krx_snapshot", category=_classify_provider_issue(detail), detail=f"{day.date()}: {detail}", tickers=[]))
+            failed.append(day.strftime('%Y-%m-%d'))
             continue
-    if not out:
-        return pd.DataFrame()
-    return pd.DataFrame(out).dropna(how='all')
+        if snap is None or snap.empty:
+            continue
+        snap = snap[snap.index.isin(list(codes))] if codes is not None else snap
+        names = [codes[c] for c in snap.index] if codes is not None else [f'{c}.KS' for c in snap.index]
+        for field in rows:
+            rows[field][day] = pd.Series(snap[field].to_numpy(dtype=float), index=names)
+    out: dict[str, pd.DataFrame] = {}
+    for field, by_day in rows.items():
+        frame = pd.DataFrame.from_dict(by_day, orient='index') if by_day else pd.DataFrame()
+        if codes is not None and not frame.empty:
+            frame = frame.reindex(columns=[t for t in codes.values() if t in frame.columns])
+        frame = frame.sort_index()
+        frame.attrs["failed_dates"] = list(failed)
+        frame.attrs["provider_warning_summary"] = _summarize_provider_issues(issues)
+        out[field] = frame
+    return out
+
+
+def fetch_prices_by_date(tickers: Optional[List[str]], start: str, end: str, market: str, provider: Optional[SnapshotProvider] = None) -> pd.DataFrame:
+    return fetch_snapshots_by_date(tickers, start, end, market, provider)['close']
+
 
 def _classify_provider_issue(detail: str) -> str:
     text = (detail or "").lower()
@@ -190,22 +401,26 @@ def _summarize_provider_issues(issues: list[ProviderIssue]) -> dict[str, Any]:
     }
 
 
-def fetch_prices(tickers: List[str], start: str, end: str, prefer: str='auto', cache_dir: Optional[str]=None, use_cache: bool=True) -> pd.DataFrame:
-    tickers=[t for t in tickers if t]
-    if not tickers:
-        return pd.DataFrame()
-    cache_path=None
-    if cache_dir:
-        _ensure_dir(cache_dir)
-        key=_cache_key(tickers, start, end)
-        cache_path=os.path.join(cache_dir,key)
-    if use_cache and cache_path and os.path.exists(cache_path):
+def _combine_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    df = pd.DataFrame()
+    for d in frames:
+        df = df.combine_first(d) if not df.empty else d
+    return df
+
+
+def _fetch_from_sources(tickers: List[str], start: str, end: str, prefer: str, fdr_options: dict[str, Any] | None = None, local_root: Optional[str] = None) -> tuple[pd.DataFrame, pd.DataFrame, list[ProviderIssue], bool]:
+    """Returns ``(closes, volumes, issues, worked)``; volumes may be empty."""
+    if prefer == 'local':
         try:
-            return pd.read_csv(cache_path, index_col=0, parse_dates=True)
-        except Exception:
-            pass
+            local_df = fetch_prices_local(tickers, start, end, root=local_root or '.')
+        except Exception as exc:
+            return pd.DataFrame(), pd.DataFrame(), [ProviderIssue(provider="local", category="provider_error", detail=str(exc), tickers=list(tickers))], False
+        local_missing = [t for t in tickers if t not in local_df.columns]
+        issues = [ProviderIssue(provider="local", category="invalid_symbol", detail=f"no local data for {local_missing}", tickers=local_missing)] if local_missing else []
+        return local_df, pd.DataFrame(), issues, not local_df.empty
     # 공유 Parquet 데이터에서 먼저 시도 (부분 히트 지원)
     shared_df = pd.DataFrame()
+    volumes: list[pd.DataFrame] = []
     missing_tickers = list(tickers)
     provider_issues: list[ProviderIssue] = []
     if _HAS_SHARED_DATA:
@@ -215,6 +430,8 @@ def fetch_prices(tickers: List[str], start: str, end: str, prefer: str='auto', c
                 found = [t for t in tickers if t in shared['Close'].columns]
                 if found:
                     shared_df = shared['Close'][found].sort_index().dropna(how='all')
+                    if 'Volume' in shared and not shared['Volume'].empty:
+                        volumes.append(shared['Volume'].reindex(columns=found))
                     missing_tickers = [t for t in tickers if t not in found]
         except Exception as exc:
             provider_issues.append(ProviderIssue(provider="shared", category="provider_error", detail=str(exc), tickers=missing_tickers.copy()))
@@ -232,6 +449,11 @@ def fetch_prices(tickers: List[str], start: str, end: str, prefer: str='auto', c
                     yf_df, yf_stderr = yf_result
                 else:
                     yf_df, yf_stderr = yf_result, ""
+                # Popped straight away so the volume frame is not copied
+                # along with the closes' attrs by later pandas operations.
+                yf_volume = yf_df.attrs.pop("volume", None)
+                if yf_volume is not None:
+                    volumes.append(yf_volume)
                 if not yf_df.empty:
                     dfs.append(yf_df)
                 if yf_stderr:
@@ -244,31 +466,294 @@ def fetch_prices(tickers: List[str], start: str, end: str, prefer: str='auto', c
                 provider_issues.append(ProviderIssue(provider="yfinance", category=_classify_provider_issue(detail), detail=detail, tickers=_extract_issue_tickers(detail) or missing_tickers.copy()))
         if prefer in ('fdr','auto'):
             try:
-                dfs.append(fetch_prices_fdr(missing_tickers,start,end))
+                fdr_df = fetch_prices_fdr(missing_tickers,start,end,**(fdr_options or {}))
+                provider_issues.extend(getattr(fdr_df, "attrs", {}).get("provider_issues", []))
+                fdr_volume = fdr_df.attrs.pop("volume", None)
+                if fdr_volume is not None:
+                    volumes.append(fdr_volume)
+                dfs.append(fdr_df)
             except Exception as exc:
                 detail = str(exc)
                 provider_issues.append(ProviderIssue(provider="fdr", category=_classify_provider_issue(detail), detail=detail, tickers=_extract_issue_tickers(detail) or missing_tickers.copy()))
     if not dfs and shared_df.empty:
+        return pd.DataFrame(), pd.DataFrame(), provider_issues, False
+    df = _combine_frames([shared_df, *dfs])
+    volume = _combine_frames([v for v in volumes if not v.empty])
+    return df.sort_index().dropna(how='all'), volume, provider_issues, True
+
+
+def read_price_lake(root: str, tickers: List[str], start: str, end: str, markets: Optional[List[str]] = None, field: str = 'close') -> pd.DataFrame:
+    """Wide ``field`` frame for ``tickers`` from the long-format price lake.
+
+    Ticker, date and market predicates are pushed into the dataset scan, so
+    only the matching year partitions and row groups are read. Overlapping
+    rows from several collection runs resolve to the latest ``ingest``.
+    """
+    if not os.path.isdir(root):
+        return pd.DataFrame()
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+    if dataset.schema.get_field_index('ticker') < 0:
+        return pd.DataFrame()
+    lo, hi = pd.Timestamp(start).date(), pd.Timestamp(end).date()
+    predicate = (ds.field('year') >= lo.year) & (ds.field('year') <= hi.year)
+    predicate &= (ds.field('date') >= lo) & (ds.field('date') <= hi)
+    if tickers:
+        predicate &= ds.field('ticker').isin(list(tickers))
+    if markets:
+        predicate &= ds.field('market').isin(list(markets))
+    table = dataset.to_table(columns=['date', 'ticker', field, 'ingest'], filter=predicate)
+    if table.num_rows == 0:
+        return pd.DataFrame()
+    long = table.to_pandas()
+    long = long.sort_values(['ticker', 'date', 'ingest'], kind='stable').drop_duplicates(['ticker', 'date'], keep='last')
+    wide = long.pivot(index='date', columns='ticker', values=field)
+    wide.index = pd.to_datetime(wide.index)
+    wide.index.name = None
+    wide.columns.name = None
+    ordered = [t for t in tickers if t in wide.columns] if tickers else list(wide.columns)
+    return wide.reindex(columns=ordered).sort_index()
+
+
+LOCAL_BUNDLED_FILES = ('us_etfs_macro.parquet', 'benchmarks.parquet')
+
+
+def _wide_column_ticker(name: str) -> Optional[str]:
+    # Bundled yfinance exports store MultiIndex columns as "('Close', 'SPY')".
+    if name.startswith('('):
+        try:
+            field, ticker = ast.literal_eval(name)[:2]
+        except (ValueError, SyntaxError, TypeError):
+            return None
+        return str(ticker) if field == 'Close' else None
+    return name
+
+
+def _read_wide_parquet(path: Path, tickers: List[str], start: str, end: str) -> pd.DataFrame:
+    """Read only the requested ticker columns and date range of a wide parquet file."""
+    names = pq.ParquetFile(path).schema_arrow.names
+    date_col = next((c for c in ('date', 'Date', '__index_level_0__') if c in names), None)
+    if date_col is None:
+        return pd.DataFrame()
+    wanted = set(tickers)
+    columns = {name: ticker for name in names if name != date_col and (ticker := _wide_column_ticker(name)) in wanted}
+    if not columns:
+        return pd.DataFrame()
+    predicate = [(date_col, '>=', pd.Timestamp(start)), (date_col, '<=', pd.Timestamp(end))]
+    table = pq.read_table(path, columns=[date_col, *columns], filters=predicate)
+    index = pd.DatetimeIndex(table.column(date_col).to_numpy())
+    data = {ticker: table.column(name).to_numpy(zero_copy_only=False) for name, ticker in columns.items()}
+    return pd.DataFrame(data, index=index).sort_index()
+
+
+def _local_wide_sources(root: Path) -> list[list[Path]]:
+    layout = MarketDataLayout(StorageLayout(root).parquet_root)
+    groups: list[list[Path]] = []
+    for folder in (layout.prices_root, layout.indexes_root):
+        for base in sorted(folder.glob('*.parquet')) if folder.exists() else []:
+            deltas = sorted((folder / f'{base.stem}.delta').glob('*.parquet'))
+            groups.append([*reversed(deltas), base])
+    bundled = StorageLayout(root).parquet_root
+    groups.extend([bundled / name] for name in LOCAL_BUNDLED_FILES if (bundled / name).exists())
+    return groups
+
+
+def fetch_prices_local(tickers: List[str], start: str, end: str, root: str = '.') -> pd.DataFrame:
+    """Serve closes from parquet already on disk, without any network call.
+
+    Sources are tried in order: the collected price lake, wide price/index
+    files (exports or legacy collections, newest delta part first), then the bundled
+    ``data/*.parquet`` exports. A ticker is taken from the first source that
+    has it; each file is read with column projection and a date predicate.
+    """
+    base = Path(root)
+    lake_root = MarketDataLayout(StorageLayout(base).parquet_root).lake_root
+    df = read_price_lake(str(lake_root), tickers, start, end)
+    for paths in _local_wide_sources(base):
+        missing = [t for t in tickers if t not in df.columns]
+        if not missing:
+            break
+        found = pd.DataFrame()
+        for path in paths:
+            part = _read_wide_parquet(path, missing, start, end)
+            if not part.empty:
+                found = found.combine_first(part) if not found.empty else part
+        if not found.empty:
+            df = df.join(found, how='outer') if not df.empty else found
+    if df.empty:
+        return df
+    df = df.dropna(how='all', axis=1).sort_index().dropna(how='all')
+    return df.reindex(columns=[t for t in tickers if t in df.columns])
+
+
+def provider_options(cfg: dict) -> dict[str, Any]:
+    """Extra ``fetch_prices`` kwargs from ``data.fdr``, ``data.local_root`` and ``data.memory_cache_*``; empty when unset."""
+    data_cfg = cfg.get('data', {}) or {}
+    options: dict[str, Any] = {}
+    if data_cfg.get('fdr'):
+        options['fdr_options'] = dict(data_cfg['fdr'])
+    if data_cfg.get('local_root'):
+        options['local_root'] = str(data_cfg['local_root'])
+    options.update(memory_options(cfg))
+    return options
+
+
+def memory_options(cfg: dict) -> dict[str, float]:
+    """``fetch_prices`` kwargs for the in-process price cache from ``data.memory_cache_*``."""
+    data_cfg = cfg.get('data', {}) or {}
+    if not data_cfg.get('memory_cache_ttl_seconds'):
+        return {}
+    return {
+        'memory_ttl_seconds': float(data_cfg['memory_cache_ttl_seconds']),
+        'memory_max_mb': float(data_cfg.get('memory_cache_max_mb', 0) or 0),
+    }
+
+
+def prune_cache(cfg: dict) -> list:
+    """Apply ``data.cache_max_mb``/``data.cache_ttl_days`` to the cache; a no-op when both are unset."""
+    from .cache_manager import CacheManager
+
+    manager = CacheManager.from_config(cfg)
+    if manager.max_bytes <= 0 and manager.ttl_days <= 0:
+        return []
+    try:
+        return manager.prune()
+    except OSError:
+        return []
+
+
+def fetch_prices(tickers: List[str], start: str, end: str, prefer: str='auto', cache_dir: Optional[str]=None, use_cache: bool=True, fdr_options: dict[str, Any] | None = None, local_root: Optional[str] = None, memory_ttl_seconds: float = 0, memory_max_mb: float = 0) -> pd.DataFrame:
+    """Closes for ``tickers``, served from the price cache where it covers them.
+
+    With ``memory_ttl_seconds`` the columns are also kept in the process-wide
+    :data:`~druck.price_cache.PRICE_MEMORY` (bounded by ``memory_max_mb``), so
+    the web app, ``run_once`` and backtests in one process share them, and
+    identical concurrent calls fetch once.
+    """
+    tickers=[t for t in tickers if t]
+    if not tickers:
+        return pd.DataFrame()
+    if memory_ttl_seconds <= 0:
+        return _fetch_prices_stored(tickers, start, end, prefer, cache_dir, use_cache, fdr_options, local_root)
+    source = (prefer, cache_dir, use_cache, local_root)
+    with PRICE_MEMORY.single_flight((source, tuple(sorted(tickers)), str(start), str(end))):
+        held, missing = PRICE_MEMORY.get(source, tickers, start, end, memory_ttl_seconds)
+        issues: dict[str, Any] = {}
+        if missing:
+            try:
+                fetched = _fetch_prices_stored(missing, start, end, prefer, cache_dir, use_cache, fdr_options, local_root)
+            except RuntimeError:
+                if held.empty:
+                    raise
+                fetched = pd.DataFrame()
+            issues = fetched.attrs.get("provider_warning_summary", {})
+            PRICE_MEMORY.put(source, fetched, start, end, max_bytes=int(memory_max_mb * 1024 * 1024))
+            held = fetched if held.empty else held.combine_first(fetched)
+    df = held.sort_index().dropna(how='all')
+    df = df.reindex(columns=[t for t in tickers if t in df.columns])
+    df.attrs["provider_warning_summary"] = issues
+    return df
+
+
+def _fetch_prices_stored(tickers: List[str], start: str, end: str, prefer: str, cache_dir: Optional[str], use_cache: bool, fdr_options: dict[str, Any] | None, local_root: Optional[str]) -> pd.DataFrame:
+    cache = None
+    # Local parquet is already on disk; copying it into the cache would only
+    # hide later collections behind stale coverage.
+    if cache_dir and prefer != 'local':
+        _ensure_dir(cache_dir)
+        cache = PriceCache(cache_dir)
+    if use_cache and cache is not None:
+        cache.import_legacy()
+        plan = cache.plan(tickers, start, end)
+    else:
+        plan = {start: list(tickers)}
+
+    provider_issues: list[ProviderIssue] = []
+    fetched: list[pd.DataFrame] = []
+    failed = False
+    work = list(plan.items())
+    while work:
+        fetch_start, group = work.pop(0)
+        frame, volume, issues, worked = _fetch_from_sources(group, fetch_start, end, prefer, fdr_options, local_root)
+        provider_issues.extend(issues)
+        failed = failed or not worked
+        if cache is not None:
+            try: restated = cache.write(frame, fetch_start, end, volume=volume)
+            except Exception: restated = []
+            # Adjusted closes moved under a split or dividend: a tail on top
+            # of the old history would leave a fake jump, so refetch it all.
+            if restated and fetch_start != start:
+                work.append((start, restated))
+        if not frame.empty:
+            fetched.append(frame)
+
+    if use_cache and cache is not None:
+        df = cache.read(tickers, start, end)
+    else:
+        df = pd.DataFrame()
+        for d in fetched:
+            df = df.combine_first(d) if not df.empty else d
+    if failed and df.empty:
         summary = _summarize_provider_issues(provider_issues)
         if summary.get("summary"):
             raise RuntimeError(f"No data provider worked. {summary['summary']}")
         raise RuntimeError('No data provider worked.')
-    df = shared_df
-    for d in dfs:
-        df = df.combine_first(d) if not df.empty else d
     df=df.sort_index().dropna(how='all')
     ordered_cols = [t for t in tickers if t in df.columns]
     if ordered_cols:
         df = df.reindex(columns=ordered_cols)
-    if cache_path:
-        try: df.to_csv(cache_path)
-        except Exception: pass
     try:
         df.attrs["provider_warning_summary"] = _summarize_provider_issues(provider_issues)
     except Exception:
         pass
     return df
 
+def fetch_volumes(tickers: List[str], start: str, end: str, prefer: str = 'auto', cache_dir: Optional[str] = None, local_root: Optional[str] = None, **_options: Any) -> pd.DataFrame:
+    """Volumes stored alongside closes by earlier ``fetch_prices`` calls.
+
+    No provider is called: volumes come from the ``cache_dir`` price store,
+    or from the price lake with ``prefer='local'``. Tickers without any
+    stored volume are left out.
+    """
+    tickers = [t for t in tickers if t]
+    if not tickers:
+        return pd.DataFrame()
+    if prefer == 'local':
+        lake_root = MarketDataLayout(StorageLayout(Path(local_root or '.')).parquet_root).lake_root
+        volume = read_price_lake(str(lake_root), tickers, start, end, field='volume')
+    elif cache_dir:
+        volume = PriceCache(cache_dir).read(tickers, start, end, field='volume')
+    else:
+        return pd.DataFrame()
+    return volume.dropna(how='all', axis=1).dropna(how='all') if not volume.empty else volume
+
+
+def price_store_stamp(tickers: List[str], prefer: str = 'auto', cache_dir: Optional[str] = None, local_root: Optional[str] = None, **_options: Any) -> str:
+    """Digest of the stored data ``fetch_prices`` serves ``tickers`` from.
+
+    It covers the ``cache_dir`` price store entries of ``tickers``, or with
+    ``prefer='local'`` the size and mtime of every local parquet file, so
+    anything derived from the fetched closes can tell when a collection or
+    refetch has rewritten them since.
+    """
+    if prefer == 'local':
+        base = Path(local_root or '.')
+        lake_root = MarketDataLayout(StorageLayout(base).parquet_root).lake_root
+        files = sorted(lake_root.rglob('*.parquet')) if lake_root.exists() else []
+        files += [path for group in _local_wide_sources(base) for path in group]
+        parts = []
+        for path in files:
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            parts.append(f"{path}:{stat.st_mtime_ns}:{stat.st_size}")
+    elif cache_dir:
+        parts = PriceCache(cache_dir).stamp([t for t in tickers if t])
+    else:
+        parts = []
+    return hashlib.sha1("\n".join(parts).encode('utf-8')).hexdigest()[:16]
+
+
 def get_date_range(lookback_years: int) -> Tuple[str,str]:
     end = date.today()
     start = end - timedelta(days=365*int(lookback_years))
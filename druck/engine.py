@@ -1,7 +1,7 @@
 from __future__ import annotations
 import pandas as pd
-from .data import make_universe, fetch_prices, get_date_range
-from .macro import compute_macro_regime, compute_rates_overlay, is_vix_spike
+from .data import make_universe, fetch_prices, get_date_range, memory_options, provider_options, prune_cache
+from .macro import compute_macro_regime, compute_rates_overlay, is_vix_spike, rates_overlay_at, regime_at, update_regime_timeline
 from .portfolio import score_universe, allocate_weights, apply_risk_cuts, build_sleeve_map, resolve_regime_rotation, apply_sleeve_rotation, resolve_factor_preference
 
 
@@ -123,8 +123,9 @@ def run_once(cfg: dict, do_trade: bool=False, broker=None):
     cache_dir = cfg['data'].get('cache_dir','.cache')
     use_cache = bool(cfg['data'].get('cache_csv', True))
 
-    kr_px = fetch_prices(u.kr, start, end, prefer=prefer, cache_dir=cache_dir, use_cache=use_cache)
-    us_px = fetch_prices(u.us, start, end, prefer='yf', cache_dir=cache_dir, use_cache=use_cache)
+    kr_px = fetch_prices(u.kr, start, end, prefer=prefer, cache_dir=cache_dir, use_cache=use_cache, **provider_options(cfg))
+    us_px = fetch_prices(u.us, start, end, prefer='yf', cache_dir=cache_dir, use_cache=use_cache, **memory_options(cfg))
+    prune_cache(cfg)
 
     provider_warnings = []
     for provider_name, frame in (("kr", kr_px), ("us", us_px)):
@@ -132,9 +133,18 @@ def run_once(cfg: dict, do_trade: bool=False, broker=None):
         if summary:
             provider_warnings.append({"scope": provider_name, **summary})
 
-    regime = compute_macro_regime(us_px, cfg['macro_filter']['thresholds'], cfg['macro_filter']['components'])
+    macro_cfg = cfg['macro_filter']
+    timeline_path = str(macro_cfg.get('timeline_path', '') or '')
+    timeline = None
+    if timeline_path and not us_px.empty:
+        timeline = update_regime_timeline(us_px, timeline_path, macro_cfg['thresholds'], macro_cfg['components'], macro_cfg.get('rates_overlay', {}))
+        regime = regime_at(timeline, us_px.index[-1])
+        vix_spike = bool(timeline.at[us_px.index[-1], 'vix_spike'])
+    else:
+        regime = compute_macro_regime(us_px, macro_cfg['thresholds'], macro_cfg['components'])
+        vix_spike = is_vix_spike(us_px)
 
-    if is_vix_spike(us_px):
+    if vix_spike:
         # trading halt signal (execution path handles liquidation option)
         regime.details['vix_spike_halt'] = True
 
@@ -143,7 +153,10 @@ def run_once(cfg: dict, do_trade: bool=False, broker=None):
     state = regime.state
     sleeve_cfg = _combined_sleeve_cfg(cfg)
     sleeve_map_all = build_sleeve_map(all_px.columns, sleeve_cfg)
-    rates_overlay = compute_rates_overlay(all_px, cfg.get('macro_filter', {}).get('rates_overlay', {}))
+    if timeline is not None and 'TLT' in us_px.columns:
+        rates_overlay = rates_overlay_at(timeline, us_px.index[-1])
+    else:
+        rates_overlay = compute_rates_overlay(all_px, cfg.get('macro_filter', {}).get('rates_overlay', {}))
     factor_pref = resolve_factor_preference(cfg.get('selection', {}), state, rates_overlay=rates_overlay)
     scores = score_universe(
         all_px,
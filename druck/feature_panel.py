@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+
+FEATURE_COLUMNS = [
+    "momentum",
+    "trend",
+    "persistence",
+    "recovery",
+    "downside_efficiency",
+    "relative_strength_6m",
+    "capacity_score",
+    "residual_strength",
+    "vol",
+    "mdd_1y",
+]
+MIN_SCORE_HISTORY = 260
+# 252-day momentum needs 253 observations; every other window is shorter.
+TAIL_ROWS = 253
+
+
+def right_align_tail(values: np.ndarray, rows: int = TAIL_ROWS) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Pack the last ``rows`` valid observations of each column at the bottom.
+
+    This is the matrix equivalent of ``prices[t].dropna().iloc[-rows:]`` for
+    every column at once. Returns the tail values (NaN padded on top), the
+    original row of every packed value (-1 for padding) and the number of
+    valid observations per column.
+    """
+    valid = ~np.isnan(values)
+    lengths = valid.sum(axis=0)
+    rank_from_end = lengths[None, :] - np.cumsum(valid, axis=0)
+    keep = valid & (rank_from_end < rows)
+    src_rows, src_cols = np.nonzero(keep)
+    dest_rows = rows - 1 - rank_from_end[src_rows, src_cols]
+    tail = np.full((rows, values.shape[1]), np.nan)
+    tail[dest_rows, src_cols] = values[src_rows, src_cols]
+    positions = np.full((rows, values.shape[1]), -1, dtype=np.int64)
+    positions[dest_rows, src_cols] = src_rows
+    return tail, positions, lengths
+
+
+def _window_drawdown(window: np.ndarray) -> np.ndarray:
+    # Row by row: ``np.fmax.accumulate`` along axis 0 walks the columns with
+    # a stride and is about twice as slow on a wide window.
+    peak = np.empty_like(window)
+    if len(window):
+        running = window[0].copy()
+        peak[0] = running
+        for i in range(1, len(window)):
+            np.fmax(running, window[i], out=running)
+            peak[i] = running
+    return window / peak - 1.0
+
+
+def window_features(tail: np.ndarray, positions: np.ndarray, lengths: np.ndarray, benchmark_col: int | None = None) -> dict[str, np.ndarray]:
+    """Vectorized counterparts of the scalar helpers in ``druck.features``.
+
+    ``tail`` is a right-aligned matrix from :func:`right_align_tail`; every
+    feature is evaluated on the last row of each column.
+    """
+    n_cols = tail.shape[1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        last = tail[-1]
+        r3 = last / tail[-64] - 1.0
+        r6 = last / tail[-127] - 1.0
+        r12 = last / tail[-253] - 1.0
+        momentum = 0.5 * r3 + 0.3 * r6 + 0.2 * r12
+
+        s50 = tail[-50:].mean(axis=0)
+        s200 = tail[-200:].mean(axis=0)
+        trend = 0.6 * (last > s200) + 0.4 * (s50 > s200)
+        trend = np.where(np.isnan(s50) | np.isnan(s200), np.nan, trend)
+
+        # Only the last 126 returns are ever read.
+        rets = tail[-126:] / tail[-127:-1] - 1.0
+        n_rets = lengths - 1
+
+        window = rets[-126:]
+        positive_ratio = (window > 0).mean(axis=0)
+        streak = np.lib.stride_tricks.sliding_window_view(window, 5, axis=0).sum(axis=-1)
+        streak_bonus = (streak > 0).mean(axis=0)
+        persistence = np.where(n_rets < 126, np.nan, 0.7 * positive_ratio + 0.3 * streak_bonus)
+
+        dd_126 = _window_drawdown(tail[-126:])
+        worst = dd_126.min(axis=0)
+        current = dd_126[-1]
+        recovery = np.where(worst >= 0, 1.0, 1.0 - np.clip(current / worst, 0.0, 1.5))
+        recovery = np.where(lengths < 126, np.nan, recovery)
+
+        total_return = last / tail[-127] - 1.0
+        negative_days = (window < 0).mean(axis=0)
+        downside_efficiency = total_return / (np.abs(worst) + negative_days + 1e-12)
+        downside_efficiency = np.where(lengths < 127, np.nan, downside_efficiency)
+
+        short = rets[-63:]
+        short_std = short.std(axis=0, ddof=1)
+        capacity = np.where(short_std <= 0, 1.0, 1.0 / (1.0 + 10.0 * np.abs(short).mean(axis=0) + 5.0 * short_std))
+        capacity = np.where(lengths < 64, np.nan, capacity)
+        vol = np.where(n_rets < 63, np.nan, short_std * math.sqrt(252))
+
+        mdd_1y = np.fmin.reduce(_window_drawdown(tail[-252:]), axis=0) if n_cols else np.zeros(0)
+
+        relative = np.zeros(n_cols)
+        if benchmark_col is not None:
+            aligned = (positions[-127:] == positions[-127:, [benchmark_col]]).all(axis=0)
+            bench_ret = total_return[benchmark_col]
+            enough = (lengths >= 127) & (lengths[benchmark_col] >= 127)
+            relative = np.where(aligned & enough, total_return - bench_ret, np.nan)
+            relative[benchmark_col] = 0.0
+
+    return {
+        "momentum": momentum,
+        "trend": trend,
+        "persistence": persistence,
+        "recovery": recovery,
+        "downside_efficiency": downside_efficiency,
+        "relative_strength_6m": relative,
+        "capacity_score": capacity,
+        "vol": vol,
+        "mdd_1y": mdd_1y,
+    }
+
+
+def _regression_alpha(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    x = x[:, x.std(axis=0) > 1e-12]
+    if x.shape[1] == 0:
+        return y.mean(axis=0) * 252
+    x_mat = np.column_stack([np.ones(len(x)), x])
+    beta, *_ = np.linalg.lstsq(x_mat, y, rcond=None)
+    return beta[0] * 252
+
+
+def residual_strength_panel(values: np.ndarray, lengths: np.ndarray, anchor_cols: list[int], lookback: int = 126) -> np.ndarray:
+    """Annualized regression alpha of every column against the anchor columns.
+
+    Columns whose regression rows coincide share one least-squares solve;
+    an anchor column is regressed on the remaining anchors, exactly like
+    ``residual_strength_vs_anchors`` with the ticker dropped from the frame.
+    """
+    n_rows, n_cols = values.shape
+    out = np.full(n_cols, np.nan)
+    if not anchor_cols or n_rows < 2:
+        return out
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prev = pd.DataFrame(values).ffill().to_numpy()
+        asset_ret = np.full_like(values, np.nan)
+        asset_ret[1:] = values[1:] / prev[:-1] - 1.0
+        anchor_vals = values[:, anchor_cols]
+        anchor_ret = np.full_like(anchor_vals, np.nan)
+        anchor_ret[1:] = anchor_vals[1:] / anchor_vals[:-1] - 1.0
+    anchor_ok = ~np.isnan(anchor_ret)
+    need = max(lookback, 20)
+
+    variants: dict[int, list[int]] = {}
+    for col in np.nonzero(lengths >= lookback + 1)[0]:
+        excluded = anchor_cols.index(col) if col in anchor_cols else -1
+        variants.setdefault(excluded, []).append(int(col))
+
+    for excluded, cols in variants.items():
+        keep_anchors = [i for i in range(len(anchor_cols)) if i != excluded]
+        if not keep_anchors:
+            continue
+        rows_ok = anchor_ok[:, keep_anchors].all(axis=1)
+        mask = ~np.isnan(asset_ret[:, cols]) & rows_ok[:, None]
+        eligible = mask.sum(axis=0) >= need
+        if not eligible.any():
+            continue
+        cols = [c for c, ok in zip(cols, eligible) if ok]
+        mask = mask[:, eligible]
+        selected = mask & (np.cumsum(mask[::-1], axis=0)[::-1] <= lookback)
+        first_row = int(np.argmax(selected.any(axis=1)))
+        patterns, group_ids = np.unique(selected[first_row:].T, axis=0, return_inverse=True)
+        group_ids = np.asarray(group_ids).reshape(-1)
+        for group, pattern in enumerate(patterns):
+            rows = first_row + np.nonzero(pattern)[0]
+            members = [c for c, g in zip(cols, group_ids) if g == group]
+            x = anchor_ret[np.ix_(rows, keep_anchors)]
+            y = asset_ret[np.ix_(rows, members)]
+            out[members] = _regression_alpha(x, y)
+    return out
+
+
+def compute_feature_panel(prices: pd.DataFrame, benchmark_ticker: str | None = "SPY", residual_cfg: dict | None = None, min_history: int = MIN_SCORE_HISTORY) -> pd.DataFrame:
+    residual_cfg = residual_cfg or {}
+    if prices.empty or len(prices.columns) == 0:
+        return pd.DataFrame(columns=FEATURE_COLUMNS)
+    columns = list(prices.columns)
+    values = prices.to_numpy(dtype=float, na_value=np.nan)
+    tail, positions, lengths = right_align_tail(values, TAIL_ROWS)
+    benchmark_col = columns.index(benchmark_ticker) if benchmark_ticker and benchmark_ticker in columns else None
+    features = window_features(tail, positions, lengths, benchmark_col)
+
+    if bool(residual_cfg.get("enabled", False)):
+        anchor_cols = [columns.index(str(t)) for t in residual_cfg.get("anchor_tickers", []) or [] if str(t) in columns]
+        lookback = int(residual_cfg.get("lookback", 126) or 126)
+        features["residual_strength"] = residual_strength_panel(values, lengths, anchor_cols, lookback)
+    else:
+        features["residual_strength"] = np.zeros(len(columns))
+
+    frame = pd.DataFrame(features, index=pd.Index(columns, name="ticker", dtype=object))[FEATURE_COLUMNS]
+    return frame.loc[lengths >= min_history]
+
+
+class FeatureCube:
+    """Point-in-time feature frames for any date of one price matrix.
+
+    Each column is compacted once up front. A lookup gathers only the last
+    ``TAIL_ROWS`` observations per column that are known at that date, so
+    its cost does not grow with the length of the history.
+    """
+
+    def __init__(self, prices: pd.DataFrame, benchmark_ticker: str | None = "SPY", residual_cfg: dict | None = None, min_history: int = MIN_SCORE_HISTORY):
+        self.index = prices.index
+        self.columns = list(prices.columns)
+        self.benchmark_ticker = benchmark_ticker
+        self.residual_cfg = dict(residual_cfg or {})
+        self.min_history = int(min_history)
+        self.values = prices.to_numpy(dtype=float, na_value=np.nan)
+        valid = ~np.isnan(self.values)
+        self.counts = np.cumsum(valid, axis=0, dtype=np.int64)
+        order = np.argsort(~valid, axis=0, kind="stable")
+        # Column-major and flattened, so a column's tail is one contiguous run.
+        self.packed = np.ascontiguousarray(np.take_along_axis(self.values, order, axis=0).T).ravel()
+        self.packed_rows = np.ascontiguousarray(order.T).ravel()
+        self._col_pos = {c: i for i, c in enumerate(self.columns)}
+        self._cache: dict[tuple, pd.DataFrame] = {}
+        self._base_cache: dict[tuple, tuple] = {}
+
+    def position(self, date) -> int:
+        if isinstance(date, (int, np.integer)):
+            return int(date)
+        return int(self.index.get_loc(date))
+
+    def features_at(self, date, columns: list | pd.Index | None = None, residual_cfg: dict | None = None) -> pd.DataFrame:
+        pos = self.position(date)
+        columns = self.columns if columns is None else list(columns)
+        residual_cfg = self.residual_cfg if residual_cfg is None else residual_cfg
+        enabled = bool(residual_cfg.get("enabled", False))
+        anchors = tuple(str(t) for t in residual_cfg.get("anchor_tickers", []) or []) if enabled else ()
+        lookback = int(residual_cfg.get("lookback", 126) or 126) if enabled else 0
+        key = (pos, tuple(columns), enabled, anchors, lookback)
+        frame = self._cache.get(key)
+        if frame is None:
+            frame = self._compute(pos, columns, enabled, list(anchors), lookback)
+            self._cache[key] = frame
+        return frame
+
+    def _base_features(self, pos: int, columns: list) -> tuple[np.ndarray, np.ndarray, dict[str, np.ndarray]]:
+        key = (pos, tuple(columns))
+        base = self._base_cache.get(key)
+        if base is None:
+            cols = np.array([self._col_pos[c] for c in columns], dtype=np.int64)
+            lengths = self.counts[pos, cols]
+            take = lengths[None, :] - TAIL_ROWS + np.arange(TAIL_ROWS)[:, None]
+            pad = take < 0
+            flat = np.maximum(take, 0) + cols * len(self.index)
+            tail = self.packed.take(flat)
+            tail[pad] = np.nan
+            # window_features only compares the last 127 source rows.
+            positions = self.packed_rows.take(flat[-127:])
+            positions[pad[-127:]] = -1
+            benchmark_col = columns.index(self.benchmark_ticker) if self.benchmark_ticker and self.benchmark_ticker in columns else None
+            base = (cols, lengths, window_features(tail, positions, lengths, benchmark_col))
+            self._base_cache[key] = base
+        return base
+
+    def _compute(self, pos: int, columns: list, residual_enabled: bool, anchor_tickers: list[str], lookback: int) -> pd.DataFrame:
+        if not columns:
+            return pd.DataFrame(columns=FEATURE_COLUMNS)
+        cols, lengths, base = self._base_features(pos, columns)
+        features = dict(base)
+        if residual_enabled:
+            anchor_local = [columns.index(t) for t in anchor_tickers if t in columns]
+            features["residual_strength"] = self._residual_at(pos, cols, lengths, anchor_local, lookback)
+        else:
+            features["residual_strength"] = np.zeros(len(columns))
+
+        # An object index: pandas' default Arrow-backed string index makes
+        # every per-ticker lookup in the scoring code much slower.
+        keep = lengths >= self.min_history
+        index = pd.Index(columns, name="ticker", dtype=object)[keep]
+        return pd.DataFrame({name: features[name][keep] for name in FEATURE_COLUMNS}, index=index)
+
+    def _residual_at(self, pos: int, cols: np.ndarray, lengths: np.ndarray, anchor_local: list[int], lookback: int) -> np.ndarray:
+        # Regress on a trailing slice and widen it only for columns whose
+        # regression rows do not all fit inside; a result found on a slice
+        # is identical to the one on the full history.
+        out = np.full(len(cols), np.nan)
+        if not anchor_local:
+            return out
+        anchor_set = set(anchor_local)
+        pending = [int(i) for i in np.nonzero(lengths >= lookback + 1)[0] if i not in anchor_set]
+        pending_anchors = [i for i in anchor_local if lengths[i] >= lookback + 1]
+        span = 2 * max(lookback, 20) + 1
+        while pending or pending_anchors:
+            start = max(pos + 1 - span, 0)
+            local = anchor_local + pending
+            values = self.values[start : pos + 1][:, cols[local]]
+            result = residual_strength_panel(values, lengths[local], list(range(len(anchor_local))), lookback)
+            wanted = set(pending) | set(pending_anchors)
+            for j, i in enumerate(local):
+                if i in wanted:
+                    out[i] = result[j]
+            if start == 0:
+                break
+            pending = [i for i in pending if np.isnan(out[i])]
+            pending_anchors = [i for i in pending_anchors if np.isnan(out[i])]
+            span *= 2
+        return out
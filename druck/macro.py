@@ -1,8 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, Any
+import hashlib
+import json
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 from .features import sma, momentum_score, pct_change_n
 
 @dataclass
@@ -146,3 +150,242 @@ def compute_macro_regime(px: pd.DataFrame, thresholds: dict, weights: dict) -> M
         state="NEUTRAL"
     details["risk_score"]=score
     return MacroRegime(score,state,details)
+
+
+MACRO_COMPONENTS = {
+    "spy_trend": "spy_trend_weight",
+    "usd_component": "usd_mom_weight",
+    "credit_component": "credit_weight",
+    "vix_component": "vix_weight",
+    "rates_component": "rates_weight",
+    "kr_trend_component": "kr_trend_weight",
+    "kr_relative_component": "kr_relative_weight",
+}
+
+
+def _observed(px: pd.DataFrame, *tickers: str) -> pd.DataFrame | None:
+    if not all(t and t in px.columns for t in tickers):
+        return None
+    return px[list(tickers)].dropna()
+
+
+def _on_index(values: pd.Series, index: pd.Index) -> pd.Series:
+    # A value computed on observation i holds until the next observation,
+    # exactly like calling the point-in-time function on px.loc[:t].
+    return values.reindex(index, method="ffill")
+
+
+def _momentum_series(s: pd.Series) -> pd.Series:
+    r3 = s / s.shift(63) - 1.0
+    r6 = s / s.shift(126) - 1.0
+    r12 = s / s.shift(252) - 1.0
+    return 0.5 * r3 + 0.3 * r6 + 0.2 * r12
+
+
+def _trend_series(s: pd.Series, min_obs: int = 210, window: int = 200) -> pd.Series:
+    out = np.full(len(s), np.nan)
+    if len(s) > min_obs:
+        values = s.to_numpy(dtype=float)
+        sma200 = sliding_window_view(values, window).mean(axis=1)
+        out[window - 1:] = (values[window - 1:] > sma200).astype(float)
+        out[:min_obs] = np.nan
+    return pd.Series(out, index=s.index)
+
+
+def _relative_series(common: pd.DataFrame) -> pd.Series:
+    a = common.iloc[:, 0]
+    b = common.iloc[:, 1]
+    out = (0.5 + ((a / a.shift(63) - 1.0) - (b / b.shift(63) - 1.0))).clip(0.0, 1.0)
+    out.iloc[:90] = np.nan
+    return out
+
+
+def compute_regime_timeline(px: pd.DataFrame, thresholds: dict, weights: dict, rates_cfg: dict | None = None, vix_mult: float = 1.25) -> pd.DataFrame:
+    """Daily macro regime series in one vectorized pass.
+
+    Row ``t`` equals ``compute_macro_regime``, ``is_vix_spike`` and
+    ``compute_rates_overlay`` evaluated on ``px.loc[:t]``.
+    """
+    index = px.index
+    kr_cfg = thresholds.get("kr", {}) if isinstance(thresholds.get("kr", {}), dict) else {}
+    kr_benchmark_ticker = str(kr_cfg.get("benchmark_ticker", "") or "")
+    kr_cash_ticker = str(kr_cfg.get("cash_ticker", "") or "")
+    out = pd.DataFrame(index=index)
+    for name in MACRO_COMPONENTS:
+        out[name] = np.nan
+
+    spy = _observed(px, "SPY")
+    if spy is not None:
+        out["spy_trend"] = _on_index(_trend_series(spy["SPY"]), index)
+
+    uup = _observed(px, "UUP")
+    if uup is not None:
+        usd = (0.5 - _momentum_series(uup["UUP"])).clip(0.0, 1.0)
+        usd.iloc[:260] = np.nan
+        out["usd_component"] = _on_index(usd, index)
+
+    credit = _observed(px, "HYG", "IEF")
+    if credit is not None:
+        out["credit_component"] = _on_index(_relative_series(credit), index)
+
+    vix = _observed(px, "^VIX")
+    spike = pd.Series(False, index=index)
+    if vix is not None:
+        v = vix["^VIX"]
+        mom1m = v / v.shift(21) - 1.0
+        base = (1.0 - (v - 15.0) / 20.0).clip(0.0, 1.0)
+        shock = (1.0 - mom1m.clip(lower=0.0) / 0.3).clip(0.0, 1.0)
+        vix_component = 0.6 * base + 0.4 * shock
+        vix_component.iloc[:120] = np.nan
+        out["vix_component"] = _on_index(vix_component, index)
+        v_spike = v > v.rolling(20).mean() * float(vix_mult)
+        v_spike.iloc[:29] = False
+        spike = _on_index(v_spike, index).fillna(False).astype(bool)
+    out["vix_spike"] = spike
+
+    tlt = _observed(px, "TLT")
+    rates_cfg = rates_cfg or {}
+    out["rates_score"] = 0.0
+    out["rates_trend_63d"] = 0.0
+    out["rates_trend_126d"] = 0.0
+    if tlt is not None:
+        t = tlt["TLT"]
+        rates = (0.5 + _momentum_series(t)).clip(0.0, 1.0)
+        rates.iloc[:260] = np.nan
+        out["rates_component"] = _on_index(rates, index)
+        trend_63d = (t / t.shift(63) - 1.0).where(np.arange(len(t)) >= 260, 0.0)
+        trend_126d = (t / t.shift(126) - 1.0).where(np.arange(len(t)) >= 260, 0.0)
+        out["rates_trend_63d"] = _on_index(trend_63d, index).fillna(0.0)
+        out["rates_trend_126d"] = _on_index(trend_126d, index).fillna(0.0)
+        out["rates_score"] = 0.5 * out["rates_trend_63d"] + 0.5 * out["rates_trend_126d"]
+    up_threshold = float(rates_cfg.get("up_threshold", 0.02))
+    down_threshold = float(rates_cfg.get("down_threshold", -0.02))
+    out["rates_direction"] = np.where(out["rates_score"] >= up_threshold, "falling", np.where(out["rates_score"] <= down_threshold, "rising", "neutral"))
+
+    kr_bench = _observed(px, kr_benchmark_ticker)
+    if kr_bench is not None:
+        out["kr_trend_component"] = _on_index(_trend_series(kr_bench[kr_benchmark_ticker]), index)
+    kr_pair = _observed(px, kr_benchmark_ticker, kr_cash_ticker) if kr_cash_ticker else None
+    if kr_pair is not None:
+        out["kr_relative_component"] = _on_index(_relative_series(kr_pair), index)
+
+    # Same accumulation order as compute_macro_regime so scores match bitwise.
+    wsum = np.zeros(len(index))
+    used_any = np.zeros(len(index), dtype=bool)
+    for name, key in MACRO_COMPONENTS.items():
+        used = out[name].notna().to_numpy()
+        wsum = wsum + np.where(used, float(weights.get(key, 0.0)), 0.0)
+        used_any |= used
+    wsum = wsum + 1e-12
+    score = np.zeros(len(index))
+    for name, key in MACRO_COMPONENTS.items():
+        values = out[name].to_numpy(dtype=float)
+        score = score + np.where(np.isnan(values), 0.0, (float(weights.get(key, 0.0)) / wsum) * values)
+    score = np.where(used_any, score, 0.5)
+    on_min = float(thresholds.get("risk_on_score_min", 0.55))
+    off_max = float(thresholds.get("risk_off_score_max", 0.45))
+    out["risk_score"] = score
+    out["state"] = np.where(~used_any, "NEUTRAL", np.where(score >= on_min, "RISK_ON", np.where(score <= off_max, "RISK_OFF", "NEUTRAL")))
+    return out
+
+
+def regime_at(timeline: pd.DataFrame, dt) -> MacroRegime:
+    row = timeline.loc[dt]
+    details: Dict[str, float] = {name: float(row[name]) for name in MACRO_COMPONENTS}
+    if any(not np.isnan(v) for v in details.values()):
+        details["risk_score"] = float(row["risk_score"])
+    return MacroRegime(float(row["risk_score"]), str(row["state"]), details)
+
+
+def rates_overlay_at(timeline: pd.DataFrame, dt) -> dict[str, Any]:
+    row = timeline.loc[dt]
+    return {
+        "direction": str(row["rates_direction"]),
+        "score": float(row["rates_score"]),
+        "trend_63d": float(row["rates_trend_63d"]),
+        "trend_126d": float(row["rates_trend_126d"]),
+    }
+
+
+def regime_timeline_key(thresholds: dict, weights: dict, rates_cfg: dict | None = None, vix_mult: float = 1.25) -> str:
+    payload = json.dumps({"thresholds": thresholds, "weights": weights, "rates": rates_cfg or {}, "vix_mult": float(vix_mult)}, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_regime_timeline(path: str | Path) -> pd.DataFrame | None:
+    path = Path(path)
+    if not path.exists():
+        return None
+    return pd.read_parquet(path)
+
+
+# Rows a timeline needs before its components stop depending on where the
+# price window starts (the 252-day momentum plus slack).
+TIMELINE_WARMUP_ROWS = 260
+
+
+def _first_revised_day(existing: pd.DataFrame, fresh: pd.DataFrame) -> pd.Timestamp | None:
+    """First shared day on which ``fresh`` disagrees with ``existing``, or None.
+
+    Only the days both cover are compared. A day present in only one of the
+    two within that span counts as a disagreement.
+    """
+    lo, hi = max(fresh.index[0], existing.index[0]), min(fresh.index[-1], existing.index[-1])
+    if lo > hi:
+        return None
+    old = existing.loc[(existing.index >= lo) & (existing.index <= hi)]
+    new = fresh.loc[(fresh.index >= lo) & (fresh.index <= hi)]
+    if not old.index.equals(new.index):
+        differing = old.index.symmetric_difference(new.index)
+        return differing[0] if len(differing) else None
+    mismatch = np.zeros(len(new), dtype=bool)
+    for column in fresh.columns:
+        if column not in old.columns:
+            return new.index[0] if len(new) else None
+        a, b = old[column], new[column]
+        if pd.api.types.is_float_dtype(b):
+            mismatch |= ~np.isclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float), rtol=1e-9, atol=0.0, equal_nan=True)
+        else:
+            mismatch |= a.to_numpy() != b.to_numpy()
+    return new.index[mismatch.argmax()] if mismatch.any() else None
+
+
+def update_regime_timeline(px: pd.DataFrame, path: str | Path, thresholds: dict, weights: dict, rates_cfg: dict | None = None, vix_mult: float = 1.25) -> pd.DataFrame:
+    """Extend the persisted timeline with the days of ``px`` after it.
+
+    Only the new days are computed, from ``px`` rows starting two
+    ``TIMELINE_WARMUP_ROWS`` spans before them: the first span warms the
+    components up, and the second recomputes stored rows to check them. When
+    revised prices change one of those rows, the file is rewritten from
+    that day on. A ``px`` reaching back before the stored timeline, or a
+    change of the macro config, rebuilds it.
+    """
+    path = Path(path)
+    key = regime_timeline_key(thresholds, weights, rates_cfg, vix_mult)
+    existing = load_regime_timeline(path)
+    if existing is not None and (existing.empty or (existing["config_key"] != key).any()):
+        existing = None
+    if existing is not None and px.empty:
+        return existing
+    if existing is None or px.index[0] < existing.index[0]:
+        timeline = compute_regime_timeline(px, thresholds, weights, rates_cfg, vix_mult)
+        timeline["config_key"] = key
+    else:
+        check = max(int(px.index.searchsorted(existing.index[-1], side="right")) - TIMELINE_WARMUP_ROWS, 0)
+        lo = max(check - TIMELINE_WARMUP_ROWS, 0)
+        fresh = compute_regime_timeline(px.iloc[lo:], thresholds, weights, rates_cfg, vix_mult)
+        fresh["config_key"] = key
+        # Rows still warming up lack history the stored ones had.
+        fresh = fresh.iloc[TIMELINE_WARMUP_ROWS:] if lo > 0 or px.index[0] > existing.index[0] else fresh
+        if fresh.empty:
+            return existing
+        revised = _first_revised_day(existing, fresh)
+        if revised is None and fresh.index[-1] <= existing.index[-1]:
+            return existing
+        kept = existing if revised is None else existing.loc[existing.index < revised]
+        timeline = pd.concat([kept, fresh.loc[fresh.index > kept.index[-1]]]) if not kept.empty else fresh
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    timeline.to_parquet(tmp)
+    tmp.replace(path)
+    return timeline
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable
+import json
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 from .storage import ensure_storage_layout
 
@@ -21,6 +25,10 @@ class MarketDataLayout:
     def prices_root(self) -> Path:
         return self.root / "market_data" / "prices"
 
+    @property
+    def lake_root(self) -> Path:
+        return self.prices_root / "lake"
+
     @property
     def indexes_root(self) -> Path:
         return self.root / "market_data" / "indexes"
@@ -45,6 +53,10 @@ def ensure_market_data_layout(root: str | Path) -> MarketDataLayout:
     return layout
 
 
+def _day(value: Any) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
 def write_parquet(df: pd.DataFrame, path: Path) -> Path:
     path.parent.mkdir(parents=True, exist_ok=True)
     df.to_parquet(path, index=False)
@@ -60,33 +72,321 @@ def write_timeseries_parquet(df: pd.DataFrame, path: Path) -> Path:
     return path
 
 
-def merge_timeseries(existing_path: Path, new_df: pd.DataFrame) -> pd.DataFrame:
-    def _normalize_index(df: pd.DataFrame) -> pd.DataFrame:
-        out = df.copy()
-        if 'date' in out.columns:
-            out['date'] = pd.to_datetime(out['date'])
-            out = out.set_index('date')
-        else:
-            out.index = pd.to_datetime(out.index)
-        out.index.name = 'date'
-        return out
+def _normalize_index(df: pd.DataFrame) -> pd.DataFrame:
+    out = df.copy()
+    if 'date' in out.columns:
+        out['date'] = pd.to_datetime(out['date'])
+        out = out.set_index('date')
+    else:
+        out.index = pd.to_datetime(out.index)
+    out.index.name = 'date'
+    return out
 
-    if new_df is None or new_df.empty:
-        if existing_path.exists():
-            loaded = pd.read_parquet(existing_path)
-            return _normalize_index(loaded)
+
+def timeseries_delta_root(path: Path) -> Path:
+    return path.parent / f"{path.stem}.delta"
+
+
+def timeseries_state_path(path: Path) -> Path:
+    return path.parent / f"{path.stem}.state.json"
+
+
+def load_timeseries(path: Path) -> pd.DataFrame:
+    """Read a wide timeseries parquet together with its appended delta parts.
+
+    Parts are applied in name order on top of the base file, so non-null
+    values from the newest part win. All frames are folded in one pass.
+    """
+    delta_root = timeseries_delta_root(path)
+    paths = [path] if path.exists() else []
+    paths += sorted(delta_root.glob("*.parquet")) if delta_root.exists() else []
+    frames = [_normalize_index(pd.read_parquet(p)) for p in paths]
+    if not frames:
         return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0].sort_index()
+    merged = pd.concat(frames).groupby(level=0, sort=True).last()
+    return merged.reindex(columns=sorted(merged.columns))
+
+
+def merge_timeseries(existing_path: Path, new_df: pd.DataFrame) -> pd.DataFrame:
+    if new_df is None or new_df.empty:
+        return load_timeseries(existing_path)
 
     merged = _normalize_index(new_df)
-    if existing_path.exists():
-        old = pd.read_parquet(existing_path)
-        old = _normalize_index(old)
+    old = load_timeseries(existing_path)
+    if not old.empty:
         merged = merged.combine_first(old)
     merged = merged.sort_index()
     merged = merged.loc[:, ~merged.columns.duplicated()]
     return merged
 
 
+def append_timeseries_delta(path: Path, new_df: pd.DataFrame, tag: str) -> Path | None:
+    """Store ``new_df`` as a delta part next to ``path`` without touching the base file."""
+    if new_df is None or new_df.empty:
+        return None
+    delta_root = timeseries_delta_root(path)
+    delta_root.mkdir(parents=True, exist_ok=True)
+    part = delta_root / f"{tag}.parquet"
+    tmp = part.with_suffix(".parquet.tmp")
+    write_timeseries_parquet(_normalize_index(new_df).sort_index(), tmp)
+    tmp.replace(part)
+    return part
+
+
+def clear_timeseries_deltas(path: Path) -> None:
+    delta_root = timeseries_delta_root(path)
+    if delta_root.exists():
+        for part in delta_root.glob("*.parquet"):
+            part.unlink()
+
+
+def read_timeseries_state(
+    path: Path,
+    lake_root: Path | None = None,
+    market: str | None = None,
+) -> dict[str, dict[str, str]]:
+    """Per-ticker ``{start, last_date}`` of what is stored under ``path``.
+
+    ``start`` is the earliest requested collection start the ticker is
+    complete from. Without a state file it is rebuilt once from the stored
+    data, using each ticker's first observation as its start: the
+    ``market`` partition of the lake under ``lake_root`` when given, else
+    the wide file at ``path``.
+    """
+    state_path = timeseries_state_path(path)
+    try:
+        return json.loads(state_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        pass
+    state: dict[str, dict[str, str]] = {}
+    if lake_root is not None and market is not None:
+        for year_dir in _price_lake_years(lake_root, market):
+            spans = _read_lake_year(year_dir, ["date", "ticker", "ingest"]).groupby("ticker")["date"].agg(["min", "max"])
+            for ticker, (first, last) in spans.iterrows():
+                entry = state.setdefault(str(ticker), {"start": _day(first), "last_date": _day(last)})
+                entry["last_date"] = max(entry["last_date"], _day(last))
+        if state:
+            return state
+    stored = load_timeseries(path)
+    for ticker in stored.columns:
+        values = stored[ticker].dropna()
+        if not values.empty:
+            state[str(ticker)] = {"start": _day(values.index[0]), "last_date": _day(values.index[-1])}
+    return state
+
+
+def write_timeseries_state(path: Path, state: dict[str, dict[str, str]]) -> Path:
+    state_path = timeseries_state_path(path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+    tmp.replace(state_path)
+    return state_path
+
+
+def update_timeseries_state(
+    state: dict[str, dict[str, str]],
+    frame: pd.DataFrame,
+    start: str,
+    full_tickers: set[str] | None = None,
+) -> dict[str, dict[str, str]]:
+    """Extend ``state`` with the tickers observed in ``frame``.
+
+    Tickers in ``full_tickers`` (or without a previous entry) were fetched
+    from ``start`` and are reset to it; the others keep their start.
+    """
+    full_tickers = full_tickers or set()
+    out = {k: dict(v) for k, v in state.items()}
+    for ticker in frame.columns:
+        values = frame[ticker].dropna()
+        if values.empty:
+            continue
+        ticker = str(ticker)
+        entry = out.get(ticker)
+        last = _day(values.index[-1])
+        if entry is not None:
+            last = max(entry["last_date"], last)
+        if entry is None or ticker in full_tickers:
+            out[ticker] = {"start": _day(start), "last_date": last}
+        else:
+            entry["last_date"] = last
+    return out
+
+
+def rewind_timeseries_state(state: dict[str, dict[str, str]], failed: dict[str, str]) -> dict[str, dict[str, str]]:
+    """Pull each ticker's ``last_date`` back to before its first failed day.
+
+    Date-major collections skip days whose snapshot call failed; rewinding
+    the state makes the next incremental plan start at the hole again.
+    """
+    out = {k: dict(v) for k, v in state.items()}
+    for ticker, day in failed.items():
+        entry = out.get(ticker)
+        if entry is not None and entry["last_date"] >= _day(day):
+            entry["last_date"] = _day(pd.Timestamp(day) - pd.Timedelta(days=1))
+    return out
+
+
+def plan_incremental_fetch(
+    state: dict[str, dict[str, str]],
+    tickers: list[str],
+    start: str,
+    end: str,
+) -> tuple[dict[str, list[str]], set[str]]:
+    """Group tickers by the date their next fetch should start from.
+
+    Tickers stored from ``start`` onward only need the days after their
+    ``last_date``; up-to-date tickers are left out. New tickers, and tickers
+    whose stored history starts after ``start`` or ends before it (a gap),
+    are fetched over the full range and returned in the second element.
+    """
+    start, end = _day(start), _day(end)
+    plan: dict[str, list[str]] = {}
+    full: set[str] = set()
+    for ticker in tickers:
+        entry = state.get(ticker)
+        if entry and entry["start"] <= start and entry["last_date"] >= start:
+            if entry["last_date"] >= end:
+                continue
+            fetch_start = _day(pd.Timestamp(entry["last_date"]) + pd.Timedelta(days=1))
+        else:
+            fetch_start = start
+            full.add(ticker)
+        plan.setdefault(fetch_start, []).append(ticker)
+    return plan, full
+
+
+PRICE_LAKE_SCHEMA = pa.schema([
+    ("date", pa.date32()),
+    ("ticker", pa.string()),
+    ("close", pa.float64()),
+    ("volume", pa.float64()),
+    ("ingest", pa.string()),
+])
+PRICE_LAKE_ROW_GROUP = 65536
+
+
+def _long_price_table(close: pd.DataFrame, volume: pd.DataFrame | None, tag: str) -> pd.DataFrame:
+    close = _normalize_index(close)
+    long = close.stack().rename("close").reset_index()
+    long.columns = ["date", "ticker", "close"]
+    long = long[long["close"].notna()]
+    long["ticker"] = long["ticker"].astype(str)
+    if volume is not None and not volume.empty:
+        vol = _normalize_index(volume).stack().rename("volume").reset_index()
+        vol.columns = ["date", "ticker", "volume"]
+        vol["ticker"] = vol["ticker"].astype(str)
+        long = long.merge(vol, on=["date", "ticker"], how="left")
+    else:
+        long["volume"] = np.nan
+    long["ingest"] = tag
+    return long.sort_values(["ticker", "date"], kind="stable")
+
+
+def write_price_lake(
+    root: Path,
+    market: str,
+    close: pd.DataFrame,
+    tag: str,
+    volume: pd.DataFrame | None = None,
+    replace: bool = False,
+) -> list[Path]:
+    """Append wide close/volume frames to the long-format price lake.
+
+    Rows land in ``root/market=<market>/year=<yyyy>/part-<tag>.parquet``,
+    sorted by ticker then date so row-group statistics let readers skip
+    tickers they did not ask for. ``replace`` drops the market partition
+    first.
+    """
+    market_root = root / f"market={market}"
+    if replace and market_root.exists():
+        for part in market_root.glob("year=*/*.parquet"):
+            part.unlink()
+    if close is None or close.empty:
+        return []
+    long = _long_price_table(close, volume, tag)
+    if long.empty:
+        return []
+    written: list[Path] = []
+    for year, rows in long.groupby(long["date"].dt.year, sort=True):
+        out_dir = market_root / f"year={int(year)}"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        written.append(_write_lake_part(rows, out_dir / f"part-{tag}.parquet"))
+    return written
+
+
+def _write_lake_part(rows: pd.DataFrame, part: Path) -> Path:
+    # Dot-prefixed so dataset discovery ignores a half-written file.
+    tmp = part.parent / f".{part.name}.tmp"
+    table = pa.Table.from_pandas(rows, schema=PRICE_LAKE_SCHEMA, preserve_index=False)
+    pq.write_table(table, tmp, compression="zstd", row_group_size=PRICE_LAKE_ROW_GROUP)
+    tmp.replace(part)
+    return part
+
+
+def _price_lake_years(root: Path, market: str) -> list[Path]:
+    return sorted(d for d in (root / f"market={market}").glob("year=*") if any(d.glob("part-*.parquet")))
+
+
+def _read_lake_year(year_dir: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """One year partition as long rows, keeping the newest ``ingest`` per (ticker, date)."""
+    tables = [pq.read_table(part, columns=columns) for part in sorted(year_dir.glob("part-*.parquet"))]
+    rows = pa.concat_tables(tables).to_pandas()
+    return rows.sort_values(["ticker", "date", "ingest"], kind="stable").drop_duplicates(["ticker", "date"], keep="last")
+
+
+def compact_price_lake(root: Path, market: str, tag: str, min_parts: int = 2) -> list[Path]:
+    """Rewrite every year partition of ``market`` with ``min_parts`` or more parts as one part.
+
+    Overlapping rows resolve to the newest ``ingest`` exactly as readers do,
+    and each row keeps its own ``ingest``, so later parts still win over the
+    compacted one. Only one year partition is in memory at a time.
+    """
+    written: list[Path] = []
+    for year_dir in _price_lake_years(root, market):
+        parts = sorted(year_dir.glob("part-*.parquet"))
+        if len(parts) < min_parts:
+            continue
+        part = _write_lake_part(_read_lake_year(year_dir), year_dir / f"part-{tag}.parquet")
+        for old in parts:
+            if old != part:
+                old.unlink()
+        written.append(part)
+    return written
+
+
+def write_timeseries_from_lake(root: Path, market: str, path: Path, field: str = "close") -> tuple[int, int]:
+    """Write ``market``'s lake partition as the wide file ``path``; returns ``(rows, columns)``.
+
+    Each year partition becomes one row group, so the group is never held
+    in memory as a whole.
+    """
+    years = _price_lake_years(root, market)
+    tickers: set[str] = set()
+    for year_dir in years:
+        for part in year_dir.glob("part-*.parquet"):
+            tickers.update(pq.read_table(part, columns=["ticker"]).column("ticker").unique().to_pylist())
+    if not tickers:
+        return 0, 0
+    columns = sorted(tickers)
+    schema = pa.schema([("date", pa.timestamp("ns")), *[(ticker, pa.float64()) for ticker in columns]])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    rows = 0
+    with pq.ParquetWriter(tmp, schema) as writer:
+        for year_dir in years:
+            wide = _read_lake_year(year_dir, ["date", "ticker", field, "ingest"]).pivot(index="date", columns="ticker", values=field)
+            wide = wide.reindex(columns=columns).sort_index()
+            wide.index = pd.to_datetime(wide.index).astype("datetime64[ns]")
+            wide.index.name = "date"
+            writer.write_table(pa.Table.from_pandas(wide.reset_index(), schema=schema, preserve_index=False))
+            rows += len(wide)
+    tmp.replace(path)
+    return rows, len(columns)
+
+
 def safe_listing(fetcher: Callable[[], pd.DataFrame]) -> pd.DataFrame:
     try:
         df = fetcher()
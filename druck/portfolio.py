@@ -3,9 +3,58 @@ from dataclasses import dataclass
 from typing import Tuple
 import numpy as np
 import pandas as pd
+from .feature_panel import FEATURE_COLUMNS, MIN_SCORE_HISTORY, compute_feature_panel
 from .features import momentum_score, trend_score, rolling_vol, max_drawdown, zscore, sma, trailing_drawdown, persistence_score, recovery_score, downside_efficiency, relative_strength_vs_benchmark, capacity_penalty_score, residual_strength_vs_anchors
 
 
+class ReturnWindow:
+    """Trailing returns kept in ``attrs["return_correlation"]`` instead of a full correlation matrix.
+
+    pandas deep-copies ``attrs`` on most frame operations, so an N x N
+    matrix there was copied many times per scoring call. The window is
+    read-only and shared by every copy, and only the correlations the
+    diversification penalty reads are ever computed.
+    """
+
+    __slots__ = ("tickers", "values", "_pos")
+
+    def __init__(self, returns: pd.DataFrame):
+        self.tickers = [str(t) for t in returns.columns.tolist()]
+        self.values = returns.to_numpy(dtype=float, na_value=np.nan)
+        self.values.flags.writeable = False
+        self._pos = {t: i for i, t in enumerate(self.tickers)}
+
+    def __deepcopy__(self, memo) -> "ReturnWindow":
+        return self
+
+    @property
+    def empty(self) -> bool:
+        return self.values.size == 0
+
+    def _columns(self, tickers) -> np.ndarray:
+        pos = np.array([self._pos.get(str(ticker), -1) for ticker in tickers], dtype=np.int64)
+        out = self.values.take(np.maximum(pos, 0), axis=1) if self.values.shape[1] else np.empty((self.values.shape[0], len(pos)))
+        out[:, pos < 0] = np.nan
+        return out
+
+    def corr(self, rows, cols) -> np.ndarray:
+        """Pairwise-complete Pearson correlations of ``rows`` x ``cols``, like ``DataFrame.corr``."""
+        x = self._columns(rows)
+        x_ok = ~np.isnan(x)
+        out = np.full((len(rows), len(cols)), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for j, y in enumerate(self._columns(cols).T):
+                both = x_ok & ~np.isnan(y)[:, None]
+                n = both.sum(axis=0)
+                dx = np.where(both, x, 0.0)
+                dy = np.where(both, y[:, None], 0.0)
+                dx = np.where(both, dx - dx.sum(axis=0) / n, 0.0)
+                dy = np.where(both, dy - dy.sum(axis=0) / n, 0.0)
+                divisor = np.sqrt((dx * dx).sum(axis=0) * (dy * dy).sum(axis=0))
+                out[:, j] = np.where((n > 0) & (divisor != 0), (dx * dy).sum(axis=0) / divisor, np.nan)
+        return out
+
+
 def compute_diversification_adjustment(scores: pd.DataFrame, correlation_cfg: dict | None = None) -> pd.DataFrame:
     if scores.empty:
         return scores
@@ -28,26 +77,23 @@ def compute_diversification_adjustment(scores: pd.DataFrame, correlation_cfg: di
         out["diversification_score"] = 0.0
         return out
 
-    corr = corr.reindex(index=out.index, columns=out.index)
-    penalties: dict[str, float] = {}
-    contributions: dict[str, float] = {}
-    rank_order = out.sort_values("score", ascending=False).index.tolist()
-
-    for ticker in out.index:
-        peers = [peer for peer in rank_order if peer != ticker][:top_k]
-        if not peers:
-            penalties[ticker] = 0.0
-            contributions[ticker] = 0.0
-            continue
-        values = corr.loc[ticker, peers].fillna(0.0).astype(float)
-        positive_values = values[values > threshold]
-        avg_corr = float(positive_values.mean()) if not positive_values.empty else 0.0
-        penalty = max(0.0, avg_corr - threshold) * penalty_scale
-        penalties[ticker] = penalty
-        contributions[ticker] = max(0.0, 1.0 - avg_corr)
-
-    out["diversification_penalty"] = pd.Series(penalties).reindex(out.index).fillna(0.0)
-    out["diversification_score"] = pd.Series(contributions).reindex(out.index).fillna(0.0)
+    # Every ticker is compared with the top_k best-ranked other tickers, so
+    # only the top_k + 1 leading columns of the correlation matrix are read.
+    head = out["score"].sort_values(ascending=False).index[: top_k + 1].tolist()
+    if isinstance(corr, ReturnWindow):
+        values = corr.corr(list(out.index), head)
+    else:
+        values = corr.reindex(index=out.index, columns=head).to_numpy(dtype=float, na_value=np.nan)
+    values = np.nan_to_num(values, nan=0.0)
+    peers = np.asarray(out.index, dtype=object)[:, None] != np.asarray(head, dtype=object)[None, :]
+    peers &= np.cumsum(peers, axis=1) <= top_k
+    positive = peers & (values > threshold)
+    count = positive.sum(axis=1)
+    avg_corr = np.where(count > 0, np.where(positive, values, 0.0).sum(axis=1) / np.maximum(count, 1), 0.0)
+    has_peers = peers.any(axis=1)
+
+    out["diversification_penalty"] = np.where(has_peers, np.maximum(0.0, avg_corr - threshold) * penalty_scale, 0.0)
+    out["diversification_score"] = np.where(has_peers, np.maximum(0.0, 1.0 - avg_corr), 0.0)
     out["score"] = out["score"] - out["diversification_penalty"]
     out.attrs["diversification_cfg"] = {"lookback": lookback, "top_k": top_k, "penalty": penalty_scale, "min_correlation": threshold}
     return out.sort_values("score", ascending=False)
@@ -127,7 +173,7 @@ def apply_regime_factor_map(scores: pd.DataFrame, factor_pref: dict | None) -> p
     gate_threshold = float(gate.get("min_relative_strength_6m", 0.0))
     gate_mode = str(gate.get("mode", "penalty") or "penalty").strip().lower()
     gate_penalty = float(gate.get("penalty", 0.0))
-    gate_mask = out.index.to_series().isin(list(overweight)) & (out.get("relative_strength_6m", 0.0).fillna(-999.0) < gate_threshold)
+    gate_mask = pd.Series(out.index.isin(list(overweight)), index=out.index) & (out.get("relative_strength_6m", 0.0).fillna(-999.0) < gate_threshold)
     out["factor_gate_fail"] = gate_mask if gate_enabled else False
     out["factor_gate_excluded"] = False
     if gate_enabled:
@@ -135,7 +181,7 @@ def apply_regime_factor_map(scores: pd.DataFrame, factor_pref: dict | None) -> p
             out.loc[gate_mask, "factor_gate_excluded"] = True
             out = out.loc[~gate_mask].copy()
         elif gate_penalty > 0:
-            out.loc[gate_mask, "factor_map_bonus"] = out.loc[gate_mask, "factor_map_bonus"] - gate_penalty
+            out["factor_map_bonus"] = out["factor_map_bonus"].mask(gate_mask, out["factor_map_bonus"] - gate_penalty)
 
     out["score"] = out["score"] + out["factor_map_bonus"]
     return out.sort_values("score", ascending=False)
@@ -212,13 +258,53 @@ class SelectionResult:
     weights: pd.Series
 
 
-def _legacy_score(df: pd.DataFrame, sw: dict) -> pd.Series:
-    return (
-        float(sw['momentum']) * df['mom_z']
-        + float(sw['trend']) * df['trend_z']
-        - float(sw['vol_penalty']) * df['vol_z']
-        - float(sw['dd_penalty']) * df['dd_z']
-    )
+# (z-score column, score_weights key, default weight or None if required, sign)
+SCORE_TERMS: list[tuple[str, str, float | None, float]] = [
+    ('mom_z', 'momentum', None, 1.0),
+    ('trend_z', 'trend', None, 1.0),
+    ('persist_z', 'persistence', 0.20, 1.0),
+    ('recovery_z', 'recovery', 0.15, 1.0),
+    ('downside_z', 'downside_efficiency', 0.15, 1.0),
+    ('rel_strength_z', 'relative_strength', 0.10, 1.0),
+    ('capacity_z', 'capacity_awareness', 0.0, 1.0),
+    ('residual_strength_z', 'residual_strength', 0.0, 1.0),
+    ('vol_z', 'vol_penalty', None, -1.0),
+    ('dd_z', 'dd_penalty', None, -1.0),
+]
+LEGACY_SCORE_TERMS = [term for term in SCORE_TERMS if term[0] in {'mom_z', 'trend_z', 'vol_z', 'dd_z'}]
+
+
+def score_weight_vector(sw: dict, terms: list[tuple[str, str, float | None, float]] | None = None) -> pd.Series:
+    terms = terms or SCORE_TERMS
+    return pd.Series({z_col: sign * float(sw[key] if default is None else sw.get(key, default)) for z_col, key, default, sign in terms})
+
+
+def score_weight_matrix(weight_sets: dict[str, dict], terms: list[tuple[str, str, float | None, float]] | None = None) -> pd.DataFrame:
+    return pd.DataFrame({name: score_weight_vector(sw, terms) for name, sw in weight_sets.items()})
+
+
+def score_with_weight_sets(z: pd.DataFrame, weight_sets: dict[str, dict] | pd.DataFrame, terms: list[tuple[str, str, float | None, float]] | None = None) -> pd.DataFrame:
+    weights = weight_sets if isinstance(weight_sets, pd.DataFrame) else score_weight_matrix(weight_sets, terms)
+    if z.empty or weights.empty:
+        return pd.DataFrame(index=z.index, columns=weights.columns, dtype=float)
+    # Z @ W, accumulated term by term so every column matches the scalar formula bit for bit.
+    values = np.column_stack([z[column].to_numpy(dtype=float) for column in weights.index])
+    w = weights.to_numpy(dtype=float)
+    total = values[:, [0]] * w[0]
+    for i in range(1, len(weights.index)):
+        total = total + values[:, [i]] * w[i]
+    return pd.DataFrame(total, index=z.index, columns=weights.columns)
+
+
+def weighted_scores(inputs: pd.DataFrame, weight_sets: dict[str, dict]) -> dict[str, pd.DataFrame]:
+    """``legacy_score``/``score`` columns per weight set, for :func:`finalize_scores`.
+
+    All sets are scored in one pass over the z-matrix of ``inputs``, so
+    configs that only differ in their score weights share it.
+    """
+    full = score_with_weight_sets(inputs, weight_sets)
+    legacy = score_with_weight_sets(inputs, weight_sets, LEGACY_SCORE_TERMS)
+    return {name: pd.DataFrame({'legacy_score': legacy[name], 'score': full[name]}) for name in weight_sets}
 
 
 def apply_regime_factor_bias(scores: pd.DataFrame, regime_state: str, regime_factor_map: dict | None) -> pd.DataFrame:
@@ -238,23 +324,20 @@ def apply_regime_factor_bias(scores: pd.DataFrame, regime_state: str, regime_fac
     return out.sort_values('score', ascending=False)
 
 
-def score_universe(prices: pd.DataFrame, sw: dict, regime_state: str | None = None, regime_factor_map: dict | None = None, sleeve_map: dict[str, str] | None = None, benchmark_ticker: str | None = "SPY", relative_filter: dict | None = None, factor_pref: dict | None = None, correlation_cfg: dict | None = None, residual_cfg: dict | None = None) -> pd.DataFrame:
+def _per_ticker_features(prices: pd.DataFrame, benchmark_ticker: str | None = "SPY", residual_cfg: dict | None = None) -> pd.DataFrame:
     rows=[]
     benchmark = prices[benchmark_ticker].dropna() if benchmark_ticker and benchmark_ticker in prices.columns else None
-    relative_filter = relative_filter or {}
     residual_cfg = residual_cfg or {}
     anchor_tickers = [str(t) for t in residual_cfg.get('anchor_tickers', []) or [] if str(t) in prices.columns]
     anchor_frame = prices[anchor_tickers] if bool(residual_cfg.get('enabled', False)) and anchor_tickers else pd.DataFrame()
     residual_lookback = int(residual_cfg.get('lookback', 126) or 126)
     for t in prices.columns:
         p=prices[t].dropna()
-        if len(p)<260:
+        if len(p)<MIN_SCORE_HISTORY:
             continue
-        sleeve = sleeve_map.get(t, 'core') if sleeve_map else 'core'
         rs_126 = relative_strength_vs_benchmark(p, benchmark, 126) if benchmark is not None and t != benchmark_ticker else 0.0
         rows.append({
             'ticker':t,
-            'sleeve': sleeve,
             'momentum':momentum_score(p),
             'trend':trend_score(p),
             'persistence': persistence_score(p, 126),
@@ -267,36 +350,60 @@ def score_universe(prices: pd.DataFrame, sw: dict, regime_state: str | None = No
             'mdd_1y':max_drawdown(p,252),
         })
     if not rows:
+        return pd.DataFrame(columns=FEATURE_COLUMNS)
+    return pd.DataFrame(rows).set_index('ticker')[FEATURE_COLUMNS]
+
+
+def prepare_score_inputs(prices: pd.DataFrame, sleeve_map: dict[str, str] | None = None, benchmark_ticker: str | None = "SPY", correlation_cfg: dict | None = None, residual_cfg: dict | None = None, feature_engine: str = "panel", features: pd.DataFrame | None = None) -> pd.DataFrame:
+    if features is not None:
+        present = features.index.isin(prices.columns)
+        if not present.all():
+            features = features.loc[present]
+    elif feature_engine == "per_ticker":
+        features = _per_ticker_features(prices, benchmark_ticker, residual_cfg)
+    else:
+        features = compute_feature_panel(prices, benchmark_ticker, residual_cfg)
+    if features.empty:
         return pd.DataFrame()
-    df = pd.DataFrame(rows).set_index('ticker')
-    if df.empty:
-        return df
-    df['mom_z']=zscore(df['momentum'])
-    df['trend_z']=zscore(df['trend'].fillna(0.0))
-    df['persist_z']=zscore(df['persistence'].fillna(0.0))
-    df['recovery_z']=zscore(df['recovery'].fillna(0.0))
-    df['downside_z']=zscore(df['downside_efficiency'].fillna(0.0))
-    df['vol_z']=zscore(df['vol'])
-    df['dd_z']=zscore(df['mdd_1y'])
-    df['rel_strength_z']=zscore(df['relative_strength_6m'].fillna(0.0))
-    df['capacity_z']=zscore(df['capacity_score'].fillna(0.0))
-    df['residual_strength_z']=zscore(df['residual_strength'].fillna(0.0))
-    returns_corr = prices.pct_change(fill_method=None).tail(int((correlation_cfg or {}).get('lookback', 63) or 63)).corr() if len(prices.index) > 1 else pd.DataFrame()
-    df.attrs['return_correlation'] = returns_corr
-    df['legacy_score'] = _legacy_score(df, sw)
-    df['score']=(
-        float(sw['momentum'])*df['mom_z']
-        + float(sw['trend'])*df['trend_z']
-        + float(sw.get('persistence', 0.20))*df['persist_z']
-        + float(sw.get('recovery', 0.15))*df['recovery_z']
-        + float(sw.get('downside_efficiency', 0.15))*df['downside_z']
-        + float(sw.get('relative_strength', 0.10))*df['rel_strength_z']
-        + float(sw.get('capacity_awareness', 0.0))*df['capacity_z']
-        + float(sw.get('residual_strength', 0.0))*df['residual_strength_z']
-        - float(sw['vol_penalty'])*df['vol_z']
-        - float(sw['dd_penalty'])*df['dd_z']
-    )
-    df['score_uplift'] = df['score'] - df['legacy_score']
+    sleeves = pd.Series([sleeve_map.get(t, 'core') if sleeve_map else 'core' for t in features.index], index=features.index, name='sleeve')
+    z = {
+        'mom_z': zscore(features['momentum']),
+        'trend_z': zscore(features['trend'].fillna(0.0)),
+        'persist_z': zscore(features['persistence'].fillna(0.0)),
+        'recovery_z': zscore(features['recovery'].fillna(0.0)),
+        'downside_z': zscore(features['downside_efficiency'].fillna(0.0)),
+        'vol_z': zscore(features['vol']),
+        'dd_z': zscore(features['mdd_1y']),
+        'rel_strength_z': zscore(features['relative_strength_6m'].fillna(0.0)),
+        'capacity_z': zscore(features['capacity_score'].fillna(0.0)),
+        'residual_strength_z': zscore(features['residual_strength'].fillna(0.0)),
+    }
+    # One concat instead of a column insert per score input; each insert
+    # costs more than the z-score itself on a large universe.
+    df = pd.concat([sleeves, features, pd.DataFrame(z)], axis=1)
+    corr_lookback = int((correlation_cfg or {}).get('lookback', 63) or 63)
+    returns = prices.tail(corr_lookback + 1).pct_change(fill_method=None).tail(corr_lookback) if len(prices.index) > 1 else pd.DataFrame()
+    df.attrs['return_correlation'] = ReturnWindow(returns)
+    return df
+
+
+def finalize_scores(inputs: pd.DataFrame, sw: dict, regime_state: str | None = None, regime_factor_map: dict | None = None, relative_filter: dict | None = None, factor_pref: dict | None = None, correlation_cfg: dict | None = None, score_weight_sets: dict[str, dict] | None = None, weighted: pd.DataFrame | None = None) -> pd.DataFrame:
+    # ``weighted`` is ``sw``'s entry of :func:`weighted_scores` when it was
+    # computed together with other weight sets.
+    if inputs.empty:
+        return pd.DataFrame()
+    relative_filter = relative_filter or {}
+    if weighted is None:
+        weighted = weighted_scores(inputs, {'score': sw})['score']
+    scored = weighted[['legacy_score', 'score']].copy()
+    if score_weight_sets:
+        scored = pd.concat([scored, score_with_weight_sets(inputs, {f'score_{name}': weights for name, weights in score_weight_sets.items()})], axis=1)
+    scored['score_uplift'] = scored['score'] - scored['legacy_score']
+    # The return window only matters to the diversification step; keeping it
+    # off the frame until then spares every intermediate copy of ``attrs``.
+    window = inputs.attrs.get('return_correlation')
+    df = pd.concat([inputs, scored], axis=1)
+    df.attrs = {}
 
     threshold = relative_filter.get('min_relative_strength_6m') if relative_filter and relative_filter.get('enabled', False) else None
     if threshold is not None:
@@ -310,7 +417,7 @@ def score_universe(prices: pd.DataFrame, sw: dict, regime_state: str | None = No
             df.loc[mask, 'benchmark_relative_excluded'] = True
             df = df.loc[~mask].copy()
         elif penalty > 0:
-            df.loc[mask, 'score'] = df.loc[mask, 'score'] - penalty
+            df['score'] = df['score'].mask(mask, df['score'] - penalty)
     else:
         df['benchmark_relative_fail'] = False
         df['benchmark_relative_excluded'] = False
@@ -319,32 +426,38 @@ def score_universe(prices: pd.DataFrame, sw: dict, regime_state: str | None = No
     if regime_state is not None:
         df = apply_regime_factor_bias(df, regime_state, regime_factor_map)
     df = apply_regime_factor_map(df, factor_pref)
+    if window is not None:
+        df.attrs['return_correlation'] = window
     df = compute_diversification_adjustment(df, correlation_cfg)
     return df
 
+
+def score_universe(prices: pd.DataFrame, sw: dict, regime_state: str | None = None, regime_factor_map: dict | None = None, sleeve_map: dict[str, str] | None = None, benchmark_ticker: str | None = "SPY", relative_filter: dict | None = None, factor_pref: dict | None = None, correlation_cfg: dict | None = None, residual_cfg: dict | None = None, feature_engine: str = "panel", features: pd.DataFrame | None = None, score_weight_sets: dict[str, dict] | None = None) -> pd.DataFrame:
+    inputs = prepare_score_inputs(prices, sleeve_map, benchmark_ticker, correlation_cfg, residual_cfg, feature_engine, features)
+    return finalize_scores(inputs, sw, regime_state, regime_factor_map, relative_filter, factor_pref, correlation_cfg, score_weight_sets)
+
 def apply_sleeve_budget(weights: pd.Series, sleeve_map: dict[str, str] | None, sleeve_budget: dict[str, float] | None) -> pd.Series:
     if weights.empty or not sleeve_map or not sleeve_budget:
         return weights
     adjusted = weights.copy()
     result = adjusted.copy()
 
-    for sleeve in sorted({sleeve_map.get(t, 'other') for t in adjusted.index}):
-        members = [ticker for ticker in adjusted.index if sleeve_map.get(ticker, 'other') == sleeve]
-        if not members:
-            continue
-        sleeve_total = float(result.loc[members].sum())
+    sleeves = np.array([sleeve_map.get(t, 'other') for t in adjusted.index], dtype=object)
+    for sleeve in sorted(set(sleeves)):
+        members = sleeves == sleeve
+        sleeve_total = float(result[members].sum())
         budget = float(sleeve_budget.get(sleeve, sleeve_total))
         if sleeve_total > budget > 0:
-            result.loc[members] = result.loc[members] * (budget / sleeve_total)
+            result[members] = result[members] * (budget / sleeve_total)
 
     capped_sleeves = {sleeve for sleeve in sleeve_budget}
-    uncapped_members = [ticker for ticker in result.index if sleeve_map.get(ticker, 'other') not in capped_sleeves]
-    capped_total = float(result.drop(index=uncapped_members).sum()) if uncapped_members else float(result.sum())
+    uncapped_members = np.array([sleeve not in capped_sleeves for sleeve in sleeves], dtype=bool)
+    capped_total = float(result[~uncapped_members].sum()) if uncapped_members.any() else float(result.sum())
     residual = max(0.0, 1.0 - capped_total)
-    if uncapped_members and residual > 1e-12:
-        uncapped_total = float(result.loc[uncapped_members].sum())
+    if uncapped_members.any() and residual > 1e-12:
+        uncapped_total = float(result[uncapped_members].sum())
         if uncapped_total > 0:
-            result.loc[uncapped_members] = result.loc[uncapped_members] * (residual / uncapped_total)
+            result[uncapped_members] = result[uncapped_members] * (residual / uncapped_total)
 
     return result
 
@@ -0,0 +1,456 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of one process are serialized
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+
+def _day(value: Any) -> str:
+    return pd.Timestamp(value).strftime("%Y-%m-%d")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _ticker_file(ticker: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker)
+    digest = hashlib.sha1(ticker.encode("utf-8")).hexdigest()[:8]
+    return f"{safe}-{digest}.arrow"
+
+
+# A tail refetch starts this many calendar days before the covered end, so
+# it overlaps settled stored closes that a split or dividend would restate.
+REFETCH_OVERLAP_DAYS = 7
+REVISION_RTOL = 1e-6
+# Read hits are buffered per process and written with the next manifest
+# update, or at the latest this long after the first buffered one.
+HIT_FLUSH_SECONDS = 30.0
+
+_MANIFEST_LOCKS: dict[str, threading.RLock] = {}
+_MANIFEST_LOCKS_GUARD = threading.Lock()
+_PENDING_HITS: dict[str, dict[str, tuple[int, str]]] = {}
+_PENDING_SINCE: dict[str, float] = {}
+_PENDING_GUARD = threading.Lock()
+
+
+def _manifest_lock(path: Path) -> threading.RLock:
+    with _MANIFEST_LOCKS_GUARD:
+        return _MANIFEST_LOCKS.setdefault(str(path.resolve()), threading.RLock())
+
+
+def _restates(old: pd.Series, fresh: pd.Series) -> bool:
+    """Whether ``fresh`` disagrees with settled closes of ``old``, as after a split or dividend.
+
+    The last stored day is left out: it may have been stored intraday.
+    """
+    settled = old.iloc[:-1]
+    shared = settled.index.intersection(fresh.index)
+    if shared.empty:
+        return False
+    return not np.allclose(fresh.loc[shared].to_numpy(dtype=float), settled.loc[shared].to_numpy(dtype=float), rtol=REVISION_RTOL, atol=0.0)
+
+
+def _tmp_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.tmp-{os.getpid()}-{threading.get_ident()}")
+
+
+@dataclass
+class PriceCache:
+    """Per-ticker close/volume store under ``<cache_dir>/prices``.
+
+    Each ticker is an uncompressed Arrow IPC file of ``date``/``close``/
+    ``volume``, memory-mapped on read. Files written before volume was
+    stored simply read back an all-NaN volume.
+
+    ``manifest.json`` records, per ticker, the file and the date range that
+    has been requested from providers, so a later request is served from
+    disk and only uncovered tickers or trailing days are fetched again. It
+    is also the cache index: each entry carries its size, hit count and
+    last access time for :class:`druck.cache_manager.CacheManager`.
+
+    Instances are cheap and short-lived, so every update re-reads the
+    manifest under a lock per cache directory, held across threads and
+    (through ``manifest.lock``) processes, and writes it back through a
+    temporary file of its own; concurrent fetches, the web app and
+    ``run_cache.py prune`` then neither drop each other's entries nor share
+    a temporary file. Reads only buffer their hits, see :meth:`flush_hits`.
+    """
+
+    cache_dir: str | Path
+    _manifest: dict[str, dict[str, Any]] | None = field(default=None, init=False, repr=False)
+
+    @property
+    def root(self) -> Path:
+        return Path(self.cache_dir) / "prices"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / "manifest.json"
+
+    @property
+    def manifest(self) -> dict[str, dict[str, Any]]:
+        if self._manifest is None:
+            try:
+                self._manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+
+    @contextmanager
+    def _locked(self) -> Iterator[dict[str, dict[str, Any]]]:
+        """Hold the manifest's locks with a freshly read manifest and this process's buffered hits."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with _manifest_lock(self.manifest_path), open(self.root / "manifest.lock", "a") as handle:
+            if fcntl is not None:
+                # Released when the handle closes.
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            self._manifest = None
+            self._apply_pending_hits(self.manifest)
+            yield self.manifest
+
+    def _save_manifest(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = _tmp_path(self.manifest_path)
+        tmp.write_text(json.dumps(self.manifest, indent=2, sort_keys=True), encoding="utf-8")
+        tmp.replace(self.manifest_path)
+
+    def coverage(self, ticker: str) -> tuple[str, str] | None:
+        entry = self.manifest.get(ticker)
+        if not entry or not (self.root / entry["file"]).exists():
+            return None
+        return entry["start"], entry["end"]
+
+    def stamp(self, tickers: list[str]) -> list[str]:
+        """Coverage, size and mtime of each stored ticker file; any write changes it, a read does not."""
+        out: list[str] = []
+        for ticker in tickers:
+            entry = self.manifest.get(ticker)
+            if not entry:
+                continue
+            try:
+                stat = (self.root / entry["file"]).stat()
+            except OSError:
+                continue
+            out.append(f"{ticker}:{entry.get('start')}:{entry.get('end')}:{stat.st_mtime_ns}:{stat.st_size}")
+        return out
+
+    def plan(self, tickers: list[str], start: str, end: str) -> dict[str, list[str]]:
+        """Group the tickers that need a provider call by fetch start date.
+
+        Covered tickers are left out; tickers covered from ``start`` but not
+        up to ``end`` refetch from ``REFETCH_OVERLAP_DAYS`` before their
+        covered end, so stored days are refreshed and :meth:`write` can check
+        them; anything else refetches the full range.
+        """
+        start, end = _day(start), _day(end)
+        plan: dict[str, list[str]] = {}
+        for ticker in tickers:
+            cov = self.coverage(ticker)
+            if cov is not None and cov[0] <= start and cov[1] >= end:
+                continue
+            fetch_start = start
+            if cov is not None and cov[0] <= start and cov[1] >= start:
+                fetch_start = max(start, _day(pd.Timestamp(cov[1]) - pd.Timedelta(days=REFETCH_OVERLAP_DAYS)))
+            plan.setdefault(fetch_start, []).append(ticker)
+        return plan
+
+    def _read_arrays(self, ticker: str, memory_map: bool = True, field: str = "close") -> tuple[np.ndarray, np.ndarray] | None:
+        entry = self.manifest.get(ticker)
+        if not entry:
+            return None
+        try:
+            table = feather.read_table(self.root / entry["file"], memory_map=memory_map)
+        except (OSError, pa.ArrowException):
+            return None
+        dates = table.column("date").to_numpy()
+        if field not in table.column_names:
+            return dates, np.full(len(dates), np.nan)
+        return dates, table.column(field).to_numpy(zero_copy_only=False)
+
+    def read(self, tickers: list[str], start: str, end: str, field: str = "close") -> pd.DataFrame:
+        lo, hi = np.datetime64(pd.Timestamp(start)), np.datetime64(pd.Timestamp(end))
+        names: list[str] = []
+        slices: list[tuple[np.ndarray, np.ndarray]] = []
+        for ticker in tickers:
+            arrays = self._read_arrays(ticker, field=field)
+            if arrays is None:
+                continue
+            dates, closes = arrays
+            i, j = np.searchsorted(dates, lo, "left"), np.searchsorted(dates, hi, "right")
+            if field != "close" and np.isnan(closes[i:j]).all():
+                continue
+            if j > i:
+                names.append(ticker)
+                slices.append((dates[i:j], closes[i:j]))
+        if names and field == "close":
+            self._record_hits(names)
+        if not slices:
+            return pd.DataFrame()
+        index = np.unique(np.concatenate([dates for dates, _ in slices]))
+        values = np.full((len(index), len(slices)), np.nan)
+        for j, (dates, closes) in enumerate(slices):
+            values[np.searchsorted(index, dates), j] = closes
+        return pd.DataFrame(values, index=pd.DatetimeIndex(index), columns=names)
+
+    def write(self, frame: pd.DataFrame, start: str, end: str, volume: pd.DataFrame | None = None) -> list[str]:
+        """Merge fetched closes (and volumes) into the store and extend each ticker's coverage.
+
+        Only tickers with a close are recorded, so symbols a provider
+        returned nothing for are retried next time. A ticker whose fetched
+        closes restate its stored ones (adjusted prices after a split or
+        dividend) keeps only the fetched range; those tickers are returned
+        so the caller can refetch their full history.
+        """
+        restated: list[str] = []
+        if frame is None or frame.empty:
+            return restated
+        start, end = _day(start), _day(end)
+        frame = frame.copy()
+        frame.index = pd.to_datetime(frame.index)
+        with self._locked():
+            for ticker in frame.columns:
+                fresh = pd.to_numeric(frame[ticker], errors="coerce").dropna()
+                if fresh.empty:
+                    continue
+                ticker = str(ticker)
+                entry = self.manifest.get(ticker) or {"file": _ticker_file(ticker)}
+                # No memory map here: the file is replaced below, which fails on
+                # Windows while a mapping is still open.
+                arrays = self._read_arrays(ticker, memory_map=False) if "start" in entry else None
+                old = pd.Series(arrays[1], index=pd.DatetimeIndex(arrays[0])) if arrays is not None else None
+                if old is not None and _restates(old, fresh):
+                    restated.append(ticker)
+                    arrays = old = None
+                merged = fresh if old is None else fresh.combine_first(old)
+                merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+                old_volume = self._read_arrays(ticker, memory_map=False, field="volume") if arrays is not None else None
+                merged_volume = pd.Series(np.nan, index=merged.index)
+                if old_volume is not None:
+                    merged_volume = pd.Series(old_volume[1], index=pd.DatetimeIndex(old_volume[0])).reindex(merged.index)
+                if volume is not None and ticker in volume.columns:
+                    fresh_volume = pd.to_numeric(volume[ticker], errors="coerce").dropna()
+                    fresh_volume.index = pd.to_datetime(fresh_volume.index)
+                    merged_volume = fresh_volume.reindex(merged.index).combine_first(merged_volume)
+                cov = self.coverage(ticker) if old is not None else None
+                if cov is not None and cov[0] <= end and cov[1] >= start:
+                    entry["start"], entry["end"] = min(cov[0], start), max(cov[1], end)
+                else:
+                    entry["start"], entry["end"] = start, end
+                entry["rows"] = int(len(merged))
+                entry["last_date"] = _day(merged.index[-1])
+                path = self.root / entry["file"]
+                tmp = _tmp_path(path)
+                table = pa.table({
+                    "date": pa.array(merged.index.to_numpy()),
+                    "close": pa.array(merged.to_numpy(dtype=np.float64)),
+                    "volume": pa.array(merged_volume.to_numpy(dtype=np.float64)),
+                })
+                feather.write_feather(table, tmp, compression="uncompressed")
+                tmp.replace(path)
+                entry["bytes"] = int(path.stat().st_size)
+                entry["last_access"] = _now()
+                entry.setdefault("hits", 0)
+                self.manifest[ticker] = entry
+            self._save_manifest()
+        return restated
+
+    def _record_hits(self, tickers: list[str]) -> None:
+        now = _now()
+        key = str(self.manifest_path.resolve())
+        with _PENDING_GUARD:
+            pending = _PENDING_HITS.setdefault(key, {})
+            for ticker in tickers:
+                pending[ticker] = (pending.get(ticker, (0, now))[0] + 1, now)
+            due = time.monotonic() - _PENDING_SINCE.setdefault(key, time.monotonic()) >= HIT_FLUSH_SECONDS
+        if due:
+            self.flush_hits()
+
+    def _apply_pending_hits(self, manifest: dict[str, dict[str, Any]]) -> None:
+        key = str(self.manifest_path.resolve())
+        with _PENDING_GUARD:
+            pending = _PENDING_HITS.pop(key, {})
+            _PENDING_SINCE.pop(key, None)
+        for ticker, (count, last_access) in pending.items():
+            entry = manifest.get(ticker)
+            if entry is not None:
+                entry["hits"] = int(entry.get("hits", 0)) + count
+                entry["last_access"] = max(str(entry.get("last_access") or ""), last_access)
+
+    def flush_hits(self) -> None:
+        """Write the hits this process buffered for this cache to the manifest."""
+        with _PENDING_GUARD:
+            if not _PENDING_HITS.get(str(self.manifest_path.resolve())):
+                return
+        try:
+            with self._locked():
+                self._save_manifest()
+        except OSError:
+            pass
+
+    def evict(self, tickers: list[str]) -> int:
+        """Delete the given tickers' files and index entries; returns bytes freed."""
+        freed = 0
+        with self._locked() as manifest:
+            for ticker in tickers:
+                entry = manifest.pop(ticker, None)
+                if entry is None:
+                    continue
+                path = self.root / entry["file"]
+                if path.exists():
+                    freed += path.stat().st_size
+                    path.unlink()
+            self._save_manifest()
+        return freed
+
+    def import_legacy(self) -> int:
+        """Fold old ``px_<digest>_<start>_<end>.csv`` caches into the store and delete them.
+
+        Returns the number of files imported. Once migrated, the directory
+        holds no such files and the glob finds nothing.
+        """
+        imported = 0
+        for legacy in sorted(Path(self.cache_dir).glob("px_*.csv")):
+            parts = legacy.stem.split("_")
+            if len(parts) != 4:
+                continue
+            try:
+                self.write(pd.read_csv(legacy, index_col=0, parse_dates=True), parts[2], parts[3])
+            except Exception:
+                continue
+            legacy.unlink()
+            imported += 1
+        return imported
+
+
+def _flush_all_hits() -> None:
+    with _PENDING_GUARD:
+        paths = list(_PENDING_HITS)
+    for path in paths:
+        PriceCache(Path(path).parent.parent).flush_hits()
+
+
+atexit.register(_flush_all_hits)
+
+
+@dataclass
+class _MemoryEntry:
+    start: str
+    end: str
+    close: pd.Series
+    loaded_at: float
+    nbytes: int
+
+
+class MemoryPriceCache:
+    """Process-wide close columns kept in memory between ``fetch_prices`` calls.
+
+    Entries are per ``(source, ticker)`` with the date range they were
+    fetched for, so an overlapping request is assembled from stored columns
+    and only uncovered tickers go to disk or providers. Entries expire after
+    the caller's TTL and the least recently used are dropped once the held
+    columns exceed the byte budget. :meth:`single_flight` serializes
+    identical concurrent requests so the second one finds the first one's
+    result instead of fetching it again.
+    """
+
+    def __init__(self) -> None:
+        self._entries: OrderedDict[tuple[Any, str], _MemoryEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights: dict[Any, list] = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, source: Any, tickers: list[str], start: str, end: str, ttl: float) -> tuple[pd.DataFrame, list[str]]:
+        """Covered columns sliced to ``start..end`` and the tickers still missing."""
+        start, end = _day(start), _day(end)
+        lo, hi = pd.Timestamp(start), pd.Timestamp(end)
+        now = time.monotonic()
+        found: dict[str, pd.Series] = {}
+        missing: list[str] = []
+        with self._lock:
+            for ticker in tickers:
+                key = (source, ticker)
+                entry = self._entries.get(key)
+                if entry is not None and now - entry.loaded_at > ttl:
+                    self._drop(key)
+                    entry = None
+                if entry is None or entry.start > start or entry.end < end:
+                    missing.append(ticker)
+                    continue
+                self._entries.move_to_end(key)
+                found[ticker] = entry.close.loc[lo:hi]
+            self.hits += len(found)
+            self.misses += len(missing)
+        return (pd.DataFrame(found) if found else pd.DataFrame()), missing
+
+    def put(self, source: Any, frame: pd.DataFrame, start: str, end: str, max_bytes: int = 0) -> None:
+        if frame is None or frame.empty:
+            return
+        start, end = _day(start), _day(end)
+        now = time.monotonic()
+        with self._lock:
+            for ticker in frame.columns:
+                close = frame[ticker].dropna().copy()
+                if close.empty:
+                    continue
+                key = (source, str(ticker))
+                self._drop(key)
+                entry = _MemoryEntry(start, end, close, now, int(close.memory_usage(index=True, deep=False)))
+                self._entries[key] = entry
+                self.nbytes += entry.nbytes
+            while max_bytes > 0 and self.nbytes > max_bytes and self._entries:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: tuple[Any, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry.nbytes
+
+    @contextmanager
+    def single_flight(self, key: Any) -> Iterator[None]:
+        with self._lock:
+            flight = self._flights.setdefault(key, [threading.Lock(), 0])
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if flight[1] == 0:
+                    self._flights.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.nbytes, "hits": self.hits, "misses": self.misses}
+
+
+PRICE_MEMORY = MemoryPriceCache()
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+PANEL_DTYPES = {"float64", "float32"}
+
+
+def write_price_panel(frame: pd.DataFrame, path: str | Path, dtype: str = "float64", meta: dict[str, Any] | None = None) -> Path:
+    """Store ``frame`` as a memory-mappable panel directory.
+
+    The directory holds ``values.npy`` (dates x tickers, Fortran order so
+    every ticker column is one contiguous run), ``dates.npy`` and
+    ``meta.json`` with the tickers and any caller ``meta``. It is built
+    under a temporary name and renamed into place.
+    """
+    if str(dtype) not in PANEL_DTYPES:
+        raise ValueError(f"Price panel dtype must be one of: {', '.join(sorted(PANEL_DTYPES))}")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    values = np.asfortranarray(frame.to_numpy(dtype=dtype, na_value=np.nan))
+    np.save(tmp / "values.npy", values)
+    np.save(tmp / "dates.npy", pd.DatetimeIndex(frame.index).to_numpy())
+    freq = getattr(frame.index, "freqstr", None)
+    payload = {"tickers": [str(c) for c in frame.columns], "dtype": str(dtype), "shape": list(values.shape), "freq": freq, "meta": meta or {}}
+    (tmp / "meta.json").write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if path.exists():
+        old = path.with_name(f".{path.name}.old-{os.getpid()}")
+        path.replace(old)
+        tmp.replace(path)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        tmp.replace(path)
+    return path
+
+
+def read_price_panel_meta(path: str | Path) -> dict[str, Any]:
+    return json.loads((Path(path) / "meta.json").read_text(encoding="utf-8"))
+
+
+def load_price_panel(path: str | Path, mmap: bool = True) -> pd.DataFrame:
+    """Open a panel written by :func:`write_price_panel` as a DataFrame.
+
+    With ``mmap`` the frame is a read-only view over the mapped file, so
+    processes opening the same panel share its pages instead of holding
+    their own copy.
+    """
+    path = Path(path)
+    payload = read_price_panel_meta(path)
+    values = np.load(path / "values.npy", mmap_mode="r" if mmap else None)
+    dates = np.load(path / "dates.npy")
+    index = pd.DatetimeIndex(dates, freq=payload.get("freq"))
+    return pd.DataFrame(values, index=index, columns=payload["tickers"], copy=False)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(pd.Timestamp(value))
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default, ensure_ascii=False)
+
+
+def write_result_frames(path: str | Path, frames: dict[str, pd.DataFrame | pd.Series | None], payload: dict[str, Any] | None = None) -> Path:
+    """Store named frames and a JSON ``payload`` as one directory.
+
+    Every frame is a zstd-compressed ``<name>.parquet``. Object columns that
+    hold dicts or lists (the rebalance log's weights, picks and sleeves) are
+    written as JSON text and decoded again on read. ``meta.json`` records
+    the payload and how to rebuild each frame. Like
+    :func:`druck.price_panel.write_price_panel`, the directory is built under
+    a temporary name and renamed into place.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp-{os.getpid()}")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    layout: dict[str, Any] = {}
+    for name, frame in frames.items():
+        if frame is None:
+            layout[name] = None
+            continue
+        series = isinstance(frame, pd.Series)
+        table = frame.to_frame(name="value") if series else frame.copy(deep=False)
+        json_columns = [str(c) for c in table.columns if table[c].dtype == object and any(isinstance(v, (dict, list, tuple)) for v in table[c])]
+        for column in json_columns:
+            table[column] = [dumps(v) for v in table[column]]
+        freq = getattr(table.index, "freqstr", None) if isinstance(table.index, pd.DatetimeIndex) else None
+        pq.write_table(pa.Table.from_pandas(table, preserve_index=True), tmp / f"{name}.parquet", compression="zstd")
+        layout[name] = {"series": series, "name": frame.name if series else None, "json_columns": json_columns, "freq": freq}
+    (tmp / "meta.json").write_text(dumps({"frames": layout, "payload": payload or {}}), encoding="utf-8")
+    return replace_directory(tmp, path)
+
+
+def replace_directory(tmp: str | Path, path: str | Path) -> Path:
+    """Move the finished directory ``tmp`` to ``path``, replacing any old one."""
+    tmp, path = Path(tmp), Path(path)
+    if path.exists():
+        old = path.with_name(f".{path.name}.old-{os.getpid()}")
+        path.replace(old)
+        tmp.replace(path)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        tmp.replace(path)
+    return path
+
+
+def read_result_meta(path: str | Path) -> dict[str, Any]:
+    return json.loads((Path(path) / "meta.json").read_text(encoding="utf-8"))
+
+
+def read_result_frames(path: str | Path) -> tuple[dict[str, pd.DataFrame | pd.Series | None], dict[str, Any]]:
+    """Read a directory written by :func:`write_result_frames` back as ``(frames, payload)``."""
+    path = Path(path)
+    meta = read_result_meta(path)
+    frames: dict[str, pd.DataFrame | pd.Series | None] = {}
+    for name, layout in meta["frames"].items():
+        if layout is None:
+            frames[name] = None
+            continue
+        frame = pq.read_table(path / f"{name}.parquet").to_pandas()
+        for column in layout["json_columns"]:
+            frame[column] = pd.Series([json.loads(v) for v in frame[column]], index=frame.index, dtype=object)
+        if layout.get("freq") and isinstance(frame.index, pd.DatetimeIndex):
+            frame.index.freq = layout["freq"]
+        frames[name] = frame["value"].rename(layout["name"]) if layout["series"] else frame
+    return frames, meta["payload"]
+
+
+class ResultCache:
+    """Result directories named by a content key, evicted LRU over ``max_bytes``.
+
+    A hit touches the entry's ``meta.json``; that mtime is the recency the
+    eviction sorts on, as for prepared price panels. A zero budget keeps
+    every entry.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int = 0):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+
+    def get(self, key: str) -> Path | None:
+        meta = self.root / key / "meta.json"
+        try:
+            os.utime(meta)
+        except OSError:
+            return None
+        return meta.parent
+
+    def put(self, key: str, frames: dict[str, pd.DataFrame | pd.Series | None], payload: dict[str, Any] | None = None) -> Path:
+        path = write_result_frames(self.root / key, frames, payload)
+        self.prune(keep=key)
+        return path
+
+    def prune(self, keep: str | None = None) -> list[str]:
+        """Drop the least recently used entries until the total fits; returns their keys."""
+        if self.max_bytes <= 0 or not self.root.is_dir():
+            return []
+        entries = []
+        for meta in self.root.glob("*/meta.json"):
+            if meta.parent.name.startswith("."):
+                continue
+            try:
+                entries.append((meta.stat().st_mtime, meta.parent, sum(p.stat().st_size for p in meta.parent.iterdir())))
+            except OSError:
+                continue
+        entries.sort(key=lambda entry: entry[0])
+        total = sum(size for _, _, size in entries)
+        evicted: list[str] = []
+        for _, path, size in entries:
+            if total <= self.max_bytes:
+                break
+            if path.name == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            evicted.append(path.name)
+        return evicted
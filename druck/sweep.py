@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from itertools import product
+from pathlib import Path
+from typing import Any
+import hashlib
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from .backtest import BacktestExecutor, BacktestInputs, _backtest_config, _code_version, backtest_fingerprint, prepare_backtest_inputs
+from .data import get_date_range
+
+SWEEP_METRICS = [
+    "total_return",
+    "cagr",
+    "sharpe",
+    "sortino",
+    "calmar",
+    "max_drawdown",
+    "volatility",
+    "active_return",
+    "avg_turnover",
+    "total_cost",
+    "halt_count",
+    "rebalances",
+]
+
+# These change which prices are fetched or how the shared panel is prepared,
+# so they cannot vary between candidates that share one BacktestInputs.
+_PREP_SECTIONS = {"data", "universe"}
+_PREP_BACKTEST_KEYS = {
+    "min_history_days",
+    "strict_point_in_time",
+    "drop_incomplete_assets",
+    "enforce_delist_exit",
+    "universe_timeline_path",
+    "volume_data_path",
+    "executor",
+    "max_workers",
+}
+
+
+def _check_parameter_path(path: str) -> None:
+    parts = path.split(".")
+    if not path or any(not part for part in parts):
+        raise ValueError(f"Invalid sweep parameter path: {path!r}")
+    if parts[0] in _PREP_SECTIONS or (parts[0] == "backtest" and len(parts) > 1 and parts[1] in _PREP_BACKTEST_KEYS):
+        raise ValueError(f"Sweep parameter {path!r} changes the shared price inputs; run a separate sweep per value instead")
+
+
+def _sample_value(rng: np.random.Generator, values: Any) -> Any:
+    if isinstance(values, dict):
+        low, high = values["low"], values["high"]
+        if isinstance(low, int) and isinstance(high, int) and not isinstance(low, bool):
+            return int(rng.integers(low, high + 1))
+        return float(rng.uniform(float(low), float(high)))
+    return values[int(rng.integers(len(values)))]
+
+
+def expand_sweep_spec(spec: dict[str, Any]) -> list[dict[str, Any]]:
+    """Expand a sweep spec into a list of ``{dotted.path: value}`` overrides.
+
+    ``mode: grid`` takes the cartesian product of ``parameters`` (path ->
+    list of values). ``mode: random`` draws ``samples`` candidates with
+    ``seed``; a parameter may also be a ``{low, high}`` range there.
+    """
+    parameters = spec.get("parameters", {}) or {}
+    if not isinstance(parameters, dict) or not parameters:
+        raise ValueError("Sweep spec needs a non-empty 'parameters' mapping")
+    for path in parameters:
+        _check_parameter_path(str(path))
+
+    mode = str(spec.get("mode", "grid") or "grid").strip().lower()
+    paths = list(parameters)
+    if mode == "grid":
+        for path in paths:
+            if not isinstance(parameters[path], list) or not parameters[path]:
+                raise ValueError(f"Grid parameter {path!r} must be a non-empty list")
+        candidates = [dict(zip(paths, combo)) for combo in product(*(parameters[p] for p in paths))]
+    elif mode == "random":
+        samples = int(spec.get("samples", 20))
+        if samples <= 0:
+            raise ValueError("Random sweep 'samples' must be > 0")
+        rng = np.random.default_rng(spec.get("seed", 0))
+        candidates = [{p: _sample_value(rng, parameters[p]) for p in paths} for _ in range(samples)]
+    else:
+        raise ValueError("Sweep 'mode' must be one of: grid, random")
+
+    unique: dict[str, dict[str, Any]] = {}
+    for params in candidates:
+        unique.setdefault(candidate_id(params), params)
+    return list(unique.values())
+
+
+def candidate_id(params: dict[str, Any]) -> str:
+    payload = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def apply_overrides(cfg: dict[str, Any], params: dict[str, Any]) -> dict[str, Any]:
+    out = deepcopy(cfg)
+    for path, value in params.items():
+        node = out
+        *parents, leaf = path.split(".")
+        for key in parents:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = {}
+                node[key] = child
+            node = child
+        node[leaf] = deepcopy(value)
+    return out
+
+
+def _run_key(candidate_cfg: dict[str, Any], data_end: str) -> str:
+    # A row only stands for this candidate while its config sections, the
+    # data window's end and the package source are unchanged.
+    payload = f"{backtest_fingerprint(candidate_cfg)}:{data_end}:{_code_version()}"
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _completed_candidates(results_dir: Path, run_keys: dict[str, str]) -> set[str]:
+    done: set[str] = set()
+    for part in results_dir.glob("*.parquet"):
+        try:
+            frame = pd.read_parquet(part, columns=["candidate_id", "run_key", "status"])
+        except Exception:
+            continue
+        current = frame["run_key"].astype(str) == frame["candidate_id"].astype(str).map(run_keys)
+        done.update(frame.loc[(frame["status"] == "ok") & current, "candidate_id"].astype(str))
+    return done
+
+
+def _write_row(results_dir: Path, row: dict[str, Any]) -> None:
+    part = results_dir / f"{row['candidate_id']}.parquet"
+    tmp = part.with_suffix(".parquet.tmp")
+    pd.DataFrame([row]).to_parquet(tmp, index=False)
+    tmp.replace(part)
+
+
+def load_sweep_results(results_dir: str | Path) -> pd.DataFrame:
+    path = Path(results_dir)
+    parts = sorted(path.glob("*.parquet")) if path.exists() else []
+    if not parts:
+        return pd.DataFrame(columns=["candidate_id", "run_key", "params", *SWEEP_METRICS, "finished_seconds", "status", "error"])
+    return pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+
+
+def run_sweep(
+    cfg: dict[str, Any],
+    spec: dict[str, Any],
+    results_dir: str | Path,
+    inputs: BacktestInputs | None = None,
+    executor: str | None = None,
+    max_workers: int | None = None,
+    resume: bool = True,
+) -> pd.DataFrame:
+    """Backtest every candidate of ``spec`` against one shared price panel.
+
+    Each finished candidate is written to ``results_dir/<candidate_id>.parquet``
+    as soon as it completes, tagged with a ``run_key`` of its config
+    fingerprint, the data end date and the package source. With ``resume``
+    candidates that already have an ``ok`` row under the current key are
+    skipped; only rows under the current key are returned.
+    """
+    out = Path(results_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    candidates = expand_sweep_spec(spec)
+    data_end = get_date_range(cfg["data"]["lookback_years"])[1]
+    run_keys = {candidate_id(params): _run_key(apply_overrides(cfg, params), data_end) for params in candidates}
+    done = _completed_candidates(out, run_keys) if resume else set()
+    pending = [params for params in candidates if candidate_id(params) not in done]
+
+    if pending:
+        base_bt_cfg = _backtest_config(cfg)
+        if executor is not None:
+            base_bt_cfg.executor = executor
+        if max_workers is not None:
+            base_bt_cfg.max_workers = int(max_workers)
+        if inputs is None:
+            inputs = prepare_backtest_inputs(cfg, base_bt_cfg)
+
+        jobs: list[tuple] = []
+        for params in pending:
+            candidate_cfg = apply_overrides(cfg, params)
+            jobs.append((candidate_cfg, None, _backtest_config(candidate_cfg), params))
+
+        started = time.perf_counter()
+        with BacktestExecutor(base_bt_cfg, inputs) as pool:
+            # Candidates' decisions are not reused once their row is written.
+            for i, result, error in pool.iter_results([job[:3] for job in jobs], release_decisions=True):
+                params = jobs[i][3]
+                row = {"candidate_id": candidate_id(params), "run_key": run_keys[candidate_id(params)], "params": json.dumps(params, sort_keys=True, default=str)}
+                summary = result.summary if result is not None else {}
+                row.update({k: float(summary[k]) if k in summary else np.nan for k in SWEEP_METRICS})
+                row["finished_seconds"] = float(time.perf_counter() - started)
+                row["status"] = "ok" if error is None else "error"
+                row["error"] = "" if error is None else f"{type(error).__name__}: {error}"
+                _write_row(out, row)
+
+    results = load_sweep_results(out)
+    if "run_key" not in results.columns:
+        results["run_key"] = None
+    results = results[results["run_key"].astype(str) == results["candidate_id"].astype(str).map(run_keys)]
+    return results.sort_values("sharpe", ascending=False, na_position="last").reset_index(drop=True)
@@ -1,3 +1,4 @@
+import threading
 import time
 from collections import deque
 
@@ -5,13 +6,56 @@ class RateLimiter:
     def __init__(self, max_per_sec: int = 5):
         self.max_per_sec = int(max_per_sec)
         self.calls = deque()
+        self._lock = threading.Lock()
 
     def wait(self):
-        now = time.time()
-        while self.calls and now - self.calls[0] > 1:
-            self.calls.popleft()
-        if len(self.calls) >= self.max_per_sec:
-            sleep_time = 1 - (now - self.calls[0])
-            if sleep_time > 0:
-                time.sleep(sleep_time)
-        self.calls.append(time.time())
+        with self._lock:
+            now = time.time()
+            while self.calls and now - self.calls[0] > 1:
+                self.calls.popleft()
+            if len(self.calls) >= self.max_per_sec:
+                sleep_time = 1 - (now - self.calls[0])
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+            self.calls.append(time.time())
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by concurrent provider calls.
+
+    ``slow_down`` cuts the refill rate after a rate-limit response and
+    ``recover`` moves it back toward the configured rate on success.
+    A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate_per_sec: float = 5.0, burst: int | None = None, min_rate: float = 0.2):
+        self.max_rate = float(rate_per_sec)
+        self.rate = self.max_rate
+        self.min_rate = min(float(min_rate), self.max_rate) if self.max_rate > 0 else 0.0
+        self.capacity = float(burst if burst is not None else max(1, int(self.max_rate)))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.max_rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def slow_down(self, factor: float = 0.5):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * float(factor))
+            self.tokens = min(self.tokens, 0.0)
+
+    def recover(self, factor: float = 1.1):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate * float(factor))
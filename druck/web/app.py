@@ -9,6 +9,7 @@ from typing import Any, Dict, List
 
 import pandas as pd
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
@@ -412,7 +413,7 @@ async def api_run():
     global _latest
     try:
         cfg = _load_cfg()
-        result = run_once(cfg, do_trade=False)
+        result = await run_in_threadpool(run_once, cfg, do_trade=False)
         _latest = _json_safe(_format_regime_result(result))
         try:
             etf_lines = []
@@ -446,7 +447,7 @@ async def api_backtest():
     global _backtest_latest
     try:
         cfg = _load_cfg()
-        result = run_backtest(cfg)
+        result = await run_in_threadpool(run_backtest, cfg)
         _backtest_latest = _json_safe({
             "summary": result.summary,
             "rows": result.rebalance_log.to_dict(orient="records"),
@@ -17,6 +17,7 @@ def _print_optional_report(title: str, df):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run druck backtest")
     parser.add_argument("--config", default="config.yaml", help="config path")
+    parser.add_argument("--incremental", action="store_true", help="extend the stored backtest state with new trading days instead of rerunning it")
     args = parser.parse_args()
 
     cfg = load_config(args.config)
@@ -32,7 +33,7 @@ if __name__ == "__main__":
         db_reporter(event)
         send_telegram(cfg, msg)
 
-    runtime = run_guarded(lambda: {"backtest": run_backtest(cfg)}, reporter=reporter)
+    runtime = run_guarded(lambda: {"backtest": run_backtest(cfg, incremental=args.incremental)}, reporter=reporter)
     if runtime.ok:
         result = runtime.payload["backtest"]
         pprint(result.summary)
@@ -0,0 +1,35 @@
+import argparse
+from dataclasses import replace
+from pprint import pprint
+
+from druck.cache_manager import MB, CacheManager
+from druck.config import load_config
+
+
+def _manager(args) -> CacheManager:
+    manager = CacheManager.from_config(load_config(args.config))
+    if args.max_mb is not None:
+        manager = replace(manager, max_bytes=int(args.max_mb * MB))
+    if args.ttl_days is not None:
+        manager = replace(manager, ttl_days=args.ttl_days)
+    return manager
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or prune the druck price cache")
+    parser.add_argument("command", choices=["stats", "prune"])
+    parser.add_argument("--config", default="config.yaml", help="config path")
+    parser.add_argument("--max-mb", type=float, default=None, help="override data.cache_max_mb")
+    parser.add_argument("--ttl-days", type=float, default=None, help="override data.cache_ttl_days")
+    parser.add_argument("--dry-run", action="store_true", help="list what prune would remove")
+    args = parser.parse_args()
+
+    manager = _manager(args)
+    if args.command == "stats":
+        pprint(manager.stats())
+    else:
+        victims = manager.prune(dry_run=args.dry_run)
+        verb = "would remove" if args.dry_run else "removed"
+        for item in victims:
+            print(f"{item.kind:6s} {item.key} {item.bytes / MB:.2f}MB last={item.last_access:%Y-%m-%d}")
+        print(f"[run_cache] {verb} {len(victims)} entries, {sum(item.bytes for item in victims) / MB:.2f}MB")
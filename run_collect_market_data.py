@@ -7,16 +7,30 @@ from pathlib import Path
 
 import pandas as pd
 
-from druck.data import fetch_prices, get_date_range
+from druck.data import fetch_prices, fetch_snapshots_by_date, fetch_volumes, get_date_range
 from druck.market_data import (
     chunked,
+    clear_timeseries_deltas,
+    compact_price_lake,
     ensure_market_data_layout,
-    merge_timeseries,
+    load_timeseries,
+    plan_incremental_fetch,
+    read_timeseries_state,
+    rewind_timeseries_state,
     safe_listing,
+    update_timeseries_state,
     write_parquet,
+    write_price_lake,
+    write_timeseries_from_lake,
     write_timeseries_parquet,
+    write_timeseries_state,
 )
 
+# Sorts before every run timestamp, so rows imported from old wide files
+# lose to anything a collection writes later.
+LEGACY_INGEST = '00000000T000000Z-legacy'
+
+
 
 def _normalize_symbol_frame(df: pd.DataFrame) -> pd.DataFrame:
     if df is None or df.empty:
@@ -44,6 +58,12 @@ def _extract_tickers(df: pd.DataFrame, suffix_ks: bool = False) -> list[str]:
     return list(dict.fromkeys([v for v in vals if v]))
 
 
+def _month_windows(start: str, end: str) -> list[tuple[str, str]]:
+    lo, hi = pd.Timestamp(start), pd.Timestamp(end)
+    bounds = [lo, *[b for b in pd.date_range(lo, hi, freq='MS') if b > lo]]
+    return [(b.strftime('%Y-%m-%d'), min(nxt - pd.Timedelta(days=1), hi).strftime('%Y-%m-%d')) for b, nxt in zip(bounds, [*bounds[1:], hi + pd.Timedelta(days=1)])]
+
+
 def _collect_price_group(
     name: str,
     tickers: list[str],
@@ -53,46 +73,157 @@ def _collect_price_group(
     prefer: str,
     chunk_size: int,
     runs_root: Path,
+    fdr_options: dict | None = None,
+    incremental: bool = False,
+    lake_root: Path | None = None,
+    run_dir: Path | None = None,
+    snapshot_market: str | None = None,
+    export_wide: bool = False,
+    lake_max_parts: int = 16,
 ) -> dict:
-    run_ts = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
-    run_dir = runs_root / run_ts
+    if run_dir is None:
+        run_dir = runs_root / datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
     run_dir.mkdir(parents=True, exist_ok=True)
+    run_ts = run_dir.name
+    summary_path = run_dir / f'{name}_summary.json'
+    if summary_path.exists():
+        return json.loads(summary_path.read_text(encoding='utf-8'))
+    if lake_root is None:
+        lake_root = path.parent / 'lake'
+    lake_parts = any((lake_root / f'market={name}').glob('year=*/part-*.parquet'))
+    if not (export_wide and lake_parts):
+        # The lake is the group's store. Wide files left by older collections
+        # are copied into it once and removed; an exported wide file is only
+        # a derived view of a populated lake.
+        legacy = load_timeseries(path)
+        if not legacy.empty:
+            write_price_lake(lake_root, name, legacy, LEGACY_INGEST)
+        clear_timeseries_deltas(path)
+        if not export_wide:
+            path.unlink(missing_ok=True)
 
-    collected_frames: list[pd.DataFrame] = []
-    found: set[str] = set()
-    chunk_logs: list[dict] = []
-    missing: list[str] = []
-    warnings: list[dict] = []
+    # The plan is frozen in the checkpoint directory so a resumed run
+    # replays the same chunks even after the stored state has moved on.
+    checkpoint_dir = run_dir / f'{name}_chunks'
+    checkpoint_dir.mkdir(parents=True, exist_ok=True)
+    plan_path = checkpoint_dir / 'plan.json'
+    state = read_timeseries_state(path, lake_root=lake_root, market=name)
+    if plan_path.exists():
+        plan = json.loads(plan_path.read_text(encoding='utf-8'))
+    else:
+        if incremental:
+            grouped, full = plan_incremental_fetch(state, tickers, start, end)
+        else:
+            grouped, full = {start: list(tickers)}, set(tickers)
+        if snapshot_market:
+            # Date-major: one market-wide call per day serves every ticker,
+            # checkpointed per calendar month.
+            starts = {t: fetch_start for fetch_start, planned in grouped.items() for t in planned}
+            chunks = [
+                {'start': lo, 'end': hi, 'tickers': [t for t, fetch_start in starts.items() if fetch_start <= hi], 'snapshot': snapshot_market}
+                for lo, hi in (_month_windows(min(starts.values()), end) if starts else [])
+            ]
+        else:
+            chunks = [{'start': fetch_start, 'tickers': group} for fetch_start, planned in grouped.items() for group in chunked(planned, chunk_size)]
+        plan = {
+            'start': start,
+            'end': end,
+            'tickers': list(tickers),
+            'incremental': bool(incremental),
+            'full_tickers': sorted(full),
+            'stored_tickers': [t for t in tickers if t in state],
+            'last_dates': {t: state[t]['last_date'] for group in grouped.values() for t in group if t not in full},
+            'chunks': [chunk for chunk in chunks if chunk['tickers']],
+        }
+        plan_path.write_text(json.dumps(plan, ensure_ascii=False, indent=2), encoding='utf-8')
+    tickers, start, end, incremental = plan['tickers'], plan['start'], plan['end'], plan['incremental']
+    full_tickers = set(plan['full_tickers'])
+    tail_tickers = set(plan['last_dates'])
 
-    for idx, group in enumerate(chunked(tickers, chunk_size), start=1):
-        px = fetch_prices(group, start, end, prefer=prefer, cache_dir='.cache', use_cache=True)
+    for idx, chunk in enumerate(plan['chunks'], start=1):
+        log_path = checkpoint_dir / f'chunk-{idx:05d}.json'
+        if log_path.exists():
+            continue
+        group = chunk['tickers']
+        if chunk.get('snapshot'):
+            snapshots = fetch_snapshots_by_date(group, chunk['start'], chunk['end'], market=chunk['snapshot'])
+            px, volume = snapshots['close'], snapshots['volume']
+        else:
+            px = fetch_prices(group, chunk['start'], end, prefer=prefer, cache_dir='.cache', use_cache=True, fdr_options=fdr_options)
+            volume = fetch_volumes(group, chunk['start'], end, cache_dir='.cache')
         hit_cols = list(px.columns) if not px.empty else []
-        found.update(hit_cols)
         missed = [t for t in group if t not in hit_cols]
-        missing.extend(missed)
-        warning_summary = getattr(px, 'attrs', {}).get('provider_warning_summary', {}) if px is not None else {}
-        if warning_summary:
-            warnings.append({'chunk': idx, **warning_summary})
         if not px.empty:
-            collected_frames.append(px)
-        chunk_logs.append({
+            write_timeseries_parquet(px, checkpoint_dir / f'chunk-{idx:05d}.parquet')
+        if not volume.empty:
+            write_timeseries_parquet(volume, checkpoint_dir / f'chunk-{idx:05d}.volume.parquet')
+        warning_summary = getattr(px, 'attrs', {}).get('provider_warning_summary', {}) if px is not None else {}
+        failed_dates = list(getattr(px, 'attrs', {}).get('failed_dates', [])) if px is not None else []
+        entry = {
             'chunk': idx,
+            'start': chunk['start'],
             'requested': len(group),
             'returned_columns': len(hit_cols),
             'missing_count': len(missed),
             'missing_tickers': missed,
-        })
+        }
+        # Written last: a chunk only counts as done once its log exists.
+        log_path.write_text(json.dumps({'log': entry, 'warning': warning_summary, 'failed_dates': failed_dates}, ensure_ascii=False, default=str), encoding='utf-8')
 
-    combined = pd.DataFrame()
-    for frame in collected_frames:
-        combined = combined.combine_first(frame) if not combined.empty else frame
-    combined = combined.sort_index() if not combined.empty else combined
+    found: set[str] = set(plan['stored_tickers']) if incremental else set()
+    chunk_logs: list[dict] = []
+    warnings: list[dict] = []
+    # First failed snapshot day each ticker needed; its state is rewound to
+    # before it so the next incremental run fetches the hole again.
+    failed: dict[str, str] = {}
+    for idx in range(1, len(plan['chunks']) + 1):
+        record = json.loads((checkpoint_dir / f'chunk-{idx:05d}.json').read_text(encoding='utf-8'))
+        chunk_logs.append(record['log'])
+        for day in record.get('failed_dates') or []:
+            for ticker in plan['chunks'][idx - 1]['tickers']:
+                if day > plan['last_dates'].get(ticker, '') and day < failed.get(ticker, '9999'):
+                    failed[ticker] = day
+        if record['warning']:
+            warnings.append({'chunk': idx, **record['warning']})
+        found.update(t for t in plan['chunks'][idx - 1]['tickers'] if t not in record['log']['missing_tickers'])
 
-    if not combined.empty:
-        merged = merge_timeseries(path, combined)
-        write_timeseries_parquet(merged, path)
-    else:
-        merged = pd.DataFrame()
+    def checkpointed_frames():
+        for idx in range(1, len(plan['chunks']) + 1):
+            part = checkpoint_dir / f'chunk-{idx:05d}.parquet'
+            if part.exists():
+                volume_part = checkpoint_dir / f'chunk-{idx:05d}.volume.parquet'
+                yield idx, load_timeseries(part), load_timeseries(volume_part) if volume_part.exists() else None
+
+    # Chunks cover disjoint tickers (or disjoint months in date-major mode)
+    # and each one is appended to the lake as its own part, so only a single
+    # chunk is in memory at a time.
+    dates: set = set()
+    columns: set[str] = set()
+    for idx, frame, volume in checkpointed_frames():
+        # Tail fetches restart after the stored last date; drop anything a
+        # provider returned from before it so parts never rewrite history.
+        for ticker in tail_tickers & set(frame.columns):
+            frame.loc[frame.index <= pd.Timestamp(plan['last_dates'][ticker]), ticker] = float('nan')
+        frame = frame.dropna(how='all').dropna(axis=1, how='all')
+        volume = volume.reindex(index=frame.index, columns=frame.columns) if volume is not None else None
+        if frame.empty:
+            continue
+        write_price_lake(lake_root, name, frame, f'{run_ts}-{idx:05d}', volume=volume)
+        state = update_timeseries_state(state, frame, start, full_tickers)
+        dates.update(frame.index)
+        columns.update(frame.columns)
+    if columns:
+        # Full runs fold every year partition into one part; rows the run
+        # did not refetch stay as fallbacks. Incremental runs add a part per
+        # chunk each night, so a partition is folded once it holds
+        # ``lake_max_parts`` parts and readers never open more than that.
+        compact_price_lake(lake_root, name, f'{run_ts}-compact', min_parts=2 if not incremental else max(2, lake_max_parts))
+    if columns or failed:
+        write_timeseries_state(path, rewind_timeseries_state(state, failed))
+    rows, column_count = len(dates), len(columns)
+    if export_wide:
+        # Opt-in: rewrites the whole wide file from the lake, a year per row group.
+        rows, column_count = write_timeseries_from_lake(lake_root, name, path)
 
     found_list = [t for t in tickers if t in found]
     missing_list = [t for t in tickers if t not in found]
@@ -121,10 +252,14 @@ def _collect_price_group(
     if warnings:
         write_parquet(pd.DataFrame(warnings), run_dir / f'{name}_provider_warnings.parquet')
 
-    return {
+    summary = {
         'path': str(path),
-        'rows': int(len(merged)) if not merged.empty else 0,
-        'columns': int(len(merged.columns)) if not merged.empty else 0,
+        'mode': 'incremental' if incremental else 'full',
+        'full_fetch_tickers': int(len(full_tickers)),
+        'tail_fetch_tickers': int(len(tail_tickers)),
+        'up_to_date_tickers': int(len(tickers) - len(full_tickers) - len(tail_tickers)),
+        'rows': int(rows),
+        'columns': int(column_count),
         'requested_tickers': int(len(tickers)),
         'found_tickers': int(len(found_list)),
         'missing_tickers': int(len(missing_list)),
@@ -133,6 +268,8 @@ def _collect_price_group(
         'warning_summary': warning_summary,
         'run_dir': str(run_dir),
     }
+    summary_path.write_text(json.dumps(summary, ensure_ascii=False, indent=2), encoding='utf-8')
+    return summary
 
 
 def main() -> int:
@@ -141,13 +278,24 @@ def main() -> int:
     parser.add_argument('--lookback-years', type=int, default=3)
     parser.add_argument('--prices-limit', type=int, default=50, help='smoke-run ticker cap per group, 0 means no cap')
     parser.add_argument('--full', action='store_true', help='collect full price groups without cap')
-    parser.add_argument('--kr-chunk-size', type=int, default=1)
+    parser.add_argument('--kr-chunk-size', type=int, default=100)
     parser.add_argument('--us-chunk-size', type=int, default=50)
     parser.add_argument('--index-chunk-size', type=int, default=10)
+    parser.add_argument('--fdr-workers', type=int, default=8, help='concurrent FDR downloads per chunk')
+    parser.add_argument('--fdr-rate', type=float, default=10.0, help='shared FDR request budget per second, 0 disables limiting')
+    parser.add_argument('--incremental', action='store_true', help='fetch only days after each ticker\'s stored last date and append them to the price lake')
+    parser.add_argument('--date-major', action='store_true', help='collect KR stock/ETF groups with one market-wide KRX snapshot call per trading day')
+    parser.add_argument('--export-wide', action='store_true', help='also write each group as a wide <group>.parquet rebuilt from the price lake')
+    parser.add_argument('--lake-max-parts', type=int, default=16, help='compact a price lake year partition once an incremental run leaves it with this many parts')
+    parser.add_argument('--resume', default=None, help='run directory of an interrupted collection; completed chunks and groups are skipped')
     args = parser.parse_args()
 
     layout = ensure_market_data_layout(args.root)
+    fdr_options = {'max_workers': args.fdr_workers, 'rate_per_sec': args.fdr_rate}
     start, end = get_date_range(args.lookback_years)
+    run_dir = Path(args.resume) if args.resume else layout.runs_root / datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    if args.resume and not run_dir.is_dir():
+        parser.error(f'--resume run directory does not exist: {run_dir}')
 
     listings = {
         'krx_kospi': ('KOSPI', layout.listings_root / 'krx_kospi.parquet'),
@@ -181,10 +329,10 @@ def main() -> int:
     us_etf_tickers = maybe_cap(_extract_tickers(listing_frames['us_etf']))
 
     price_summary = {
-        'kr_stocks': _collect_price_group('kr_stocks', kr_stock_tickers, start, end, layout.prices_root / 'kr_stocks.parquet', prefer='fdr', chunk_size=args.kr_chunk_size, runs_root=layout.runs_root),
-        'kr_etfs': _collect_price_group('kr_etfs', kr_etf_tickers, start, end, layout.prices_root / 'kr_etfs.parquet', prefer='fdr', chunk_size=args.kr_chunk_size, runs_root=layout.runs_root),
-        'us_stocks': _collect_price_group('us_stocks', us_stock_tickers, start, end, layout.prices_root / 'us_stocks.parquet', prefer='yf', chunk_size=args.us_chunk_size, runs_root=layout.runs_root),
-        'us_etfs': _collect_price_group('us_etfs', us_etf_tickers, start, end, layout.prices_root / 'us_etfs.parquet', prefer='yf', chunk_size=args.us_chunk_size, runs_root=layout.runs_root),
+        'kr_stocks': _collect_price_group('kr_stocks', kr_stock_tickers, start, end, layout.prices_root / 'kr_stocks.parquet', prefer='fdr', chunk_size=args.kr_chunk_size, runs_root=layout.runs_root, fdr_options=fdr_options, incremental=args.incremental, lake_root=layout.lake_root, run_dir=run_dir, export_wide=args.export_wide, lake_max_parts=args.lake_max_parts, snapshot_market='stocks' if args.date_major else None),
+        'kr_etfs': _collect_price_group('kr_etfs', kr_etf_tickers, start, end, layout.prices_root / 'kr_etfs.parquet', prefer='fdr', chunk_size=args.kr_chunk_size, runs_root=layout.runs_root, fdr_options=fdr_options, incremental=args.incremental, lake_root=layout.lake_root, run_dir=run_dir, export_wide=args.export_wide, lake_max_parts=args.lake_max_parts, snapshot_market='etfs' if args.date_major else None),
+        'us_stocks': _collect_price_group('us_stocks', us_stock_tickers, start, end, layout.prices_root / 'us_stocks.parquet', prefer='yf', chunk_size=args.us_chunk_size, runs_root=layout.runs_root, incremental=args.incremental, lake_root=layout.lake_root, run_dir=run_dir, export_wide=args.export_wide, lake_max_parts=args.lake_max_parts),
+        'us_etfs': _collect_price_group('us_etfs', us_etf_tickers, start, end, layout.prices_root / 'us_etfs.parquet', prefer='yf', chunk_size=args.us_chunk_size, runs_root=layout.runs_root, incremental=args.incremental, lake_root=layout.lake_root, run_dir=run_dir, export_wide=args.export_wide, lake_max_parts=args.lake_max_parts),
     }
 
     index_groups = {
@@ -192,13 +340,16 @@ def main() -> int:
         'us_indexes': ['^GSPC', '^IXIC', '^DJI', '^RUT', '^VIX'],
     }
     index_summary = {
-        key: _collect_price_group(key, maybe_cap(tickers), start, end, layout.indexes_root / f'{key}.parquet', prefer='auto', chunk_size=args.index_chunk_size, runs_root=layout.runs_root)
+        key: _collect_price_group(key, maybe_cap(tickers), start, end, layout.indexes_root / f'{key}.parquet', prefer='auto', chunk_size=args.index_chunk_size, runs_root=layout.runs_root, fdr_options=fdr_options, incremental=args.incremental, lake_root=layout.lake_root, run_dir=run_dir, export_wide=args.export_wide, lake_max_parts=args.lake_max_parts)
         for key, tickers in index_groups.items()
     }
 
     summary = {
         'lookback_years': args.lookback_years,
         'full': bool(args.full),
+        'incremental': bool(args.incremental),
+        'date_major': bool(args.date_major),
+        'run_dir': str(run_dir),
         'prices_limit': int(args.prices_limit),
         'kr_chunk_size': int(args.kr_chunk_size),
         'us_chunk_size': int(args.us_chunk_size),
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import yaml
+
+from druck.config import load_config
+from druck.sweep import SWEEP_METRICS, run_sweep
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a grid or random parameter sweep over backtest configs")
+    parser.add_argument("--config", default="config.yaml", help="Path to main config file")
+    parser.add_argument("--local-config", default="config.local.yaml", help="Path to local override config file")
+    parser.add_argument("--spec", required=True, help="Sweep spec file (YAML or JSON)")
+    parser.add_argument("--output", default="output/sweep", help="Directory for per-candidate parquet results")
+    parser.add_argument("--executor", choices=["serial", "thread", "process"], default=None, help="Override backtest.executor")
+    parser.add_argument("--max-workers", type=int, default=None, help="Override backtest.max_workers")
+    parser.add_argument("--no-resume", action="store_true", help="Re-run candidates that already have results")
+    parser.add_argument("--top", type=int, default=10, help="Number of candidates to print")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config, args.local_config)
+    spec = yaml.safe_load(Path(args.spec).read_text(encoding="utf-8")) or {}
+    results = run_sweep(cfg, spec, args.output, executor=args.executor, max_workers=args.max_workers, resume=not args.no_resume)
+
+    failed = results[results["status"] != "ok"]
+    print(f"[Sweep] {len(results)} candidates in {args.output} ({len(failed)} failed)")
+    columns = ["candidate_id", "params", *[c for c in ("sharpe", "cagr", "max_drawdown", "total_return") if c in SWEEP_METRICS]]
+    print(results.loc[results["status"] == "ok", columns].head(args.top).to_string(index=False))
+    for _, row in failed.iterrows():
+        print(f"failed {row['candidate_id']}: {row['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from druck.backtest import BacktestExecutor, BacktestInputs, _backtest_config, _job_features
+from druck.config import load_config
+
+MACRO = ["SPY", "SHY", "UUP", "HYG", "IEF", "TLT", "^VIX"]
+
+
+def synthetic_prices(tickers: int, years: float, seed: int = 0) -> pd.DataFrame:
+    """Correlated random walks with late listings and delistings, plus the macro tickers."""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range("2014-01-01", periods=int(years * 252))
+    columns = MACRO + [f"{i:06d}.KS" for i in range(tickers)]
+    market = rng.normal(0.0, 0.01, (len(index), 1))
+    returns = rng.normal(0.0003, 0.012, (len(index), len(columns))) + market * rng.random(len(columns))
+    prices = pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), index=index, columns=columns)
+    prices["^VIX"] = 15 + 5 * rng.random(len(index))
+    for j in range(len(MACRO), len(columns), 5):
+        prices.iloc[: rng.integers(0, len(index) // 2), j] = np.nan
+    for j in range(len(MACRO) + 2, len(columns), 11):
+        prices.iloc[rng.integers(len(index) // 2, len(index)) :, j] = np.nan
+    return prices
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time a backtest on a synthetic universe")
+    parser.add_argument("--config", default="config.yaml", help="config path")
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--years", type=float, default=10.0)
+    parser.add_argument("--frequency", default="daily", help="backtest.rebalance_frequency to use")
+    parser.add_argument("--executor", default="process", help="serial, thread or process; a single run spreads its per-date decisions over the workers")
+    parser.add_argument("--workers", type=int, default=0, help="executor workers, 0 = all cores")
+    parser.add_argument("--target-seconds", type=float, default=0.0, help="exit non-zero when the run takes longer than this, 0 = report only")
+    args = parser.parse_args()
+
+    cfg = load_config(args.config)
+    prices = synthetic_prices(args.tickers, args.years)
+    cfg["universe"]["kr"]["tickers"] = list(prices.columns[len(MACRO) :])
+    cfg["universe"]["kr"]["auto_generate"] = False
+    bt_cfg = replace(_backtest_config(cfg), rebalance_frequency=args.frequency, executor=args.executor, max_workers=args.workers)
+
+    started = time.perf_counter()
+    inputs = BacktestInputs(prices, {})
+    _job_features(cfg, inputs)
+    prepared = time.perf_counter()
+    with BacktestExecutor(bt_cfg, inputs) as executor:
+        workers = executor.max_workers if executor.kind in {"thread", "process"} else 1
+        result = executor.run([(cfg, None)])[0]
+    finished = time.perf_counter()
+
+    rebalances = int(result.summary["rebalances"])
+    total = finished - started
+    print(f"[bench_backtest] {args.tickers} tickers x {len(prices.index)} days, frequency={args.frequency}, executor={args.executor} x {workers}")
+    print(f"[bench_backtest] features+regimes {prepared - started:.2f}s, backtest {finished - prepared:.2f}s, total {total:.2f}s")
+    print(f"[bench_backtest] {rebalances} rebalances, {1000 * (finished - prepared) / max(rebalances, 1):.1f}ms each")
+    if args.target_seconds > 0:
+        verdict = "ok" if total <= args.target_seconds else "MISSED"
+        print(f"[bench_backtest] target {args.target_seconds:.0f}s: {verdict} ({total / args.target_seconds:.0%} of budget)")
+        sys.exit(0 if total <= args.target_seconds else 1)
@@ -1,9 +1,10 @@
+import json
 from pathlib import Path
 
 import pytest
 import pandas as pd
 
-from druck.backtest import BacktestResult, run_backtest
+from druck.backtest import BacktestResult, rebalance_schedule, run_backtest
 
 
 def _base_cfg():
@@ -330,3 +331,533 @@ def test_run_backtest_flags_capacity_warning_when_portfolio_exceeds_estimate(mon
     assert result.analytics is not None
     assert result.analytics["capacity_warning"] is not None
     assert result.analytics["capacity_warning"]["status"] == "warning"
+
+
+def test_select_weights_with_feature_cube_matches_direct_scoring():
+    import numpy as np
+
+    from druck.backtest import _build_feature_cube, _select_weights
+
+    cfg = _base_cfg()
+    rng = np.random.default_rng(5)
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    tickers = ["SPY", "SHY", "UUP", "HYG", "IEF", "TLT"]
+    px = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0.0003, 0.01, (420, len(tickers))), axis=0), index=idx, columns=tickers)
+    px["^VIX"] = [15 + (i % 3) * 0.1 for i in range(420)]
+    px.iloc[:150, px.columns.get_loc("HYG")] = float("nan")
+    cube = _build_feature_cube(cfg, px)
+    for pos in [300, 360, 419]:
+        window = px.iloc[: pos + 1]
+        direct = _select_weights(cfg, window)
+        cached = _select_weights(cfg, window, cube)
+        pd.testing.assert_series_equal(direct[2], cached[2])
+        pd.testing.assert_frame_equal(direct[3], cached[3], check_exact=False, rtol=1e-9)
+
+
+@pytest.mark.parametrize("frequency", ["M", "W-FRI", "monthly", "weekly", "month_end-2", "daily"])
+def test_single_pass_walkforward_matches_replayed_windows(monkeypatch, frequency):
+    import numpy as np
+
+    cfg = _base_cfg()
+    cfg["backtest"]["rebalance_frequency"] = frequency
+    cfg["backtest"]["walkforward"] = {"enabled": True, "train_days": 260, "test_days": 30, "step_days": 20}
+    rng = np.random.default_rng(9)
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    tickers = ["SPY", "SHY", "UUP", "HYG", "IEF", "TLT"]
+    px = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0.0003, 0.01, (420, len(tickers))), axis=0), index=idx, columns=tickers)
+    px["^VIX"] = [15 + (i % 3) * 0.1 for i in range(420)]
+
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, start, end, prefer='auto', cache_dir=None, use_cache=True: px[tickers])
+
+    single = run_backtest(cfg).walkforward_summary
+    cfg["backtest"]["walkforward"]["mode"] = "replay"
+    replay = run_backtest(cfg).walkforward_summary
+    assert len(single) == len(replay) > 3
+    pd.testing.assert_frame_equal(single, replay, check_exact=False, rtol=1e-12)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_executor_matches_serial_results(monkeypatch, executor):
+    import numpy as np
+
+    cfg = _base_cfg()
+    cfg["backtest"]["walkforward"] = {"enabled": True, "mode": "replay", "train_days": 260, "test_days": 40, "step_days": 40}
+    rng = np.random.default_rng(13)
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    tickers = ["SPY", "SHY", "UUP", "HYG", "IEF", "TLT"]
+    px = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0.0003, 0.01, (420, len(tickers))), axis=0), index=idx, columns=tickers)
+    px["^VIX"] = [15 + (i % 3) * 0.1 for i in range(420)]
+
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, start, end, prefer='auto', cache_dir=None, use_cache=True: px[tickers])
+
+    serial = run_backtest(cfg)
+    cfg["backtest"]["executor"] = executor
+    cfg["backtest"]["max_workers"] = 2
+    parallel = run_backtest(cfg)
+    pd.testing.assert_series_equal(serial.equity_curve, parallel.equity_curve)
+    pd.testing.assert_frame_equal(serial.walkforward_summary, parallel.walkforward_summary)
+    assert serial.analytics["strategy_comparison"] == parallel.analytics["strategy_comparison"]
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread"])
+def test_executor_scores_weight_only_variants_on_one_z_matrix(monkeypatch, executor):
+    import numpy as np
+    from dataclasses import replace
+
+    import druck.portfolio as portfolio
+    from druck.backtest import BacktestExecutor, BacktestInputs, _backtest_config, _legacy_cfg, _with_score_weights
+
+    cfg = _base_cfg()
+    cfg["backtest"]["walkforward"]["enabled"] = False
+    rng = np.random.default_rng(5)
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    tickers = ["SPY", "SHY", "UUP", "HYG", "IEF", "TLT"]
+    px = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0.0003, 0.01, (420, len(tickers))), axis=0), index=idx, columns=tickers)
+    px["^VIX"] = [15 + (i % 3) * 0.1 for i in range(420)]
+    variants = [cfg, _legacy_cfg(cfg), _with_score_weights(cfg, {**cfg["selection"]["score_weights"], "momentum": 0.6})]
+    bt_cfg = replace(_backtest_config(cfg), executor=executor, max_workers=2)
+    expected = []
+    for variant in variants:
+        with BacktestExecutor(bt_cfg, BacktestInputs(px, {})) as alone:
+            expected.append(alone.run([(variant, None)])[0])
+
+    calls = []
+    original = portfolio.score_with_weight_sets
+    monkeypatch.setattr("druck.portfolio.score_with_weight_sets", lambda z, weight_sets, terms=None: calls.append(len(weight_sets)) or original(z, weight_sets, terms))
+    with BacktestExecutor(bt_cfg, BacktestInputs(px, {})) as shared:
+        results = shared.run([(variant, None) for variant in variants])
+
+    # One full and one legacy-terms product per rebalance, each for all three weight sets.
+    assert calls == [3] * (2 * expected[0].summary["rebalances"])
+    for result, alone in zip(results, expected):
+        pd.testing.assert_series_equal(result.equity_curve, alone.equity_curve)
+        pd.testing.assert_frame_equal(result.rebalance_log, alone.rebalance_log)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_executor_spreads_one_daily_run_over_its_workers_by_date(executor):
+    import numpy as np
+    from dataclasses import replace
+
+    from druck.backtest import BacktestExecutor, BacktestInputs, _backtest_config
+
+    cfg = _base_cfg()
+    cfg["backtest"]["rebalance_frequency"] = "daily"
+    rng = np.random.default_rng(21)
+    idx = pd.date_range("2024-01-01", periods=330, freq="B")
+    tickers = ["SPY", "SHY", "UUP", "HYG", "IEF", "TLT"]
+    px = pd.DataFrame(100 * np.cumprod(1 + rng.normal(0.0003, 0.01, (330, len(tickers))), axis=0), index=idx, columns=tickers)
+    px["^VIX"] = [15 + (i % 3) * 0.1 for i in range(330)]
+    bt_cfg = _backtest_config(cfg)
+
+    with BacktestExecutor(bt_cfg, BacktestInputs(px, {})) as serial:
+        expected = serial.run([(cfg, None)])[0]
+    inputs = BacktestInputs(px, {})
+    with BacktestExecutor(replace(bt_cfg, executor=executor, max_workers=3), inputs) as parallel:
+        assert parallel.prefetch_decisions([(cfg, None)]) == expected.summary["rebalances"]
+        result = parallel.run([(cfg, None)])[0]
+
+    pd.testing.assert_series_equal(result.equity_curve, expected.equity_curve)
+    pd.testing.assert_frame_equal(result.rebalance_log, expected.rebalance_log)
+
+
+def test_legacy_comparison_reuses_selection_inputs(monkeypatch):
+    import druck.backtest as backtest
+
+    cfg = _base_cfg()
+    cfg["backtest"]["walkforward"]["enabled"] = False
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    px = pd.DataFrame({
+        "SPY": pd.Series([100 + i * 0.2 for i in range(420)], index=idx),
+        "SHY": pd.Series([100 + i * 0.01 for i in range(420)], index=idx),
+        "UUP": pd.Series([100 - i * 0.02 for i in range(420)], index=idx),
+        "HYG": pd.Series([100 + i * 0.1 for i in range(420)], index=idx),
+        "IEF": pd.Series([100 + i * 0.03 for i in range(420)], index=idx),
+        "TLT": pd.Series([100 + i * 0.02 for i in range(420)], index=idx),
+        "^VIX": pd.Series([15 + (i % 3) * 0.1 for i in range(420)], index=idx),
+    })
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, start, end, prefer='auto', cache_dir=None, use_cache=True: px[tickers])
+    calls = []
+    original = backtest._prepare_selection
+
+    def counting_prepare(cfg, px_window, feature_cube=None, regime_timeline=None):
+        calls.append(px_window.index[-1])
+        return original(cfg, px_window, feature_cube, regime_timeline)
+
+    monkeypatch.setattr("druck.backtest._prepare_selection", counting_prepare)
+    result = run_backtest(cfg)
+    assert len(calls) == len(result.rebalance_log)
+    assert "legacy_total_return" in result.analytics["strategy_comparison"]
+
+
+def test_daily_returns_keep_rebalance_boundary_days(monkeypatch):
+    cfg = _base_cfg()
+    cfg["backtest"]["rebalance_frequency"] = "D"
+    cfg["backtest"]["walkforward"]["enabled"] = False
+    idx = pd.date_range("2024-01-01", periods=300, freq="B")
+    px = pd.DataFrame({
+        "SPY": pd.Series([100 + i * 0.2 + (i % 4) * 0.5 for i in range(300)], index=idx),
+        "SHY": pd.Series([100 + i * 0.01 for i in range(300)], index=idx),
+        "UUP": pd.Series([100 - i * 0.02 for i in range(300)], index=idx),
+        "HYG": pd.Series([100 + i * 0.1 + (i % 3) * 0.4 for i in range(300)], index=idx),
+        "IEF": pd.Series([100 + i * 0.03 for i in range(300)], index=idx),
+        "TLT": pd.Series([100 + i * 0.02 + (i % 5) * 0.3 for i in range(300)], index=idx),
+        "^VIX": pd.Series([15 + (i % 3) * 0.1 for i in range(300)], index=idx),
+    })
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, start, end, prefer='auto', cache_dir=None, use_cache=True: px[tickers])
+
+    result = run_backtest(cfg)
+    assert len(result.rebalance_log) == len(result.equity_curve) > 1
+    assert result.equity_curve.index.is_unique
+    assert result.daily_returns.index.equals(result.equity_curve.index)
+    assert (result.daily_returns.iloc[1:] != 0).all()
+    costs = result.rebalance_log.set_index("date")["cost"]
+    gross = result.equity_curve + costs
+    pd.testing.assert_series_equal(gross.iloc[1:] / result.equity_curve.shift(1).iloc[1:] - 1.0, result.daily_returns.iloc[1:], check_names=False, check_freq=False)
+
+
+def test_prepare_backtest_inputs_reuses_shared_price_panel(monkeypatch, tmp_path):
+    import numpy as np
+    from druck.backtest import prepare_backtest_inputs
+
+    cfg = _base_cfg()
+    cfg["data"]["panel_dir"] = str(tmp_path / "panels")
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    px = pd.DataFrame({t: [100 + i * step for i in range(420)] for t, step in [("SPY", 0.2), ("SHY", 0.01), ("UUP", -0.02), ("HYG", 0.1), ("IEF", 0.03), ("TLT", 0.02)]}, index=idx)
+    px["^VIX"] = [15 + (i % 3) * 0.1 for i in range(420)]
+    calls = []
+
+    def fake_fetch(tickers, start, end, prefer='auto', cache_dir=None, use_cache=True):
+        calls.append(list(tickers))
+        return px[tickers]
+
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", fake_fetch)
+
+    first = prepare_backtest_inputs(cfg)
+    second = prepare_backtest_inputs(cfg)
+
+    assert len(calls) == 1
+    assert first.panel_path == second.panel_path
+    pd.testing.assert_frame_equal(first.prices, second.prices)
+    assert second.prep_diagnostics == first.prep_diagnostics
+    assert isinstance(np.load(f"{second.panel_path}/values.npy", mmap_mode="r"), np.memmap)
+    assert not second.prices.to_numpy().flags.writeable
+
+
+def test_prepare_backtest_inputs_rebuilds_panel_when_its_sources_change(monkeypatch, tmp_path):
+    from druck.backtest import prepare_backtest_inputs
+    from druck.price_cache import PriceCache
+
+    cfg = _base_cfg()
+    cfg["data"]["panel_dir"] = str(tmp_path / "panels")
+    cfg["data"]["cache_dir"] = str(tmp_path / "cache")
+    timeline = tmp_path / "timeline.csv"
+    timeline.write_text("ticker,start_date,end_date\nSPY,2000-01-01,\n", encoding="utf-8")
+    cfg["backtest"]["universe_timeline_path"] = str(timeline)
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    px = pd.DataFrame({t: [100 + i * step for i in range(420)] for t, step in [("SPY", 0.2), ("SHY", 0.01), ("UUP", -0.02), ("HYG", 0.1), ("IEF", 0.03), ("TLT", 0.02)]}, index=idx)
+    px["^VIX"] = [15 + (i % 3) * 0.1 for i in range(420)]
+    calls = []
+
+    def fake_fetch(tickers, start, end, prefer='auto', cache_dir=None, use_cache=True):
+        calls.append(list(tickers))
+        return px[tickers]
+
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", fake_fetch)
+    cache = PriceCache(tmp_path / "cache")
+    cache.write(px[["SPY"]], "2024-01-01", "2025-08-11")
+
+    first = prepare_backtest_inputs(cfg)
+    # Reads bump hit counts in the store but leave the panel key alone.
+    cache.read(["SPY"], "2024-01-01", "2025-08-11")
+    assert prepare_backtest_inputs(cfg).panel_path == first.panel_path
+    assert len(calls) == 1
+
+    # A refreshed store entry during the day builds a new panel.
+    cache.write(px[["SPY"]] * 1.01, "2024-01-01", "2025-08-11")
+    refreshed = prepare_backtest_inputs(cfg)
+    assert refreshed.panel_path != first.panel_path
+    assert len(calls) == 2
+
+    # So does an edited universe timeline at the same path.
+    timeline.write_text("ticker,start_date,end_date\nSPY,2000-01-01,\nSHY,2000-01-01,\n", encoding="utf-8")
+    assert prepare_backtest_inputs(cfg).panel_path not in {first.panel_path, refreshed.panel_path}
+    assert len(calls) == 3
+
+
+def test_precomputed_adv_table_matches_per_rebalance_slicing():
+    import numpy as np
+    from druck.backtest import BacktestConfig, _adv_table, _estimate_adv_metrics
+
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2024-01-01", periods=80, freq="B")
+    volume = pd.DataFrame(rng.uniform(1e5, 1e6, (80, 3)), index=idx, columns=["SPY", "QQQ", "TLT"])
+    volume.iloc[10:40, 1] = np.nan
+    bt_cfg = BacktestConfig(adv_window_days=20)
+    adv = _adv_table(volume, bt_cfg.adv_window_days)
+    selected = pd.DataFrame({"vol": [0.2, 0.3]}, index=["QQQ", "TLT"])
+
+    for dt in [idx[0], idx[15], idx[39], pd.Timestamp("2024-02-17"), idx[-1]]:
+        expected = float(volume.loc[:dt, ["QQQ", "TLT"]].tail(20).mean().mean())
+        assert _estimate_adv_metrics(selected, adv, dt, bt_cfg)[0] == pytest.approx(expected, rel=1e-12)
+    assert _estimate_adv_metrics(selected, adv, pd.Timestamp("2023-12-01"), bt_cfg)[0] == pytest.approx(1 / 0.25)
+
+
+def test_prepare_backtest_inputs_uses_stored_volume_without_volume_file(monkeypatch):
+    from druck.backtest import prepare_backtest_inputs
+
+    cfg = _base_cfg()
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    px = pd.DataFrame({t: [100 + i * 0.1 for i in range(420)] for t in ["SPY", "SHY", "UUP", "HYG", "IEF", "TLT"]}, index=idx)
+    px["^VIX"] = 15.0
+    stored = pd.DataFrame({"SPY": 1e6}, index=idx)
+    seen = {}
+
+    def fake_volumes(tickers, start, end, prefer='auto', cache_dir=None, **options):
+        seen["cache_dir"] = cache_dir
+        return stored
+
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, start, end, prefer='auto', cache_dir=None, use_cache=True: px[tickers])
+    monkeypatch.setattr("druck.backtest.fetch_volumes", fake_volumes)
+
+    inputs = prepare_backtest_inputs(cfg)
+
+    assert inputs.volume_data is stored
+    assert seen["cache_dir"] == ".cache"
+
+
+def test_universe_timeline_mask_intersects_rows_and_caches_bounds(tmp_path):
+    from druck.backtest import _apply_universe_timeline, _load_universe_timeline
+
+    idx = pd.date_range("2024-01-01", periods=6, freq="D")
+    px = pd.DataFrame({"A": 1.0, "B": 2.0, "C": 3.0}, index=idx)
+    timeline = pd.DataFrame([
+        {"ticker": "A", "start_date": "2024-01-02", "end_date": ""},
+        {"ticker": "A", "start_date": "2024-01-01", "end_date": "2024-01-04"},
+        {"ticker": "B", "start_date": "2024-01-05", "end_date": None},
+        {"ticker": "Z", "start_date": "2024-01-01", "end_date": "2024-01-02"},
+    ])
+    path = tmp_path / "timeline.csv"
+    timeline.to_csv(path, index=False)
+
+    bounds = _load_universe_timeline(str(path))
+    assert (tmp_path / "timeline.csv.bounds.parquet").exists()
+    pd.testing.assert_frame_equal(_load_universe_timeline(str(path)), bounds)
+
+    masked = _apply_universe_timeline(px, bounds)
+    assert masked["A"].notna().tolist() == [False, True, True, True, False, False]
+    assert masked["B"].notna().tolist() == [False] * 4 + [True] * 2
+    assert masked["C"].notna().all()
+    pd.testing.assert_frame_equal(_apply_universe_timeline(px, timeline), masked)
+
+
+def test_rebalance_schedule_named_calendars():
+    idx = pd.bdate_range("2024-01-01", "2024-03-29").drop([pd.Timestamp("2024-02-29"), pd.Timestamp("2024-03-15")])
+
+    assert rebalance_schedule(idx, "daily").equals(idx)
+    assert list(rebalance_schedule(idx, "monthly")) == [pd.Timestamp(d) for d in ["2024-01-31", "2024-02-28", "2024-03-29"]]
+    assert list(rebalance_schedule(idx, "month_end-1")) == [pd.Timestamp(d) for d in ["2024-01-30", "2024-02-27", "2024-03-28"]]
+    weekly = rebalance_schedule(idx, "weekly")
+    assert pd.Timestamp("2024-03-14") in weekly and pd.Timestamp("2024-03-15") not in weekly
+    assert len(weekly) == 13
+    custom = rebalance_schedule(idx, "custom", ["2024-03-15", "2023-12-01", "2024-02-10", "2024-02-09"])
+    assert list(custom) == [pd.Timestamp("2024-02-09"), pd.Timestamp("2024-03-14")]
+    # Legacy pandas offsets keep only period ends that are trading days.
+    assert list(rebalance_schedule(idx, "M")) == [pd.Timestamp("2024-01-31")]
+    # Periods still open at the panel's last day are not rebalanced yet.
+    head = idx[idx <= "2024-03-20"]
+    assert list(rebalance_schedule(head, "monthly")) == [pd.Timestamp("2024-01-31"), pd.Timestamp("2024-02-28")]
+    assert rebalance_schedule(head, "weekly")[-1] == pd.Timestamp("2024-03-14")
+    assert list(rebalance_schedule(head, "custom", ["2024-03-22"])) == []
+    with pytest.raises(ValueError, match="month_end-N needs a whole number"):
+        rebalance_schedule(idx, "month_end-x")
+
+
+def _monitor(cfg, px):
+    from druck.backtest import _PositionMonitor
+
+    returns = px.pct_change(fill_method=None).fillna(0.0).to_numpy()
+    return _PositionMonitor(cfg, px, returns, {c: j for j, c in enumerate(px.columns)})
+
+
+def test_position_monitor_cuts_crashing_name_to_cash_mid_period():
+    cfg = _base_cfg()
+    cfg["backtest"]["monitoring"] = {"enabled": True, "risk_cuts": True, "drift_band": 0.0}
+    idx = pd.date_range("2024-01-01", periods=300, freq="B")
+    crash = [100 + i * 0.1 if i < 280 else 80 for i in range(300)]
+    px = pd.DataFrame({"AAA": crash, "BBB": [100 + i * 0.1 for i in range(300)], "SHY": [100.0] * 300}, index=idx)
+
+    equity, weights, equity_path, return_path, events = _monitor(cfg, px).hold(1.0, pd.Series({"AAA": 0.5, "BBB": 0.5}), 260, 299, lambda value, traded, row: 0.0)
+
+    assert [(row, trigger, cut) for row, trigger, cut, _, _ in events] == [(280, "risk_cut", ["AAA"])]
+    assert "AAA" not in weights.index
+    # The cut sleeve sits in cash while BBB keeps drifting up.
+    assert weights["SHY"] == pytest.approx(80 / (80 + 129.9))
+    assert len(equity_path) == len(return_path) == 39
+    assert equity == pytest.approx(equity_path[-1])
+
+
+def test_position_monitor_rebalances_back_to_target_when_drift_exceeds_band():
+    cfg = _base_cfg()
+    cfg["backtest"]["monitoring"] = {"enabled": True, "risk_cuts": False, "drift_band": 0.05}
+    idx = pd.date_range("2024-01-01", periods=300, freq="B")
+    px = pd.DataFrame({"AAA": [100 * 1.01**i for i in range(300)], "BBB": [100.0] * 300}, index=idx)
+    costs = []
+
+    equity, weights, equity_path, _, events = _monitor(cfg, px).hold(1.0, pd.Series({"AAA": 0.5, "BBB": 0.5}), 250, 299, lambda value, traded, row: costs.append(traded) or 0.001)
+
+    assert events and {trigger for _, trigger, _, _, _ in events} == {"drift"}
+    assert all(0.1 < traded < 0.2 for traded in costs)
+    assert abs(weights["AAA"] - 0.5) <= 0.05
+    assert equity == pytest.approx(equity_path[-1])
+
+
+def test_incremental_backtest_replays_only_new_days(monkeypatch, tmp_path):
+    import druck.backtest as backtest
+
+    cfg = _base_cfg()
+    cfg["backtest"]["rebalance_frequency"] = "monthly"
+    cfg["backtest"]["state_dir"] = str(tmp_path)
+    idx = pd.date_range("2024-01-01", periods=440, freq="B")
+    px = pd.DataFrame({
+        "SPY": pd.Series([100 + i * 0.2 + (i % 7) * 0.6 for i in range(440)], index=idx),
+        "SHY": pd.Series([100 + i * 0.01 for i in range(440)], index=idx),
+        "UUP": pd.Series([100 - i * 0.02 for i in range(440)], index=idx),
+        "HYG": pd.Series([100 + i * 0.1 + (i % 5) * 0.5 for i in range(440)], index=idx),
+        "IEF": pd.Series([100 + i * 0.03 for i in range(440)], index=idx),
+        "TLT": pd.Series([100 + i * 0.02 + (i % 3) * 0.4 for i in range(440)], index=idx),
+        "^VIX": pd.Series([15 + (i % 3) * 0.1 for i in range(440)], index=idx),
+    })
+    window = {"start": 0, "end": 420}
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, start, end, prefer='auto', cache_dir=None, use_cache=True: px.iloc[window["start"] : window["end"]][tickers])
+    calls = []
+    original = backtest._prepare_selection
+
+    def counting_prepare(cfg, px_window, feature_cube=None, regime_timeline=None):
+        calls.append(px_window.index[-1])
+        return original(cfg, px_window, feature_cube, regime_timeline)
+
+    monkeypatch.setattr("druck.backtest._prepare_selection", counting_prepare)
+    run_backtest(cfg, incremental=True)
+    # The lookback window rolls forward with the new days; the stored run keeps its start.
+    window.update(start=20, end=440)
+    calls.clear()
+    incremental = run_backtest(cfg, incremental=True)
+    replayed = len(calls)
+    assert run_backtest(cfg, incremental=True).summary == incremental.summary
+    assert len(calls) == replayed
+
+    window.update(start=0)
+    full = run_backtest(cfg)
+    # The resumed rebalance and the month end the new days complete.
+    assert replayed == 2 < len(full.rebalance_log)
+    pd.testing.assert_series_equal(incremental.equity_curve, full.equity_curve, check_freq=False)
+    pd.testing.assert_frame_equal(incremental.rebalance_log, full.rebalance_log)
+    assert incremental.summary == full.summary
+    pd.testing.assert_frame_equal(incremental.walkforward_summary, full.walkforward_summary)
+
+    # A revised historical price invalidates the state and forces a full rebuild.
+    px.iloc[300, 0] *= 1.01
+    calls.clear()
+    run_backtest(cfg, incremental=True)
+    assert len(calls) == len(full.rebalance_log)
+
+
+def test_incremental_backtest_state_rebuilds_on_new_source_and_rolled_window(monkeypatch, tmp_path):
+    import druck.backtest as backtest
+    from druck.macro import load_regime_timeline
+
+    cfg = _base_cfg()
+    cfg["backtest"]["rebalance_frequency"] = "monthly"
+    cfg["backtest"]["state_dir"] = str(tmp_path)
+    idx = pd.date_range("2024-01-01", periods=440, freq="B")
+    px = pd.DataFrame({
+        "SPY": pd.Series([100 + i * 0.2 + (i % 7) * 0.6 for i in range(440)], index=idx),
+        "SHY": pd.Series([100 + i * 0.01 for i in range(440)], index=idx),
+        "UUP": pd.Series([100 - i * 0.02 for i in range(440)], index=idx),
+        "HYG": pd.Series([100 + i * 0.1 + (i % 5) * 0.5 for i in range(440)], index=idx),
+        "IEF": pd.Series([100 + i * 0.03 for i in range(440)], index=idx),
+        "TLT": pd.Series([100 + i * 0.02 + (i % 3) * 0.4 for i in range(440)], index=idx),
+        "^VIX": pd.Series([15 + (i % 3) * 0.1 for i in range(440)], index=idx),
+    })
+    window = {"start": 0, "end": 400}
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, start, end, prefer='auto', cache_dir=None, use_cache=True: px.iloc[window["start"] : window["end"]][tickers])
+    state_path = backtest._backtest_state_path(cfg)
+    run_backtest(cfg, incremental=True)
+    assert load_regime_timeline(state_path / "regime_timeline.parquet").index[-1] == idx[399]
+
+    # The stored timeline is extended with the new days, not recomputed.
+    window.update(end=420)
+    timelines = []
+    original = backtest.compute_regime_timeline
+    monkeypatch.setattr("druck.backtest.compute_regime_timeline", lambda *a, **k: timelines.append(a[0]) or original(*a, **k))
+    run_backtest(cfg, incremental=True)
+    assert timelines == []
+    assert load_regime_timeline(state_path / "regime_timeline.parquet").index[-1] == idx[419]
+
+    # Other package source serves no stored run.
+    monkeypatch.setattr("druck.backtest._code_version", lambda: "other")
+    window.update(end=440)
+    state = json.loads((state_path / "state.json").read_text(encoding="utf-8"))
+    assert backtest._load_backtest_state(state_path, cfg, backtest.prepare_backtest_inputs(cfg, backtest._backtest_config(cfg))) is None
+    run_backtest(cfg, incremental=True)
+    assert json.loads((state_path / "state.json").read_text(encoding="utf-8"))["code_version"] == "other" != state["code_version"]
+
+    # Once the window rolls a warm-up past the stored start, the state is rebased on it.
+    monkeypatch.setattr("druck.backtest.TIMELINE_WARMUP_ROWS", 10)
+    window.update(start=20)
+    rebased = run_backtest(cfg, incremental=True)
+    assert rebased.summary == run_backtest(cfg).summary
+    assert backtest.load_price_panel(state_path / "prices").index[0] == idx[20]
+
+
+def test_result_cache_serves_unchanged_inputs_and_misses_on_new_data(monkeypatch, tmp_path):
+    import druck.backtest as backtest
+
+    cfg = _base_cfg()
+    cfg["backtest"]["result_cache_dir"] = str(tmp_path)
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    px = pd.DataFrame({
+        "SPY": pd.Series([100 + i * 0.2 for i in range(420)], index=idx),
+        "SHY": pd.Series([100 + i * 0.01 for i in range(420)], index=idx),
+        "UUP": pd.Series([100 - i * 0.02 for i in range(420)], index=idx),
+        "HYG": pd.Series([100 + i * 0.1 for i in range(420)], index=idx),
+        "IEF": pd.Series([100 + i * 0.03 for i in range(420)], index=idx),
+        "TLT": pd.Series([100 + i * 0.02 for i in range(420)], index=idx),
+        "^VIX": pd.Series([15 + (i % 3) * 0.1 for i in range(420)], index=idx),
+    })
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, start, end, prefer='auto', cache_dir=None, use_cache=True: px[tickers])
+    calls = []
+    original = backtest._prepare_selection
+
+    def counting_prepare(cfg, px_window, feature_cube=None, regime_timeline=None):
+        calls.append(px_window.index[-1])
+        return original(cfg, px_window, feature_cube, regime_timeline)
+
+    monkeypatch.setattr("druck.backtest._prepare_selection", counting_prepare)
+    first = run_backtest(cfg)
+    computed = len(calls)
+
+    cfg["backtest"]["executor"] = "thread"
+    cached = run_backtest(cfg)
+    assert len(calls) == computed
+    pd.testing.assert_series_equal(cached.equity_curve, first.equity_curve)
+    pd.testing.assert_frame_equal(cached.rebalance_log, first.rebalance_log)
+    pd.testing.assert_frame_equal(cached.walkforward_summary, first.walkforward_summary)
+    pd.testing.assert_frame_equal(cached.scenario_summary, first.scenario_summary)
+    assert cached.summary == first.summary
+    assert cached.analytics["strategy_comparison"] == first.analytics["strategy_comparison"]
+
+    px.iloc[-1, 0] *= 1.01
+    run_backtest(cfg)
+    assert len(calls) == 2 * computed
@@ -0,0 +1,147 @@
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from druck.cache_manager import CacheManager
+from druck.data import _cache_key, write_price_panel
+from druck.price_cache import PriceCache
+
+
+def _frame(tickers):
+    idx = pd.date_range("2024-01-01", periods=30, freq="B")
+    return pd.DataFrame({t: range(1, 31) for t in tickers}, index=idx, dtype=float)
+
+
+def test_price_cache_index_records_hits_and_size(tmp_path):
+    cache = PriceCache(tmp_path)
+    cache.write(_frame(["SPY", "QQQ"]), "2024-01-01", "2024-02-09")
+
+    written = cache.manifest_path.stat().st_mtime_ns
+    cache.read(["SPY"], "2024-01-01", "2024-02-09")
+    cache.read(["SPY"], "2024-01-01", "2024-02-09")
+
+    # Reads only buffer their hits until the next manifest update.
+    assert cache.manifest_path.stat().st_mtime_ns == written
+    assert PriceCache(tmp_path).manifest["SPY"]["hits"] == 0
+    cache.flush_hits()
+    manifest = PriceCache(tmp_path).manifest
+    assert manifest["SPY"]["hits"] == 2
+    assert manifest["QQQ"]["hits"] == 0
+    assert manifest["SPY"]["bytes"] == (cache.root / manifest["SPY"]["file"]).stat().st_size
+
+
+def test_prune_applies_ttl_then_lru_budget(tmp_path):
+    cache = PriceCache(tmp_path)
+    cache.write(_frame(["OLD", "MID", "NEW"]), "2024-01-01", "2024-02-09")
+    now = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    for ticker, age in [("OLD", 40), ("MID", 5), ("NEW", 1)]:
+        cache.manifest[ticker]["last_access"] = (now - timedelta(days=age)).isoformat()
+    cache._save_manifest()
+    size = cache.manifest["NEW"]["bytes"]
+
+    victims = CacheManager(tmp_path, ttl_days=30).prune(now=now, dry_run=True)
+    assert [item.key for item in victims] == ["OLD"]
+    assert "OLD" in PriceCache(tmp_path).manifest
+
+    victims = CacheManager(tmp_path, max_bytes=size, ttl_days=30).prune(now=now)
+    assert [item.key for item in victims] == ["OLD", "MID"]
+    remaining = PriceCache(tmp_path)
+    assert list(remaining.manifest) == ["NEW"]
+    assert sorted(p.name for p in remaining.root.glob("*.arrow")) == [remaining.manifest["NEW"]["file"]]
+
+
+def test_stats_cover_prices_panels_and_legacy_files(tmp_path):
+    PriceCache(tmp_path / "cache").write(_frame(["SPY"]), "2024-01-01", "2024-02-09")
+    write_price_panel(_frame(["SPY"]), tmp_path / "panels" / "abc")
+    _frame(["QQQ"]).to_csv(tmp_path / "cache" / _cache_key(["QQQ"], "2024-01-01", "2024-02-09"))
+
+    stats = CacheManager(tmp_path / "cache", panel_dir=tmp_path / "panels").stats()
+
+    assert stats["entries"] == 3
+    assert set(stats["kinds"]) == {"price", "panel", "legacy"}
+    assert stats["bytes"] == sum(kind["bytes"] for kind in stats["kinds"].values())
+
+
+def test_import_legacy_moves_csv_into_the_indexed_store(tmp_path):
+    _frame(["QQQ"]).to_csv(tmp_path / _cache_key(["QQQ"], "2024-01-01", "2024-02-09"))
+    cache = PriceCache(tmp_path)
+
+    assert cache.import_legacy() == 1
+    assert not list(tmp_path.glob("px_*.csv"))
+    assert cache.coverage("QQQ") == ("2024-01-01", "2024-02-09")
+
+
+def test_concurrent_price_cache_writers_keep_every_manifest_entry(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    PriceCache(tmp_path).write(_frame(["SPY"]), "2024-01-01", "2024-02-09")
+    tickers = [f"T{i:03d}" for i in range(48)]
+
+    def fetch(ticker):
+        # Each fetch_prices call builds its own cache over the shared directory.
+        PriceCache(tmp_path).write(_frame([ticker]), "2024-01-01", "2024-02-09")
+        PriceCache(tmp_path).read(["SPY"], "2024-01-01", "2024-02-09")
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(fetch, tickers))
+
+    PriceCache(tmp_path).flush_hits()
+    manifest = PriceCache(tmp_path).manifest
+    assert set(manifest) == {"SPY", *tickers}
+    assert manifest["SPY"]["hits"] == len(tickers)
+    assert not [p for p in (tmp_path / "prices").iterdir() if ".tmp" in p.name]
+
+
+def _write_in_process(args):
+    cache_dir, tickers = args
+    for ticker in tickers:
+        PriceCache(cache_dir).write(_frame([ticker]), "2024-01-01", "2024-02-09")
+        PriceCache(cache_dir).read(["SPY"], "2024-01-01", "2024-02-09")
+        PriceCache(cache_dir).flush_hits()
+
+
+def test_price_cache_writers_in_separate_processes_keep_every_manifest_entry(tmp_path):
+    from concurrent.futures import ProcessPoolExecutor
+
+    pytest.importorskip("fcntl")
+    PriceCache(tmp_path).write(_frame(["SPY"]), "2024-01-01", "2024-02-09")
+    batches = [[f"P{w}{i:02d}" for i in range(12)] for w in range(4)]
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        list(pool.map(_write_in_process, [(str(tmp_path), batch) for batch in batches]))
+
+    manifest = PriceCache(tmp_path).manifest
+    assert set(manifest) == {"SPY", *(t for batch in batches for t in batch)}
+    assert manifest["SPY"]["hits"] == 48
+
+
+def test_price_cache_refetches_full_history_when_adjusted_closes_move(monkeypatch, tmp_path):
+    from druck.data import fetch_prices
+
+    idx = pd.date_range("2024-01-01", "2024-03-01", freq="B")
+    full = pd.DataFrame({"SPY": [100.0 + i for i in range(len(idx))]}, index=idx)
+    calls = []
+
+    def fake_yf(tickers, start, end):
+        calls.append((list(tickers), start, end))
+        return full.loc[start:end, tickers].iloc[:-1], ""
+
+    monkeypatch.setattr("druck.data._HAS_SHARED_DATA", False)
+    monkeypatch.setattr("druck.data._SHARED_DATA_IMPORT_ERROR", None)
+    monkeypatch.setattr("druck.data.fetch_prices_yf", fake_yf)
+    fetch_prices(["SPY"], "2024-01-01", "2024-02-01", prefer="yf", cache_dir=str(tmp_path))
+
+    # A 2:1 split on 2024-02-05: the provider halves every adjusted close before it.
+    full.loc[full.index < "2024-02-05", "SPY"] /= 2
+    calls.clear()
+    later = fetch_prices(["SPY"], "2024-01-01", "2024-02-15", prefer="yf", cache_dir=str(tmp_path))
+
+    assert calls == [(["SPY"], "2024-01-25", "2024-02-15"), (["SPY"], "2024-01-01", "2024-02-15")]
+    pd.testing.assert_frame_equal(later, full.loc["2024-01-01":"2024-02-14"], check_freq=False)
+    assert PriceCache(tmp_path).coverage("SPY") == ("2024-01-01", "2024-02-15")
+
+    # Unrevised history only fetches the tail again.
+    calls.clear()
+    fetch_prices(["SPY"], "2024-01-01", "2024-02-22", prefer="yf", cache_dir=str(tmp_path))
+    assert calls == [(["SPY"], "2024-02-08", "2024-02-22")]
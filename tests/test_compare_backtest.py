@@ -63,12 +63,30 @@ def test_run_scoring_comparison_writes_outputs(monkeypatch, tmp_path):
         analytics={"selection_score_comparison": {"avg_capacity_score": 0.6, "latest_alpha_top_picks": ["QQQ"]}},
     )
     calls = []
+    shared_inputs = object()
 
-    def fake_run_backtest(cfg):
-        calls.append(cfg)
+    def fake_run_backtest(cfg, inputs=None):
+        calls.append((cfg, inputs))
         return dummy if len(calls) == 1 else baseline
 
+    prefetched = []
+
+    class FakeExecutor:
+        def __init__(self, bt_cfg, inputs):
+            assert inputs is shared_inputs
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return None
+
+        def prefetch_decisions(self, jobs, local=False):
+            prefetched.extend(cfg for cfg, _end in jobs)
+
+    monkeypatch.setattr("druck.compare_backtest.prepare_backtest_inputs", lambda cfg: shared_inputs)
     monkeypatch.setattr("druck.compare_backtest.run_backtest", fake_run_backtest)
+    monkeypatch.setattr("druck.compare_backtest.BacktestExecutor", FakeExecutor)
 
     cfg = {
         "selection": {
@@ -83,3 +101,7 @@ def test_run_scoring_comparison_writes_outputs(monkeypatch, tmp_path):
     assert output_path.exists()
     assert (tmp_path / "comparative" / "comparison_notes.txt").exists()
     assert len(calls) == 2
+    assert all(inputs is shared_inputs for _cfg, inputs in calls)
+    # Both runs and their legacy-weights comparisons are decided up front together.
+    assert prefetched[0] == calls[0][0] and prefetched[2] == calls[1][0]
+    assert [c["selection"]["score_weights"]["momentum"] for c in prefetched[1::2]] == [0.55, 0.55]
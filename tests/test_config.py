@@ -92,6 +92,11 @@ def test_validate_config_accepts_valid_config():
     assert cfg["data"]["lookback_years"] == 3
 
 
+def test_validate_config_accepts_local_price_provider():
+    cfg = validate_config(VALID_CFG | {"data": VALID_CFG["data"] | {"price_provider": "local", "local_root": "/srv/druck"}})
+    assert cfg["data"]["price_provider"] == "local"
+
+
 def test_validate_config_rejects_invalid_threshold_order():
     cfg = VALID_CFG | {"macro_filter": VALID_CFG["macro_filter"] | {"thresholds": {"risk_on_score_min": 0.4, "risk_off_score_max": 0.5}}}
     with pytest.raises(ConfigError):
@@ -104,6 +109,38 @@ def test_validate_config_rejects_invalid_schedule_hour():
         validate_config(cfg)
 
 
+def test_validate_config_checks_rebalance_calendar():
+    def with_backtest(**values):
+        return VALID_CFG | {"backtest": VALID_CFG["backtest"] | values}
+
+    for frequency in ["daily", "weekly", "monthly", "month_end-2", "W-FRI", "M"]:
+        validate_config(with_backtest(rebalance_frequency=frequency))
+    validate_config(with_backtest(rebalance_frequency="custom", rebalance_dates=["2024-03-15", "2024-06-14"]))
+    for bad in [with_backtest(rebalance_frequency="fortnightly"), with_backtest(rebalance_frequency="month_end-x"), with_backtest(rebalance_frequency="custom")]:
+        with pytest.raises(ConfigError):
+            validate_config(bad)
+
+
+def test_validate_config_checks_backtest_monitoring():
+    def with_monitoring(**values):
+        return VALID_CFG | {"backtest": VALID_CFG["backtest"] | {"monitoring": values}}
+
+    validate_config(with_monitoring(enabled=True, risk_cuts=False, drift_band=0.05))
+    for bad in [with_monitoring(enabled="yes"), with_monitoring(drift_band=1.5), VALID_CFG | {"backtest": VALID_CFG["backtest"] | {"monitoring": [True]}}]:
+        with pytest.raises(ConfigError):
+            validate_config(bad)
+
+
+def test_validate_config_checks_backtest_state_and_result_cache():
+    def with_backtest(**values):
+        return VALID_CFG | {"backtest": VALID_CFG["backtest"] | values}
+
+    validate_config(with_backtest(state_dir=".cache/backtest_state", result_cache_dir=".cache/backtest_results", result_cache_max_mb=256))
+    for bad in [with_backtest(state_dir=1), with_backtest(result_cache_dir=None), with_backtest(result_cache_max_mb=-1)]:
+        with pytest.raises(ConfigError):
+            validate_config(bad)
+
+
 def test_validate_config_accepts_kr_rotation_specific_fields():
     cfg = VALID_CFG | {
         "universe": VALID_CFG["universe"] | {
@@ -4,6 +4,7 @@ import pandas as pd
 import pytest
 
 from druck.data import _cache_key, fetch_prices, fetch_prices_fdr, make_universe, generate_kr_etf_universe, _summarize_provider_issues, ProviderIssue
+from druck.price_cache import PriceCache
 
 
 def test_cache_key_is_stable():
@@ -221,3 +222,243 @@ def test_fetch_prices_records_yf_partial_success_stderr_noise(monkeypatch, tmp_p
     summary = result.attrs.get("provider_warning_summary", {})
     assert summary["counts"]["invalid_symbol"] == 1
     assert summary["tickers"]["invalid_symbol"] == ["229200.KS"]
+
+
+def test_fetch_prices_serves_cached_tickers_and_fetches_only_gaps(monkeypatch, tmp_path):
+    idx = pd.bdate_range("2024-01-01", "2024-02-15")
+    full = pd.DataFrame({"SPY": range(len(idx)), "QQQ": range(100, 100 + len(idx))}, index=idx, dtype=float)
+    calls = []
+
+    def fake_yf(tickers, start, end):
+        calls.append((list(tickers), start, end))
+        return full.loc[start:end, tickers].iloc[:-1], ""
+
+    monkeypatch.setattr("druck.data._HAS_SHARED_DATA", False)
+    monkeypatch.setattr("druck.data._SHARED_DATA_IMPORT_ERROR", None)
+    monkeypatch.setattr("druck.data.fetch_prices_yf", fake_yf)
+
+    first = fetch_prices(["SPY"], "2024-01-01", "2024-02-01", prefer="yf", cache_dir=str(tmp_path))
+    assert calls == [(["SPY"], "2024-01-01", "2024-02-01")]
+    assert first.index[-1] == pd.Timestamp("2024-01-31")
+
+    again = fetch_prices(["SPY"], "2024-01-10", "2024-01-20", prefer="yf", cache_dir=str(tmp_path))
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(again, full.loc["2024-01-10":"2024-01-19", ["SPY"]], check_freq=False)
+
+    later = fetch_prices(["SPY", "QQQ"], "2024-01-01", "2024-02-15", prefer="yf", cache_dir=str(tmp_path))
+    assert sorted(calls[1:]) == [(["QQQ"], "2024-01-01", "2024-02-15"), (["SPY"], "2024-01-25", "2024-02-15")]
+    pd.testing.assert_frame_equal(later, full.iloc[:-1], check_freq=False)
+    manifest = PriceCache(tmp_path).manifest
+    assert manifest["SPY"]["start"] == "2024-01-01" and manifest["SPY"]["end"] == "2024-02-15"
+
+
+def test_fetch_prices_fdr_retries_rate_limits_and_keeps_batch_on_errors(monkeypatch):
+    idx = pd.to_datetime(["2024-01-01", "2024-01-02"])
+
+    class FakeFDR:
+        calls = []
+        limited = {"000002"}
+
+        @classmethod
+        def DataReader(cls, ticker, start, end):
+            cls.calls.append(ticker)
+            if ticker in cls.limited:
+                cls.limited.discard(ticker)
+                raise RuntimeError("429 Too Many Requests")
+            if ticker == "000003":
+                raise RuntimeError("connection reset")
+            return pd.DataFrame({"Close": [float(ticker[-1]), float(ticker[-1]) + 1]}, index=idx)
+
+    import sys
+    monkeypatch.setitem(sys.modules, "FinanceDataReader", FakeFDR)
+
+    tickers = ["000001.KS", "000002.KS", "000003.KS", "000004.KS"]
+    result = fetch_prices_fdr(tickers, "2024-01-01", "2024-01-03", max_workers=4, rate_per_sec=0, backoff_seconds=0)
+    assert list(result.columns) == ["000001.KS", "000002.KS", "000004.KS"]
+    assert FakeFDR.calls.count("000002") == 2
+    issues = result.attrs["provider_issues"]
+    assert [(i.category, i.tickers) for i in issues] == [("provider_error", ["000003.KS"])]
+
+
+def test_fetch_prices_surfaces_fdr_per_ticker_issues(monkeypatch, tmp_path):
+    idx = pd.to_datetime(["2024-01-01", "2024-01-02"])
+    fdr_close = pd.DataFrame({"069500.KS": [100.0, 101.0]}, index=idx)
+    fdr_close.attrs["provider_issues"] = [ProviderIssue(provider="fdr", category="invalid_symbol", detail="229200.KS: not found", tickers=["229200.KS"])]
+    seen = {}
+
+    def fake_fdr(tickers, start, end, **options):
+        seen.update(options)
+        return fdr_close
+
+    monkeypatch.setattr("druck.data._HAS_SHARED_DATA", False)
+    monkeypatch.setattr("druck.data._SHARED_DATA_IMPORT_ERROR", None)
+    monkeypatch.setattr("druck.data.fetch_prices_fdr", fake_fdr)
+
+    result = fetch_prices(["069500.KS", "229200.KS"], "2024-01-01", "2024-01-03", prefer="fdr", cache_dir=str(tmp_path), use_cache=False, fdr_options={"max_workers": 8})
+    assert seen == {"max_workers": 8}
+    assert list(result.columns) == ["069500.KS"]
+    assert result.attrs["provider_warning_summary"]["tickers"]["invalid_symbol"] == ["229200.KS"]
+
+
+def test_fetch_prices_local_reads_lake_collected_and_bundled_parquet_offline(tmp_path, monkeypatch):
+    from druck.market_data import append_timeseries_delta, write_price_lake, write_timeseries_parquet
+
+    data_root = tmp_path / "data"
+    prices_root = data_root / "market_data" / "prices"
+    dates = pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"])
+    write_price_lake(prices_root / "lake", "kr_etfs", pd.DataFrame({"069500.KS": [1.0, 2.0, 3.0]}, index=dates), "20240104T000000Z")
+    write_timeseries_parquet(pd.DataFrame({"QQQ": [4.0, 5.0, float("nan")], "069500.KS": [9.0, 9.0, 9.0]}, index=dates), prices_root / "us_etfs.parquet")
+    append_timeseries_delta(prices_root / "us_etfs.parquet", pd.DataFrame({"QQQ": [6.0]}, index=dates[2:]), "20240105T000000Z")
+    bundled = pd.DataFrame({("Close", "SPY"): [7.0, 8.0, 9.0], ("High", "SPY"): [0.0, 0.0, 0.0]}, index=pd.DatetimeIndex(dates, name="Date"))
+    bundled.to_parquet(data_root / "benchmarks.parquet")
+
+    def no_network(*args, **kwargs):
+        raise AssertionError("local provider must not hit the network")
+
+    monkeypatch.setattr("druck.data.fetch_prices_yf", no_network)
+    monkeypatch.setattr("druck.data.fetch_prices_fdr", no_network)
+
+    result = fetch_prices(["SPY", "QQQ", "069500.KS", "NOPE"], "2024-01-03", "2024-01-04", prefer="local", cache_dir=str(tmp_path / "cache"), local_root=str(tmp_path))
+
+    assert list(result.columns) == ["SPY", "QQQ", "069500.KS"]
+    assert list(result.index) == list(dates[1:])
+    assert result["SPY"].tolist() == [8.0, 9.0]
+    assert result["QQQ"].tolist() == [5.0, 6.0]
+    assert result["069500.KS"].tolist() == [2.0, 3.0]
+    assert result.attrs["provider_warning_summary"]["tickers"]["invalid_symbol"] == ["NOPE"]
+    assert not (tmp_path / "cache" / "prices").exists()
+
+
+class _StubSnapshots:
+    def __init__(self, days):
+        self.days = days
+        self.calls = []
+
+    def snapshot(self, day, market):
+        self.calls.append((day, market))
+        if day == "2024-01-03":
+            raise RuntimeError("KRX timeout")
+        return self.days.get(day, pd.DataFrame(columns=["close", "volume"]))
+
+
+def test_fetch_snapshots_by_date_makes_one_call_per_weekday_and_transposes():
+    from druck.data import fetch_prices_by_date, fetch_snapshots_by_date
+
+    stub = _StubSnapshots({
+        "2024-01-02": pd.DataFrame({"close": [100.0, 50.0, 7.0], "volume": [10.0, 20.0, 30.0]}, index=["069500", "229200", "999999"]),
+        "2024-01-04": pd.DataFrame({"close": [101.0], "volume": [11.0]}, index=["069500"]),
+    })
+
+    out = fetch_snapshots_by_date(["229200.KS", "069500.KS"], "2024-01-01", "2024-01-05", market="etfs", provider=stub)
+
+    assert [day for day, _ in stub.calls] == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+    assert list(out["close"].columns) == ["229200.KS", "069500.KS"]
+    assert list(out["close"].index) == list(pd.to_datetime(["2024-01-02", "2024-01-04"]))
+    assert out["close"].loc["2024-01-04", "069500.KS"] == 101.0
+    assert pd.isna(out["close"].loc["2024-01-04", "229200.KS"])
+    assert out["volume"].loc["2024-01-02", "229200.KS"] == 20.0
+    assert out["close"].attrs["provider_warning_summary"]["issue_count"] == 1
+
+    market = fetch_prices_by_date(None, "2024-01-02", "2024-01-02", market="etfs", provider=stub)
+    assert list(market.columns) == ["069500.KS", "229200.KS", "999999.KS"]
+
+
+def test_fetch_prices_stores_provider_volume_next_to_closes(monkeypatch, tmp_path):
+    from druck.data import fetch_volumes
+
+    idx = pd.to_datetime(["2024-01-02", "2024-01-03"])
+
+    def fake_yf(tickers, start, end):
+        close = pd.DataFrame({t: [100.0, 101.0] for t in tickers}, index=idx)
+        close.attrs["volume"] = pd.DataFrame({t: [5_000.0, 6_000.0] for t in tickers}, index=idx)
+        return close, ""
+
+    monkeypatch.setattr("druck.data._HAS_SHARED_DATA", False)
+    monkeypatch.setattr("druck.data._SHARED_DATA_IMPORT_ERROR", None)
+    monkeypatch.setattr("druck.data.fetch_prices_yf", fake_yf)
+
+    close = fetch_prices(["SPY"], "2024-01-02", "2024-01-03", prefer="yf", cache_dir=str(tmp_path))
+
+    assert "volume" not in close.attrs
+    volume = fetch_volumes(["SPY", "QQQ"], "2024-01-02", "2024-01-03", cache_dir=str(tmp_path))
+    assert list(volume.columns) == ["SPY"]
+    assert volume["SPY"].tolist() == [5_000.0, 6_000.0]
+    assert PriceCache(tmp_path).read(["SPY"], "2024-01-02", "2024-01-03")["SPY"].tolist() == [100.0, 101.0]
+
+
+def test_fetch_prices_memory_cache_serves_overlap_and_single_flights(monkeypatch):
+    import threading
+    import time
+
+    from druck.price_cache import PRICE_MEMORY
+
+    PRICE_MEMORY.clear()
+    idx = pd.date_range("2024-01-01", periods=10, freq="B")
+    calls = []
+
+    def fake_yf(tickers, start, end):
+        calls.append(list(tickers))
+        time.sleep(0.05)
+        return pd.DataFrame({t: range(1, 11) for t in tickers}, index=idx, dtype=float).loc[start:end]
+
+    monkeypatch.setattr("druck.data._HAS_SHARED_DATA", False)
+    monkeypatch.setattr("druck.data._SHARED_DATA_IMPORT_ERROR", None)
+    monkeypatch.setattr("druck.data.fetch_prices_yf", fake_yf)
+    options = {"prefer": "yf", "memory_ttl_seconds": 60}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(fetch_prices(["SPY", "QQQ"], "2024-01-01", "2024-01-12", **options))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [["SPY", "QQQ"]]
+    assert all(list(df.columns) == ["SPY", "QQQ"] and len(df) == 10 for df in results)
+
+    narrower = fetch_prices(["QQQ", "TLT"], "2024-01-03", "2024-01-10", **options)
+    assert calls[-1] == ["TLT"]
+    assert list(narrower.columns) == ["QQQ", "TLT"]
+    assert narrower.index[0] == pd.Timestamp("2024-01-03")
+    assert narrower.loc["2024-01-03", "QQQ"] == 3.0
+
+    fetch_prices(["IEF"], "2024-01-01", "2024-01-12", **options, memory_max_mb=1e-6)
+    assert PRICE_MEMORY.stats()["entries"] == 0
+    PRICE_MEMORY.clear()
+
+
+def test_generate_kr_etf_universe_seeds_listing_cache_from_collector_and_refreshes_in_background(monkeypatch, tmp_path):
+    import json
+    import sys
+    import time
+
+    import druck.data as data
+
+    listing = tmp_path / "local" / "data" / "market_data" / "listings" / "kr_etf.parquet"
+    listing.parent.mkdir(parents=True)
+    pd.DataFrame({"Symbol": ["069500", "357870"]}).to_parquet(listing)
+
+    class OfflineFDR:
+        @staticmethod
+        def StockListing(market):
+            raise AssertionError("listing API should not be called while the cache is fresh")
+
+    monkeypatch.setitem(sys.modules, "FinanceDataReader", OfflineFDR)
+    kwargs = {"cache_dir": str(tmp_path / "cache"), "max_age_hours": 24, "local_root": str(tmp_path / "local")}
+
+    assert generate_kr_etf_universe(whitelist=["102110.KS"], blacklist=["357870.KS"], **kwargs) == ["069500.KS", "102110.KS"]
+    cache_path = tmp_path / "cache" / "listings" / data.KR_ETF_LISTING_CACHE
+    assert json.loads(cache_path.read_text())["codes"] == "069500,357870"
+    listing.unlink()
+    assert generate_kr_etf_universe(**kwargs) == ["069500.KS", "357870.KS"]
+
+    class FreshFDR:
+        @staticmethod
+        def StockListing(market):
+            return pd.DataFrame({"Symbol": ["114800"]})
+
+    monkeypatch.setitem(sys.modules, "FinanceDataReader", FreshFDR)
+    data._write_listing_cache(cache_path, ["069500.KS"], time.time() - 48 * 3600, "live")
+    assert generate_kr_etf_universe(**kwargs) == ["069500.KS"]
+    with data._LISTING_REFRESH:
+        pass
+    assert generate_kr_etf_universe(**kwargs) == ["114800.KS"]
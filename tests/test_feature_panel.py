@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from druck.feature_panel import FeatureCube, compute_feature_panel, right_align_tail
+from druck.portfolio import _per_ticker_features, score_universe
+
+
+def _panel_prices(seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2021-01-01", periods=420, freq="B")
+    cols = {}
+    for i, ticker in enumerate(["SPY", "QQQ", "TLT", "AAA", "BBB", "CCC", "DDD", "EEE"]):
+        cols[ticker] = 100 * np.cumprod(1 + rng.normal(0.0004 * i, 0.01 + 0.002 * i, len(idx)))
+    px = pd.DataFrame(cols, index=idx)
+    px.iloc[:120, px.columns.get_loc("BBB")] = np.nan
+    px.iloc[[200, 251, 390], px.columns.get_loc("CCC")] = np.nan
+    px.iloc[300:, px.columns.get_loc("DDD")] = np.nan
+    px.iloc[:300, px.columns.get_loc("EEE")] = np.nan
+    px["FLAT"] = 50.0
+    return px
+
+
+def test_right_align_tail_matches_dropna_tail():
+    px = _panel_prices()
+    tail, positions, lengths = right_align_tail(px.to_numpy(), 253)
+    for i, ticker in enumerate(px.columns):
+        expected = px[ticker].dropna().iloc[-253:].to_numpy()
+        got = tail[:, i]
+        assert lengths[i] == px[ticker].notna().sum()
+        assert np.array_equal(got[~np.isnan(got)], expected)
+        assert (positions[:, i] >= 0).sum() == len(expected)
+
+
+def test_feature_panel_matches_per_ticker_features():
+    px = _panel_prices()
+    residual_cfg = {"enabled": True, "anchor_tickers": ["SPY", "QQQ", "TLT", "FLAT"], "lookback": 126}
+    panel = compute_feature_panel(px, "SPY", residual_cfg)
+    legacy = _per_ticker_features(px, "SPY", residual_cfg)
+    assert list(panel.index) == list(legacy.index)
+    assert "EEE" not in panel.index
+    pd.testing.assert_frame_equal(panel, legacy, check_exact=False, rtol=1e-9, atol=1e-12, check_dtype=False, check_index_type=False)
+
+
+def test_score_universe_engines_agree():
+    px = _panel_prices(11)
+    sw = {"momentum": 0.4, "trend": 0.2, "vol_penalty": 0.1, "dd_penalty": 0.1, "residual_strength": 0.1}
+    residual_cfg = {"enabled": True, "anchor_tickers": ["SPY", "TLT"], "lookback": 63}
+    panel = score_universe(px, sw, benchmark_ticker="SPY", residual_cfg=residual_cfg)
+    legacy = score_universe(px, sw, benchmark_ticker="SPY", residual_cfg=residual_cfg, feature_engine="per_ticker")
+    pd.testing.assert_frame_equal(panel, legacy, check_exact=False, rtol=1e-9, atol=1e-12, check_dtype=False, check_index_type=False)
+
+
+def test_feature_cube_matches_panel_on_every_prefix():
+    px = _panel_prices(3)
+    residual_cfg = {"enabled": True, "anchor_tickers": ["SPY", "TLT", "FLAT"], "lookback": 63}
+    cube = FeatureCube(px, "SPY", residual_cfg)
+    columns = [c for c in px.columns if c != "QQQ"]
+    for pos in [259, 260, 299, 305, 350, 419]:
+        window = px.iloc[: pos + 1][columns]
+        expected = compute_feature_panel(window, "SPY", residual_cfg)
+        got = cube.features_at(px.index[pos], columns)
+        pd.testing.assert_frame_equal(got, expected, check_exact=False, rtol=1e-9, atol=1e-12, check_index_type=False)
+    assert cube.features_at(px.index[419], columns) is got
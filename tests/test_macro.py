@@ -1,6 +1,7 @@
+import numpy as np
 import pandas as pd
 
-from druck.macro import compute_macro_regime, compute_rates_overlay, is_vix_spike
+from druck.macro import compute_macro_regime, compute_rates_overlay, compute_regime_timeline, is_vix_spike, rates_overlay_at, regime_at, update_regime_timeline
 
 
 def make_price_frame():
@@ -64,3 +65,80 @@ def test_compute_rates_overlay_detects_falling_rate_support():
     overlay = compute_rates_overlay(px, {"up_threshold": 0.02, "down_threshold": -0.02})
     assert overlay["direction"] == "falling"
     assert overlay["score"] > 0
+
+
+def _timeline_frame(periods=520):
+    rng = np.random.default_rng(1)
+    idx = pd.date_range("2020-01-01", periods=periods, freq="B")
+    px = pd.DataFrame({t: 100 * np.cumprod(1 + rng.normal(0.0003, 0.01, len(idx))) for t in ["SPY", "UUP", "HYG", "IEF", "TLT", "069500.KS", "130730.KS"]}, index=idx)
+    px["^VIX"] = 15 + 5 * np.abs(np.sin(np.arange(len(idx)) / 9)) + rng.normal(0, 3, len(idx)).clip(-3, 8)
+    px.iloc[::7, px.columns.get_loc("069500.KS")] = np.nan
+    px.iloc[100:130, px.columns.get_loc("IEF")] = np.nan
+    px.iloc[:50, px.columns.get_loc("TLT")] = np.nan
+    px.iloc[[300, 301], px.columns.get_loc("^VIX")] = np.nan
+    return px
+
+
+def test_regime_timeline_matches_point_in_time_functions():
+    px = _timeline_frame()
+    thresholds = {"risk_on_score_min": 0.55, "risk_off_score_max": 0.45, "kr": {"benchmark_ticker": "069500.KS", "cash_ticker": "130730.KS"}}
+    weights = {"spy_trend_weight": 0.2, "usd_mom_weight": 0.1, "credit_weight": 0.15, "vix_weight": 0.15, "rates_weight": 0.15, "kr_trend_weight": 0.1, "kr_relative_weight": 0.15}
+    rates_cfg = {"up_threshold": 0.01}
+    timeline = compute_regime_timeline(px, thresholds, weights, rates_cfg)
+    for i in [0, 100, 209, 210, 211, 260, 261, 300, 301, 302, 400, 519]:
+        window = px.iloc[: i + 1]
+        expected = compute_macro_regime(window, thresholds, weights)
+        got = regime_at(timeline, px.index[i])
+        assert got.state == expected.state
+        assert got.risk_score == expected.risk_score
+        pd.testing.assert_series_equal(pd.Series(got.details), pd.Series(expected.details))
+        assert rates_overlay_at(timeline, px.index[i]) == compute_rates_overlay(window, rates_cfg)
+        assert bool(timeline.at[px.index[i], "vix_spike"]) == is_vix_spike(window)
+
+
+def test_update_regime_timeline_appends_new_days_and_rewrites_revised_ones(tmp_path):
+    px = _timeline_frame()
+    path = tmp_path / "macro_regime_timeline.parquet"
+    thresholds = {"risk_on_score_min": 0.55, "risk_off_score_max": 0.45}
+    weights = {"spy_trend_weight": 0.3, "usd_mom_weight": 0.15, "credit_weight": 0.2, "vix_weight": 0.2, "rates_weight": 0.15}
+    first = update_regime_timeline(px.iloc[:400], path, thresholds, weights)
+    assert len(first) == 400
+
+    updated = update_regime_timeline(px, path, thresholds, weights)
+    assert len(updated) == len(px)
+    pd.testing.assert_frame_equal(updated.iloc[:400], first, check_freq=False)
+    assert updated.index.is_monotonic_increasing
+    # A later-starting lookback window is not mistaken for a revision.
+    pd.testing.assert_frame_equal(update_regime_timeline(px.iloc[100:], path, thresholds, weights), updated, check_freq=False)
+
+    revised = px.copy()
+    revised.iloc[450:, revised.columns.get_loc("SPY")] *= 0.5
+    rewritten = update_regime_timeline(revised.iloc[100:], path, thresholds, weights)
+    expected = compute_regime_timeline(revised, thresholds, weights)
+    assert len(rewritten) == len(px)
+    pd.testing.assert_frame_equal(rewritten.iloc[:450], updated.iloc[:450], check_freq=False)
+    pd.testing.assert_series_equal(rewritten["risk_score"].iloc[450:], expected["risk_score"].iloc[450:], check_freq=False)
+    assert not rewritten["risk_score"].iloc[450:].equals(updated["risk_score"].iloc[450:])
+    pd.testing.assert_frame_equal(pd.read_parquet(path), rewritten, check_freq=False)
+
+    rebuilt = update_regime_timeline(px, path, {**thresholds, "risk_on_score_min": 0.6}, weights)
+    assert (rebuilt["config_key"] != first["config_key"].iloc[0]).all()
+
+
+def test_update_regime_timeline_computes_only_the_new_days_and_their_warm_up(tmp_path, monkeypatch):
+    import druck.macro as macro
+
+    px = _timeline_frame(1200)
+    path = tmp_path / "macro_regime_timeline.parquet"
+    thresholds = {"risk_on_score_min": 0.55, "risk_off_score_max": 0.45}
+    weights = {"spy_trend_weight": 0.3, "usd_mom_weight": 0.15, "credit_weight": 0.2, "vix_weight": 0.2, "rates_weight": 0.15}
+    update_regime_timeline(px.iloc[:1199], path, thresholds, weights)
+    lengths = []
+    original = macro.compute_regime_timeline
+    monkeypatch.setattr(macro, "compute_regime_timeline", lambda frame, *a, **kw: lengths.append(len(frame)) or original(frame, *a, **kw))
+
+    updated = update_regime_timeline(px.iloc[50:], path, thresholds, weights)
+
+    assert lengths == [2 * macro.TIMELINE_WARMUP_ROWS + 1]
+    expected = compute_regime_timeline(px, thresholds, weights)
+    pd.testing.assert_frame_equal(updated.drop(columns="config_key"), expected, check_freq=False)
@@ -1,8 +1,28 @@
 from pathlib import Path
 
 import pandas as pd
+import pyarrow.parquet as pq
+import pytest
 
-from druck.market_data import chunked, ensure_market_data_layout, merge_timeseries, write_parquet, write_timeseries_parquet
+from druck.market_data import (
+    append_timeseries_delta,
+    chunked,
+    ensure_market_data_layout,
+    load_timeseries,
+    merge_timeseries,
+    plan_incremental_fetch,
+    read_timeseries_state,
+    write_parquet,
+    write_price_lake,
+    write_timeseries_parquet,
+    write_timeseries_state,
+)
+
+
+def _stored(path, tickers, lake=None):
+    from druck.data import read_price_lake
+
+    return read_price_lake(str(lake or path.parent / 'lake'), tickers, '2000-01-01', '2100-01-01').rename_axis('date')
 
 
 def test_ensure_market_data_layout_creates_expected_dirs(tmp_path):
@@ -59,3 +79,289 @@ def test_merge_timeseries_prefers_new_values_and_keeps_old_fallbacks(tmp_path):
 
     assert merged.loc[dates[0], 'AAA'] == 10.0
     assert merged.loc[dates[1], 'AAA'] == 2.0
+
+
+def test_load_timeseries_applies_delta_parts_over_base(tmp_path):
+    path = tmp_path / 'prices.parquet'
+    dates = pd.to_datetime(['2026-01-01', '2026-01-02'])
+    write_timeseries_parquet(pd.DataFrame({'AAA': [1.0, 2.0]}, index=dates), path)
+    append_timeseries_delta(path, pd.DataFrame({'AAA': [3.0], 'BBB': [7.0]}, index=pd.to_datetime(['2026-01-05'])), '20260105T000000Z')
+
+    loaded = load_timeseries(path)
+
+    assert list(loaded.index) == list(pd.to_datetime(['2026-01-01', '2026-01-02', '2026-01-05']))
+    assert loaded.loc['2026-01-05', 'AAA'] == 3.0
+    assert loaded.loc['2026-01-02', 'AAA'] == 2.0
+    assert pd.isna(loaded.loc['2026-01-01', 'BBB'])
+    assert pd.read_parquet(path).shape == (2, 2)
+
+
+def test_plan_incremental_fetch_requests_only_missing_tail():
+    state = {
+        'AAA': {'start': '2025-01-01', 'last_date': '2026-01-02'},
+        'BBB': {'start': '2025-01-01', 'last_date': '2026-01-09'},
+        'CCC': {'start': '2025-06-01', 'last_date': '2026-01-02'},
+    }
+
+    plan, full = plan_incremental_fetch(state, ['AAA', 'BBB', 'CCC', 'DDD'], '2025-01-01', '2026-01-09')
+
+    assert plan == {'2026-01-03': ['AAA'], '2025-01-01': ['CCC', 'DDD']}
+    assert full == {'CCC', 'DDD'}
+
+
+def test_read_timeseries_state_rebuilds_from_stored_data(tmp_path):
+    path = tmp_path / 'prices.parquet'
+    dates = pd.to_datetime(['2026-01-01', '2026-01-02'])
+    write_timeseries_parquet(pd.DataFrame({'AAA': [1.0, 2.0], 'BBB': [float('nan'), 5.0]}, index=dates), path)
+
+    state = read_timeseries_state(path)
+
+    assert state == {
+        'AAA': {'start': '2026-01-01', 'last_date': '2026-01-02'},
+        'BBB': {'start': '2026-01-02', 'last_date': '2026-01-02'},
+    }
+
+
+def test_incremental_collection_appends_tail_to_the_lake(tmp_path, monkeypatch):
+    import run_collect_market_data as collector
+
+    path = tmp_path / 'prices' / 'kr_etfs.parquet'
+    base = pd.DataFrame({'AAA': [1.0, 2.0]}, index=pd.to_datetime(['2026-01-01', '2026-01-02']))
+    write_timeseries_parquet(base, path)
+    write_timeseries_state(path, {'AAA': {'start': '2026-01-01', 'last_date': '2026-01-02'}})
+    calls = []
+
+    def fake_fetch(tickers, start, end, **kwargs):
+        calls.append((list(tickers), start))
+        idx = pd.to_datetime(['2026-01-02', '2026-01-05'])
+        return pd.DataFrame({t: [9.0, 3.0] for t in tickers}, index=idx)
+
+    monkeypatch.setattr(collector, 'fetch_prices', fake_fetch)
+
+    summary = collector._collect_price_group(
+        'kr_etfs', ['AAA', 'BBB'], '2026-01-01', '2026-01-05', path,
+        prefer='fdr', chunk_size=10, runs_root=tmp_path / 'runs', incremental=True,
+    )
+
+    assert calls == [(['AAA'], '2026-01-03'), (['BBB'], '2026-01-01')]
+    # The old wide base was imported into the lake and removed.
+    assert not path.exists()
+    loaded = _stored(path, ['AAA', 'BBB'])
+    assert loaded.loc['2026-01-02', 'AAA'] == 2.0
+    assert loaded.loc['2026-01-05', 'AAA'] == 3.0
+    assert loaded.loc['2026-01-02', 'BBB'] == 9.0
+    assert read_timeseries_state(path)['AAA'] == {'start': '2026-01-01', 'last_date': '2026-01-05'}
+    assert summary['mode'] == 'incremental'
+    assert summary['tail_fetch_tickers'] == 1
+    assert summary['full_fetch_tickers'] == 1
+    assert summary['missing_tickers'] == 0
+
+
+def test_price_lake_round_trip_filters_tickers_dates_and_resolves_latest_ingest(tmp_path):
+    from druck.data import read_price_lake
+
+    root = tmp_path / 'lake'
+    dates = pd.to_datetime(['2025-12-30', '2025-12-31', '2026-01-02'])
+    write_price_lake(root, 'kr_etfs', pd.DataFrame({'AAA': [1.0, 2.0, 3.0], 'BBB': [5.0, None, 7.0]}, index=dates), '20260102T000000Z')
+    write_price_lake(root, 'kr_etfs', pd.DataFrame({'AAA': [30.0]}, index=pd.to_datetime(['2026-01-02'])), '20260103T000000Z')
+    write_price_lake(root, 'us_etfs', pd.DataFrame({'SPY': [9.0]}, index=pd.to_datetime(['2026-01-02'])), '20260103T000000Z')
+
+    assert sorted(p.parent.name for p in (root / 'market=kr_etfs').glob('year=*/*.parquet')) == ['year=2025', 'year=2026', 'year=2026']
+    meta = pq.ParquetFile(next((root / 'market=kr_etfs' / 'year=2025').glob('*.parquet'))).metadata
+    assert meta.row_group(0).column(0).compression == 'ZSTD'
+
+    out = read_price_lake(str(root), ['BBB', 'AAA'], '2025-12-31', '2026-01-02')
+    assert list(out.columns) == ['BBB', 'AAA']
+    assert list(out.index) == list(pd.to_datetime(['2025-12-31', '2026-01-02']))
+    assert out.loc['2026-01-02', 'AAA'] == 30.0
+    assert pd.isna(out.loc['2025-12-31', 'BBB'])
+
+    assert list(read_price_lake(str(root), [], '2026-01-01', '2026-01-02', markets=['us_etfs']).columns) == ['SPY']
+
+    write_price_lake(root, 'kr_etfs', pd.DataFrame({'AAA': [4.0]}, index=pd.to_datetime(['2026-01-05'])), '20260105T000000Z', replace=True)
+    assert list(read_price_lake(str(root), ['AAA'], '2025-01-01', '2026-12-31')['AAA']) == [4.0]
+
+
+def test_collection_resumes_from_chunk_checkpoints(tmp_path, monkeypatch):
+    import run_collect_market_data as collector
+
+    path = tmp_path / 'prices' / 'us_etfs.parquet'
+    run_dir = tmp_path / 'runs' / '20260105T000000Z'
+    idx = pd.to_datetime(['2026-01-02', '2026-01-05'])
+    calls = []
+
+    def flaky_fetch(tickers, start, end, **kwargs):
+        calls.append(list(tickers))
+        if tickers == ['CCC'] and len(calls) == 2:
+            raise RuntimeError('rate limited')
+        return pd.DataFrame({t: [1.0, 2.0] for t in tickers}, index=idx)
+
+    monkeypatch.setattr(collector, 'fetch_prices', flaky_fetch)
+    kwargs = dict(prefer='yf', chunk_size=2, runs_root=tmp_path / 'runs', run_dir=run_dir)
+
+    with pytest.raises(RuntimeError):
+        collector._collect_price_group('us_etfs', ['AAA', 'BBB', 'CCC'], '2026-01-01', '2026-01-05', path, **kwargs)
+    assert (run_dir / 'us_etfs_chunks' / 'chunk-00001.parquet').exists()
+    assert not path.exists()
+
+    summary = collector._collect_price_group('us_etfs', ['AAA', 'BBB', 'CCC'], '2026-01-01', '2026-01-05', path, **kwargs)
+
+    assert calls == [['AAA', 'BBB'], ['CCC'], ['CCC']]
+    assert summary['found_tickers'] == 3
+    assert list(_stored(path, ['AAA', 'BBB', 'CCC']).columns) == ['AAA', 'BBB', 'CCC']
+    again = collector._collect_price_group('us_etfs', ['AAA', 'BBB', 'CCC'], '2026-01-01', '2026-01-05', path, **kwargs)
+    assert again == summary
+    assert len(calls) == 3
+
+
+def test_full_collection_streams_chunks_through_the_lake(tmp_path, monkeypatch):
+    import run_collect_market_data as collector
+
+    path = tmp_path / 'prices' / 'us_etfs.parquet'
+    lake = tmp_path / 'lake'
+    # An old ticker the run does not refetch stays, as a merge into the base kept it.
+    write_timeseries_parquet(pd.DataFrame({'OLD': [5.0, 6.0]}, index=pd.to_datetime(['2024-12-31', '2025-01-02'])), path)
+    append_timeseries_delta(path, pd.DataFrame({'AAA': [0.5]}, index=pd.to_datetime(['2024-12-31'])), 'old')
+    idx = pd.to_datetime(['2024-12-31', '2025-01-02', '2025-01-03'])
+
+    def fake_fetch(tickers, start, end, **kwargs):
+        return pd.DataFrame({t: [1.0, 2.0, 3.0] for t in tickers}, index=idx)
+
+    monkeypatch.setattr(collector, 'fetch_prices', fake_fetch)
+    kwargs = dict(prefer='yf', chunk_size=1, runs_root=tmp_path / 'runs', lake_root=lake)
+    summary = collector._collect_price_group('us_etfs', ['AAA', 'BBB', 'CCC'], '2024-12-01', '2025-01-03', path, run_dir=tmp_path / 'runs' / 'a', **kwargs)
+
+    assert (summary['rows'], summary['columns']) == (3, 3)
+    assert [len(list(d.glob('part-*.parquet'))) for d in sorted((lake / 'market=us_etfs').glob('year=*'))] == [1, 1]
+    # The lake is the store: the legacy wide base and its delta parts are gone.
+    assert not path.exists()
+    assert not list((tmp_path / 'prices' / 'us_etfs.delta').glob('*.parquet'))
+    stored = _stored(path, ['AAA', 'BBB', 'CCC', 'OLD'], lake)
+    assert stored.loc['2024-12-31', 'AAA'] == 1.0
+    assert stored.loc['2025-01-02', 'OLD'] == 6.0
+    assert read_timeseries_state(path)['OLD'] == {'start': '2024-12-31', 'last_date': '2025-01-02'}
+
+    exported = collector._collect_price_group('us_etfs', ['AAA'], '2024-12-01', '2025-01-03', path, run_dir=tmp_path / 'runs' / 'b', export_wide=True, **kwargs)
+
+    assert (exported['rows'], exported['columns']) == (3, 4)
+    assert pq.ParquetFile(path).metadata.num_row_groups == 2
+    pd.testing.assert_frame_equal(load_timeseries(path), stored, check_freq=False, check_index_type=False)
+
+
+def test_nightly_incremental_runs_compact_lake_partitions(tmp_path, monkeypatch):
+    import run_collect_market_data as collector
+
+    path = tmp_path / 'prices' / 'us_etfs.parquet'
+    days = pd.bdate_range('2026-01-05', '2026-01-16')
+
+    def fake_fetch(tickers, start, end, **kwargs):
+        idx = days[(days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))]
+        return pd.DataFrame({t: float(len(idx)) for t in tickers}, index=idx)
+
+    monkeypatch.setattr(collector, 'fetch_prices', fake_fetch)
+    year = tmp_path / 'prices' / 'lake' / 'market=us_etfs' / 'year=2026'
+    counts = []
+    for day in days:
+        collector._collect_price_group(
+            'us_etfs', ['AAA', 'BBB'], '2026-01-05', day.strftime('%Y-%m-%d'), path,
+            prefer='yf', chunk_size=1, runs_root=tmp_path / 'runs', incremental=True,
+            run_dir=tmp_path / 'runs' / day.strftime('%Y%m%d'), lake_max_parts=5,
+        )
+        counts.append(len(list(year.glob('part-*.parquet'))))
+
+    assert max(counts) < 5
+    assert any(name.endswith('-compact.parquet') for name in (p.name for p in year.glob('part-*.parquet')))
+    stored = _stored(path, ['AAA', 'BBB'])
+    assert list(stored.index) == list(days)
+    assert stored.loc['2026-01-05', 'AAA'] == 1.0
+    assert stored.loc['2026-01-16', 'BBB'] == 1.0
+
+
+def test_timeseries_state_rebuilds_from_the_lake(tmp_path):
+    lake = tmp_path / 'lake'
+    write_price_lake(lake, 'kr_etfs', pd.DataFrame({'AAA': [1.0, 2.0]}, index=pd.to_datetime(['2025-12-30', '2026-01-02'])), 'a')
+
+    assert read_timeseries_state(tmp_path / 'kr_etfs.parquet', lake_root=lake, market='kr_etfs') == {
+        'AAA': {'start': '2025-12-30', 'last_date': '2026-01-02'},
+    }
+
+
+def test_date_major_collection_fetches_one_snapshot_per_day(tmp_path, monkeypatch):
+    import run_collect_market_data as collector
+    from druck.data import fetch_snapshots_by_date, read_price_lake
+
+    path = tmp_path / 'prices' / 'kr_etfs.parquet'
+    write_timeseries_parquet(pd.DataFrame({'069500.KS': [1.0]}, index=pd.to_datetime(['2026-01-29'])), path)
+    write_timeseries_state(path, {'069500.KS': {'start': '2025-12-01', 'last_date': '2026-01-29'}})
+
+    class Stub:
+        calls = []
+
+        def snapshot(self, day, market):
+            self.calls.append(day)
+            return pd.DataFrame({'close': [2.0, 3.0], 'volume': [1.0, 1.0]}, index=['069500', '229200'])
+
+    stub = Stub()
+    monkeypatch.setattr(collector, 'fetch_snapshots_by_date', lambda *a, **kw: fetch_snapshots_by_date(*a, provider=stub, **kw))
+    monkeypatch.setattr(collector, 'fetch_prices', lambda *a, **kw: pytest.fail('per-ticker fetch in date-major mode'))
+
+    summary = collector._collect_price_group(
+        'kr_etfs', ['069500.KS', '229200.KS'], '2025-12-01', '2026-02-03', path,
+        prefer='fdr', chunk_size=1, runs_root=tmp_path / 'runs', incremental=True, snapshot_market='etfs',
+        lake_root=tmp_path / 'lake',
+    )
+
+    assert len(stub.calls) == len(pd.bdate_range('2025-12-01', '2026-02-03'))
+    loaded = _stored(path, ['069500.KS', '229200.KS'], tmp_path / 'lake')
+    assert loaded['069500.KS'].dropna().index.min() == pd.Timestamp('2026-01-29')
+    assert loaded.loc['2026-01-29', '069500.KS'] == 1.0
+    assert loaded.loc['2026-02-03', '069500.KS'] == 2.0
+    assert loaded['229200.KS'].dropna().index.min() == pd.Timestamp('2025-12-01')
+    assert summary['found_tickers'] == 2
+    volume = read_price_lake(str(tmp_path / 'lake'), ['069500.KS', '229200.KS'], '2026-01-01', '2026-02-03', field='volume')
+    assert volume.loc['2026-02-03'].tolist() == [1.0, 1.0]
+    assert pd.isna(volume.loc['2026-01-29', '069500.KS'])
+
+
+def test_date_major_collection_survives_a_failed_snapshot_day(tmp_path, monkeypatch):
+    import run_collect_market_data as collector
+    from druck.data import fetch_snapshots_by_date
+
+    path = tmp_path / 'prices' / 'kr_etfs.parquet'
+
+    class Stub:
+        fail = '2026-01-06'
+
+        @classmethod
+        def healed(cls):
+            stub = cls()
+            stub.fail = None
+            return stub
+
+        def snapshot(self, day, market):
+            if day == self.fail:
+                raise RuntimeError('KRX timeout')
+            return pd.DataFrame({'close': [2.0], 'volume': [1.0]}, index=['069500'])
+
+    monkeypatch.setattr(collector, 'fetch_snapshots_by_date', lambda *a, **kw: fetch_snapshots_by_date(*a, provider=Stub(), **kw))
+
+    summary = collector._collect_price_group(
+        'kr_etfs', ['069500.KS'], '2026-01-05', '2026-01-08', path,
+        prefer='fdr', chunk_size=1, runs_root=tmp_path / 'runs', snapshot_market='etfs',
+    )
+
+    assert summary['found_tickers'] == 1
+    assert summary['warning_summary']['issue_count'] == 1
+    assert list(_stored(path, ['069500.KS']).index) == list(pd.to_datetime(['2026-01-05', '2026-01-07', '2026-01-08']))
+    # The hole keeps the stored last date before it, so it is planned again.
+    assert read_timeseries_state(path)['069500.KS']['last_date'] == '2026-01-05'
+    assert plan_incremental_fetch(read_timeseries_state(path), ['069500.KS'], '2026-01-05', '2026-01-08')[0] == {'2026-01-06': ['069500.KS']}
+
+    monkeypatch.setattr(collector, 'fetch_snapshots_by_date', lambda *a, **kw: fetch_snapshots_by_date(*a, provider=Stub.healed(), **kw))
+    collector._collect_price_group(
+        'kr_etfs', ['069500.KS'], '2026-01-05', '2026-01-08', path,
+        prefer='fdr', chunk_size=1, runs_root=tmp_path / 'runs', snapshot_market='etfs', incremental=True, run_dir=tmp_path / 'runs' / 'retry',
+    )
+
+    assert list(_stored(path, ['069500.KS']).index) == list(pd.bdate_range('2026-01-05', '2026-01-08'))
+    assert read_timeseries_state(path)['069500.KS']['last_date'] == '2026-01-08'
@@ -3,7 +3,7 @@ import math
 import pytest
 import pandas as pd
 
-from druck.portfolio import allocate_weights, apply_risk_cuts, score_universe, apply_regime_factor_bias, apply_sleeve_budget, build_sleeve_map, resolve_regime_rotation, apply_sleeve_rotation, resolve_factor_preference, apply_regime_factor_map, compute_diversification_adjustment
+from druck.portfolio import allocate_weights, apply_risk_cuts, score_universe, prepare_score_inputs, finalize_scores, score_with_weight_sets, apply_regime_factor_bias, apply_sleeve_budget, build_sleeve_map, resolve_regime_rotation, apply_sleeve_rotation, resolve_factor_preference, apply_regime_factor_map, compute_diversification_adjustment
 
 
 def test_allocate_weights_normalizes_and_caps():
@@ -55,6 +55,26 @@ def test_score_universe_sorts_by_score_descending():
     assert {"persistence", "recovery", "downside_efficiency"}.issubset(scores.columns)
 
 
+def test_score_with_weight_sets_matches_single_vector_scores():
+    idx = pd.date_range("2024-01-01", periods=300, freq="D")
+    prices = pd.DataFrame({
+        "A": pd.Series([100 + i for i in range(300)], index=idx),
+        "B": pd.Series([100 + i * 0.3 for i in range(300)], index=idx),
+        "C": pd.Series([100 + (-1) ** i * 0.5 + i * 0.1 for i in range(300)], index=idx),
+        "D": pd.Series([100 + (-1) ** i * 1.5 - i * 0.05 for i in range(300)], index=idx),
+    })
+    current = {"momentum": 0.35, "trend": 0.20, "persistence": 0.15, "recovery": 0.15, "downside_efficiency": 0.15, "vol_penalty": 0.10, "dd_penalty": 0.10}
+    legacy = {"momentum": 0.55, "trend": 0.25, "persistence": 0.0, "recovery": 0.0, "downside_efficiency": 0.0, "vol_penalty": 0.10, "dd_penalty": 0.10}
+    inputs = prepare_score_inputs(prices)
+    multi = score_with_weight_sets(inputs, {"current": current, "legacy": legacy})
+    for name, sw in {"current": current, "legacy": legacy}.items():
+        single = finalize_scores(inputs, sw)
+        assert multi[name].reindex(single.index).tolist() == single["score"].tolist()
+
+    scored = score_universe(prices, current, score_weight_sets={"legacy": legacy})
+    assert scored["score_legacy"].reindex(multi.index).tolist() == multi["legacy"].tolist()
+
+
 def test_apply_regime_factor_bias_prefers_configured_factor_tickers():
     scores = pd.DataFrame(
         {
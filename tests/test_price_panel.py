@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from druck.data import load_price_panel, read_price_panel_meta, write_price_panel
+
+
+def _panel():
+    idx = pd.date_range("2024-01-01", periods=5, freq="B")
+    return pd.DataFrame({"SPY": [1.0, 2.0, np.nan, 4.0, 5.0], "069500.KS": [10.0, 11.0, 12.0, 13.0, 14.0]}, index=idx)
+
+
+def test_price_panel_round_trip_is_a_zero_copy_memmap_view(tmp_path):
+    px = _panel()
+    write_price_panel(px, tmp_path / "panel", meta={"source": "test"})
+
+    loaded = load_price_panel(tmp_path / "panel")
+
+    pd.testing.assert_frame_equal(loaded, px)
+    backing = np.load(tmp_path / "panel" / "values.npy", mmap_mode="r")
+    assert isinstance(backing, np.memmap)
+    assert np.shares_memory(loaded["SPY"].to_numpy(), loaded.to_numpy())
+    assert not loaded.to_numpy().flags.writeable
+    assert read_price_panel_meta(tmp_path / "panel")["meta"] == {"source": "test"}
+
+
+def test_price_panel_float32_and_overwrite(tmp_path):
+    write_price_panel(_panel(), tmp_path / "panel", dtype="float32")
+    assert load_price_panel(tmp_path / "panel").dtypes.eq(np.float32).all()
+
+    write_price_panel(_panel().iloc[:2], tmp_path / "panel")
+    assert len(load_price_panel(tmp_path / "panel", mmap=False)) == 2
+    assert [p.name for p in tmp_path.iterdir()] == ["panel"]
+
+    with pytest.raises(ValueError):
+        write_price_panel(_panel(), tmp_path / "other", dtype="int64")
@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+
+from druck.result_store import ResultCache, read_result_frames, write_result_frames
+
+
+def test_result_frames_round_trip_nested_columns_and_series(tmp_path):
+    idx = pd.date_range("2024-01-01", periods=3, freq="B")
+    curve = pd.Series([1.0, 1.01, 0.99], index=idx)
+    log = pd.DataFrame({
+        "date": idx,
+        "turnover": [0.5, 0.0, 0.25],
+        "weights": [{"SPY": 0.6, "TLT": 0.4}, {}, {"SPY": 1.0}],
+        "picks": [["SPY"], [], ["SPY", "TLT"]],
+        "state": ["RISK_ON", "NEUTRAL", "RISK_OFF"],
+    })
+    write_result_frames(tmp_path / "result", {"equity_curve": curve, "rebalance_log": log, "monitor_log": None}, {"summary": {"total_return": -0.01}})
+
+    frames, payload = read_result_frames(tmp_path / "result")
+
+    pd.testing.assert_series_equal(frames["equity_curve"], curve)
+    assert frames["equity_curve"].index.freqstr == "B"
+    pd.testing.assert_frame_equal(frames["rebalance_log"], log)
+    assert frames["monitor_log"] is None
+    assert payload == {"summary": {"total_return": -0.01}}
+    assert list((tmp_path / "result").glob("*.parquet")) and not list(tmp_path.glob(".result.*"))
+
+
+def test_result_cache_evicts_least_recently_used_entries_over_budget(tmp_path):
+    frame = pd.DataFrame({"value": range(200)}, dtype=float)
+    cache = ResultCache(tmp_path)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, {"frame": frame})
+        os.utime(tmp_path / key / "meta.json", (1000 + i, 1000 + i))
+    assert cache.get("a") is not None  # a hit makes "a" the most recent entry
+    size = sum(p.stat().st_size for p in (tmp_path / "a").iterdir())
+
+    cache.max_bytes = 2 * size
+    assert cache.prune() == ["b"]
+    assert cache.get("b") is None
+    assert read_result_frames(cache.get("c"))[0]["frame"].equals(frame)
@@ -0,0 +1,122 @@
+import pandas as pd
+import pytest
+
+from druck.backtest import prepare_backtest_inputs, run_backtest
+from druck.sweep import apply_overrides, candidate_id, expand_sweep_spec, run_sweep
+from tests.test_backtest import _base_cfg
+
+
+def _prices():
+    idx = pd.date_range("2024-01-01", periods=420, freq="B")
+    return pd.DataFrame({
+        "SPY": pd.Series([100 + i * 0.2 for i in range(420)], index=idx),
+        "SHY": pd.Series([100 + i * 0.01 for i in range(420)], index=idx),
+        "UUP": pd.Series([100 - i * 0.02 for i in range(420)], index=idx),
+        "HYG": pd.Series([100 + i * 0.1 + (i % 7) * 0.3 for i in range(420)], index=idx),
+        "IEF": pd.Series([100 + i * 0.03 for i in range(420)], index=idx),
+        "TLT": pd.Series([100 + i * 0.02 + (i % 5) * 0.2 for i in range(420)], index=idx),
+        "^VIX": pd.Series([15 + (i % 3) * 0.1 for i in range(420)], index=idx),
+    })
+
+
+def test_expand_sweep_spec_grid_and_random():
+    grid = expand_sweep_spec({"parameters": {"selection.top_n_risk_on": [1, 2], "selection.max_weight": [0.5, 1.0, 0.5]}})
+    assert len(grid) == 4
+    assert {"selection.top_n_risk_on": 2, "selection.max_weight": 1.0} in grid
+
+    spec = {"mode": "random", "samples": 5, "seed": 3, "parameters": {"selection.top_n_risk_on": {"low": 1, "high": 3}, "risk_cut.rules.trailing_dd_cut": {"low": -0.2, "high": -0.05}}}
+    first = expand_sweep_spec(spec)
+    assert first == expand_sweep_spec(spec)
+    assert all(1 <= c["selection.top_n_risk_on"] <= 3 and -0.2 <= c["risk_cut.rules.trailing_dd_cut"] <= -0.05 for c in first)
+
+    with pytest.raises(ValueError):
+        expand_sweep_spec({"parameters": {"data.lookback_years": [1, 2]}})
+    with pytest.raises(ValueError):
+        expand_sweep_spec({"parameters": {"backtest.min_history_days": [100]}})
+
+
+def test_apply_overrides_sets_nested_paths_without_mutating_base():
+    cfg = _base_cfg()
+    out = apply_overrides(cfg, {"selection.score_weights.momentum": 0.5, "macro_filter.thresholds.risk_on_score_min": 0.6})
+    assert out["selection"]["score_weights"]["momentum"] == 0.5
+    assert out["macro_filter"]["thresholds"]["risk_on_score_min"] == 0.6
+    assert cfg["selection"]["score_weights"]["momentum"] == 0.35
+
+
+def test_run_sweep_streams_results_and_resumes(monkeypatch, tmp_path):
+    cfg = _base_cfg()
+    cfg["backtest"]["walkforward"]["enabled"] = False
+    px = _prices()
+    fetches = []
+
+    def fake_fetch(tickers, start, end, prefer="auto", cache_dir=None, use_cache=True):
+        fetches.append(tickers)
+        return px[tickers]
+
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", fake_fetch)
+
+    spec = {"parameters": {"selection.score_weights.momentum": [0.2, 0.5], "selection.top_n_risk_on": [1, 2]}}
+    results = run_sweep(cfg, spec, tmp_path / "sweep")
+    assert len(fetches) == 1
+    assert len(results) == 4
+    assert set(results["status"]) == {"ok"}
+    assert len(list((tmp_path / "sweep").glob("*.parquet"))) == 4
+
+    params = {"selection.score_weights.momentum": 0.5, "selection.top_n_risk_on": 1}
+    row = results.set_index("candidate_id").loc[candidate_id(params)]
+    expected = run_backtest(apply_overrides(cfg, params)).summary
+    assert row["total_return"] == pytest.approx(expected["total_return"])
+    assert row["sharpe"] == pytest.approx(expected["sharpe"])
+
+    spec["parameters"]["selection.top_n_risk_on"].append(3)
+    resumed = run_sweep(cfg, spec, tmp_path / "sweep")
+    assert len(resumed) == 6
+    assert len(fetches) == 3
+    assert run_sweep(cfg, spec, tmp_path / "sweep")["candidate_id"].tolist() == resumed["candidate_id"].tolist()
+    assert len(fetches) == 3
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread"])
+def test_run_sweep_drops_each_candidates_decisions_once_written(monkeypatch, tmp_path, executor):
+    cfg = _base_cfg()
+    cfg["backtest"]["walkforward"]["enabled"] = False
+    px = _prices()
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, *a, **kw: px[tickers])
+    inputs = prepare_backtest_inputs(cfg)
+
+    spec = {"parameters": {"selection.top_n_risk_on": [1, 2, 3]}}
+    results = run_sweep(cfg, spec, tmp_path / "sweep", inputs=inputs, executor=executor, max_workers=2)
+
+    assert set(results["status"]) == {"ok"}
+    assert inputs.decisions == {}
+
+
+def test_run_sweep_reruns_rows_of_another_config_or_data_end(monkeypatch, tmp_path):
+    cfg = _base_cfg()
+    cfg["backtest"]["walkforward"]["enabled"] = False
+    px = _prices()
+    monkeypatch.setattr("druck.backtest.make_universe", lambda cfg: type("U", (), {"kr": [], "us": cfg["universe"]["us"]["tickers"]})())
+    monkeypatch.setattr("druck.backtest.fetch_prices", lambda tickers, *a, **kw: px[tickers])
+    monkeypatch.setattr("druck.sweep.get_date_range", lambda years: ("2024-01-01", "2025-08-11"))
+    spec = {"parameters": {"selection.top_n_risk_on": [1, 2]}}
+    first = run_sweep(cfg, spec, tmp_path / "sweep")
+    finished = dict(zip(first["candidate_id"], first["finished_seconds"]))
+
+    def rerun(cfg):
+        results = run_sweep(cfg, spec, tmp_path / "sweep")
+        assert len(results) == 2
+        changed = sum(finished.get(cid) != seconds for cid, seconds in zip(results["candidate_id"], results["finished_seconds"]))
+        finished.update(zip(results["candidate_id"], results["finished_seconds"]))
+        return changed
+
+    assert rerun(cfg) == 0
+
+    # A setting outside the swept parameters changes every candidate's result.
+    costly = apply_overrides(cfg, {"backtest.transaction_cost_bps": 25.0})
+    assert rerun(costly) == 2
+    assert rerun(costly) == 0
+    # So does a data window that ends on a later day.
+    monkeypatch.setattr("druck.sweep.get_date_range", lambda years: ("2024-01-02", "2025-08-12"))
+    assert rerun(costly) == 2